@@ -0,0 +1,49 @@
+"""
+Compare two benchmark result files.
+
+Usage:
+    python -m benchmarks.compare baseline.json current.json
+"""
+import argparse
+import json
+
+import tabulate
+
+STAGES = ['load_seconds', 'aggregate_seconds', 'render_seconds', 'cli_seconds']
+
+
+def compare(baseline, current):
+    """Return one row per case present in both documents with current/baseline time ratios."""
+    def key(result):
+        return result['rows'], result['files'], result['loader']
+
+    previous = {key(result): result for result in baseline['results']}
+    rows = []
+    for result in current['results']:
+        before = previous.get(key(result))
+        if before is None:
+            continue
+        row = {'rows': result['rows'], 'files': result['files'], 'loader': result['loader']}
+        for stage in STAGES:
+            if before.get(stage) and result.get(stage) is not None:
+                row[stage] = result[stage] / before[stage]
+        rows.append(row)
+    return rows
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Сравнение результатов бенчмарков (текущее / базовое время)')
+    parser.add_argument('baseline', help='JSON с базовыми результатами')
+    parser.add_argument('current', help='JSON с текущими результатами')
+    args = parser.parse_args(argv)
+
+    with open(args.baseline, encoding='utf-8') as file:
+        baseline = json.load(file)
+    with open(args.current, encoding='utf-8') as file:
+        current = json.load(file)
+
+    print(tabulate.tabulate(compare(baseline, current), headers='keys', tablefmt='grid', floatfmt='.2f'))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,147 @@
+"""
+Benchmarks for loading, aggregation, rendering and the CLI end to end.
+
+The csv loader is timed the way the CLI runs it: rows are streamed from
+iter_rows() into the report aggregate, so memory does not grow with the
+number of rows. As in ``--profile``, Profiler.iter_span charges pulling
+rows to "load" and folding them to "aggregate". The columnar loader
+builds one frame per run with load_files().
+
+Usage:
+    python -m benchmarks.run --rows 10000 100000 --files 1 100 --output results.json
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import tempfile
+import time
+from datetime import datetime, timezone
+
+import tabulate
+
+import macro_analysis
+from benchmarks.synthetic import generate_files
+from macro_analysis.cli import main as cli_main
+from macro_analysis.batch import merge_columns
+from macro_analysis.columnar import ColumnarLoader
+from macro_analysis.loader import DataLoader
+from macro_analysis.profiling import Profiler
+from macro_analysis.reports.average_gdp import AverageGDPReport
+
+DEFAULT_ROWS = [10_000, 100_000, 1_000_000, 10_000_000]
+DEFAULT_FILES = [1, 10, 100, 1000]
+LOADERS = {'csv': DataLoader, 'columnar': ColumnarLoader}
+
+
+def _timed(func, repeat):
+    """Run ``func`` ``repeat`` times and return (best seconds, last result)."""
+    best = None
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def _timed_stream(loader, paths, repeat):
+    """Stream ``iter_rows()`` into the aggregate; return (best load seconds, best aggregate seconds, last result)."""
+    load_seconds = aggregate_seconds = None
+    result = None
+    for _ in range(repeat):
+        profiler = Profiler()
+        with profiler.span('aggregate'):
+            rows = profiler.iter_span('load', loader.iter_rows(paths))
+            aggregate = AverageGDPReport.aggregate_class().update(rows)
+            result = AverageGDPReport(aggregate=aggregate).generate()
+        load = profiler.stages['load']
+        load_seconds = load if load_seconds is None else min(load_seconds, load)
+        folded = profiler.stages['aggregate']
+        aggregate_seconds = folded if aggregate_seconds is None else min(aggregate_seconds, folded)
+    return load_seconds, aggregate_seconds, result
+
+
+def benchmark_case(paths, rows, loader_name, repeat=1):
+    """Time load, aggregate, render and the CLI separately for one input set."""
+    # Как и CLI, загрузчик разбирает только колонки, объявленные отчетом
+    loader = LOADERS[loader_name](columns=merge_columns([AverageGDPReport]))
+    if loader_name == 'columnar':
+        load_seconds, frame = _timed(lambda: loader.load_files(paths), repeat)
+        aggregate_seconds, result = _timed(lambda: AverageGDPReport(frame).generate(), repeat)
+    else:
+        load_seconds, aggregate_seconds, result = _timed_stream(loader, paths, repeat)
+    render_seconds, _ = _timed(
+        lambda: tabulate.tabulate([{'№': i, **row} for i, row in enumerate(result, 1)],
+                                  headers='keys', tablefmt='grid'),
+        repeat,
+    )
+
+    argv = ['--files', *paths, '--report', 'average-gdp', '--loader', loader_name, '--no-cache']
+
+    def run_cli():
+        with contextlib.redirect_stdout(io.StringIO()):
+            cli_main(argv)
+
+    cli_seconds, _ = _timed(run_cli, repeat)
+
+    return {
+        'rows': rows,
+        'files': len(paths),
+        'loader': loader_name,
+        'bytes': sum(os.path.getsize(path) for path in paths),
+        'load_seconds': load_seconds,
+        'aggregate_seconds': aggregate_seconds,
+        'render_seconds': render_seconds,
+        'cli_seconds': cli_seconds,
+        'rows_per_second': rows / load_seconds if load_seconds else None,
+    }
+
+
+def run(rows_list, files_list, loaders, repeat=1, workdir=None):
+    """Run every rows x files x loader combination and return the result document."""
+    results = []
+    with tempfile.TemporaryDirectory(dir=workdir) as tmp:
+        for rows in rows_list:
+            for files in files_list:
+                if files > rows:
+                    continue
+                directory = os.path.join(tmp, f'{rows}_{files}')
+                paths = generate_files(directory, rows, files)
+                for loader_name in loaders:
+                    results.append(benchmark_case(paths, rows, loader_name, repeat))
+
+    return {
+        'version': macro_analysis.__version__,
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'timestamp': datetime.now(timezone.utc).isoformat(),
+        'results': results,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Бенчмарки macro_analysis')
+    parser.add_argument('--rows', nargs='+', type=int, default=DEFAULT_ROWS, help='Количество строк')
+    parser.add_argument('--files', nargs='+', type=int, default=DEFAULT_FILES, help='Количество файлов')
+    parser.add_argument('--loader', nargs='+', choices=sorted(LOADERS), default=sorted(LOADERS),
+                        help='Загрузчики для сравнения')
+    parser.add_argument('--repeat', type=int, default=1, help='Число повторов, берется лучшее время')
+    parser.add_argument('--workdir', help='Каталог для синтетических данных')
+    parser.add_argument('--output', help='JSON файл результатов (по умолчанию stdout)')
+    args = parser.parse_args(argv)
+
+    document = run(args.rows, args.files, args.loader, args.repeat, args.workdir)
+    text = json.dumps(document, indent=2)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as file:
+            file.write(text + '\n')
+    else:
+        print(text)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,42 @@
+"""Synthetic macroeconomic CSV data matching the data1.csv schema."""
+import os
+import random
+
+COLUMNS = ['country', 'year', 'gdp', 'gdp_growth', 'inflation', 'unemployment', 'population', 'continent']
+
+CONTINENTS = ['Africa', 'Asia', 'Europe', 'North America', 'Oceania', 'South America']
+
+
+def generate_rows(rows, countries=200, seed=0):
+    """Yield ``rows`` CSV lines (without header) for ``countries`` synthetic countries."""
+    rng = random.Random(seed)
+    names = [f'Country{i:03d}' for i in range(countries)]
+    continents = [CONTINENTS[i % len(CONTINENTS)] for i in range(countries)]
+    for i in range(rows):
+        c = i % countries
+        year = 1960 + (i // countries) % 64
+        yield (
+            f'{names[c]},{year},{rng.uniform(1, 30000):.2f},{rng.uniform(-5, 10):.1f},'
+            f'{rng.uniform(-1, 20):.1f},{rng.uniform(1, 25):.1f},{rng.randint(1, 1500)},{continents[c]}\n'
+        )
+
+
+def generate_files(directory, rows, files=1, countries=200, seed=0):
+    """
+    Write ``rows`` synthetic rows split evenly across ``files`` CSV files.
+
+    Returns:
+        List of created file paths in order
+    """
+    os.makedirs(directory, exist_ok=True)
+    lines = generate_rows(rows, countries=countries, seed=seed)
+    paths = []
+    for index in range(files):
+        count = rows // files + (1 if index < rows % files else 0)
+        path = os.path.join(directory, f'data_{index:04d}.csv')
+        with open(path, 'w', encoding='utf-8') as file:
+            file.write(','.join(COLUMNS) + '\n')
+            for _ in range(count):
+                file.write(next(lines))
+        paths.append(path)
+    return paths
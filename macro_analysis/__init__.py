@@ -1,6 +1,25 @@
-from .cli import main as cli_main
-from .loader import DataLoader
-from .registry import ReportRegistry
-from .reports import AverageGDPReport
+from importlib import import_module
 
-__version__ = "0.1.0"
\ No newline at end of file
+__version__ = "0.1.0"
+
+# Подмодули импортируются при первом обращении, чтобы запуск не зависел от числа отчетов
+_EXPORTS = {
+    'cli_main': ('macro_analysis.cli', 'main'),
+    'ColumnarLoader': ('macro_analysis.columnar', 'ColumnarLoader'),
+    'DataLoader': ('macro_analysis.loader', 'DataLoader'),
+    'ReportRegistry': ('macro_analysis.registry', 'ReportRegistry'),
+    'AverageGDPReport': ('macro_analysis.reports.average_gdp', 'AverageGDPReport'),
+}
+
+
+def __getattr__(name):
+    if name not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    module_name, attribute = _EXPORTS[name]
+    value = getattr(import_module(module_name), attribute)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(list(globals()) + list(_EXPORTS))
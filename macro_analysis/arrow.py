@@ -0,0 +1,164 @@
+import os
+
+from macro_analysis.compression import EXTENSIONS as COMPRESSED_EXTENSIONS
+from macro_analysis.dtypes import PARSERS, normalize_columns
+from macro_analysis.filters import parse_filters
+
+# Колоночные форматы, которые читаются через pyarrow вместо разбора текста
+EXTENSIONS = {
+    '.parquet': 'parquet',
+    '.pq': 'parquet',
+    '.arrow': 'arrow',
+    '.feather': 'arrow',
+    '.ipc': 'arrow',
+}
+MAGIC = {
+    b'PAR1': 'parquet',
+    b'ARROW1': 'arrow',
+}
+# Текстовые файлы, которые не нужно открывать ради проверки сигнатуры
+TEXT_EXTENSIONS = {'.csv', '.tsv', '.txt'} | set(COMPRESSED_EXTENSIONS)
+MAGIC_BYTES = max(len(magic) for magic in MAGIC)
+
+
+def detect_format(file_path):
+    """
+    Return 'parquet' or 'arrow' (Arrow IPC / Feather v2) for binary columnar files, None for text.
+
+    Files with a text or compressed text extension (``.csv``, ``.csv.gz``,
+    ...) are not opened; only unknown extensions are sniffed.
+    """
+    extension = os.path.splitext(str(file_path))[1].lower()
+    if extension in TEXT_EXTENSIONS:
+        return None
+    file_format = EXTENSIONS.get(extension)
+    if file_format is not None:
+        return file_format
+    try:
+        with open(file_path, 'rb') as file:
+            head = file.read(MAGIC_BYTES)
+    except FileNotFoundError:
+        # Сообщение об отсутствующем файле формирует загрузчик
+        return None
+    for magic, name in MAGIC.items():
+        if head.startswith(magic):
+            return name
+    return None
+
+
+def import_pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.parquet
+    except ImportError:
+        raise ImportError("Для формата parquet требуется пакет pyarrow (pip install macro_analysis[parquet])")
+    return pyarrow
+
+
+def iter_batches(file_path, names=None, filters=(), file_format=None):
+    """
+    Yield pyarrow RecordBatches of a Parquet or Arrow IPC file.
+
+    Only the columns in ``names`` (all when None) and the filter columns
+    are read. Parquet row groups whose min/max statistics show that no row
+    can pass ``filters`` are skipped without being read; the remaining rows
+    still have to be checked by the caller. Nothing is yielded if a filter
+    column is missing from the file.
+    """
+    pa = import_pyarrow()
+    filters = parse_filters(filters)
+    file_format = file_format or detect_format(file_path)
+    wanted = None if names is None else set(names) | {item.column for item in filters}
+
+    if file_format == 'parquet':
+        parquet_file = pa.parquet.ParquetFile(file_path, memory_map=True)
+        fieldnames = parquet_file.schema_arrow.names
+        if any(item.column not in fieldnames for item in filters):
+            return
+        metadata = parquet_file.metadata
+        row_groups = [
+            index for index in range(metadata.num_row_groups)
+            if _row_group_may_match(metadata.row_group(index), filters)
+        ]
+        if not row_groups:
+            return
+        selected = [name for name in fieldnames if wanted is None or name in wanted]
+        yield from parquet_file.iter_batches(row_groups=row_groups, columns=selected)
+        return
+
+    with pa.memory_map(str(file_path)) as source:
+        reader = pa.ipc.open_file(source)
+        fieldnames = reader.schema.names
+        if any(item.column not in fieldnames for item in filters):
+            return
+        selected = [name for name in fieldnames if wanted is None or name in wanted]
+        for index in range(reader.num_record_batches):
+            # Файл отображен в память, поэтому лишние колонки не копируются
+            yield reader.get_batch(index).select(selected)
+
+
+def _row_group_may_match(row_group, filters):
+    if not filters:
+        return True
+    columns = {
+        row_group.column(index).path_in_schema: row_group.column(index)
+        for index in range(row_group.num_columns)
+    }
+    for item in filters:
+        statistics = columns[item.column].statistics
+        if statistics is None:
+            continue
+        if statistics.null_count == row_group.num_rows:
+            # Пустые значения не проходят ни одно условие
+            return False
+        if statistics.has_min_max and not item.may_match(statistics.min, statistics.max):
+            return False
+    return True
+
+
+def iter_rows(file_path, columns=None, filters=(), file_format=None):
+    """
+    Yield rows of a Parquet or Arrow IPC file as dicts.
+
+    Rows have the same shape as DataLoader rows for a CSV file: restricted
+    to ``columns`` and parsed by their declared dtypes. Without ``columns``
+    values keep their Arrow types instead of being strings.
+    """
+    columns = normalize_columns(columns)
+    filters = parse_filters(filters)
+    for batch in iter_batches(file_path, columns, filters, file_format):
+        keep = None
+        for item in filters:
+            values = batch.column(batch.schema.get_field_index(item.column)).to_pylist()
+            passed = [item.test(value) for value in values]
+            keep = passed if keep is None else [a and b for a, b in zip(keep, passed)]
+
+        names = [name for name in batch.schema.names if columns is None or name in columns]
+        values = [
+            _parse_values(batch.column(batch.schema.get_field_index(name)).to_pylist(),
+                          columns[name] if columns else None)
+            for name in names
+        ]
+        for index, row in enumerate(zip(*values)):
+            if keep is None or keep[index]:
+                yield dict(zip(names, row))
+
+
+def _parse_values(values, dtype):
+    if dtype is None:
+        return values
+    if dtype is str:
+        return [value if value is None or isinstance(value, str) else str(value) for value in values]
+    parse = PARSERS[dtype]
+    return [None if value is None else parse(value) for value in values]
+
+
+def read_frame(file_path, names=None, filters=(), file_format=None):
+    """Read a Parquet or Arrow IPC file into a DataFrame; row filtering is left to the caller."""
+    pa = import_pyarrow()
+    batches = list(iter_batches(file_path, names, filters, file_format))
+    if not batches:
+        import pandas as pd
+
+        return pd.DataFrame(columns=list(names or ()))
+    return pa.Table.from_batches(batches).to_pandas()
@@ -0,0 +1,74 @@
+import asyncio
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+
+from macro_analysis.loader import DataLoader, _read_file_rows
+
+DEFAULT_CONCURRENCY = 16
+
+
+class AsyncDataLoader(DataLoader):
+    """
+    DataLoader that overlaps file opens and reads with asyncio.
+
+    Up to ``concurrency`` files are opened and parsed at the same time in
+    a thread pool, which hides per-file open latency on network
+    filesystems. Parsed files are handed out as chunks (one list of rows
+    per file) in the order of ``file_paths``; at most ``concurrency``
+    files are held in memory at once.
+    """
+
+    def __init__(self, concurrency=DEFAULT_CONCURRENCY, cache=None, engine='csv', columns=None, filters=(),
+                 compact=False):
+        super().__init__(cache=cache, engine=engine, columns=columns, filters=filters, compact=compact)
+        if concurrency < 1:
+            raise ValueError(f"Некорректное количество одновременных чтений: {concurrency}")
+        self.concurrency = concurrency
+
+    async def aiter_chunks(self, file_paths):
+        """Asynchronously yield the rows of each file as a list, in the order of ``file_paths``."""
+        loop = asyncio.get_running_loop()
+        read = partial(_read_file_rows, cache=self.cache, engine=self.engine,
+                       columns=self.columns, filters=self.filters)
+        executor = ThreadPoolExecutor(self.concurrency)
+        pending = deque()
+        try:
+            for file_path in file_paths:
+                pending.append(loop.run_in_executor(executor, read, file_path))
+                if len(pending) >= self.concurrency:
+                    yield await pending.popleft()
+            while pending:
+                yield await pending.popleft()
+        finally:
+            for future in pending:
+                future.cancel()
+            executor.shutdown(wait=False)
+
+    async def aiter_rows(self, file_paths):
+        async for chunk in self.aiter_chunks(file_paths):
+            for row in chunk:
+                yield row
+
+    async def aload_files(self, file_paths):
+        return [row async for row in self.aiter_rows(file_paths)]
+
+    def iter_rows(self, file_paths):
+        """
+        Synchronous view of aiter_chunks() for existing callers.
+
+        Reads scheduled in the thread pool keep running while the caller
+        processes the rows of earlier files.
+        """
+        loop = asyncio.new_event_loop()
+        chunks = self.aiter_chunks(file_paths)
+        try:
+            while True:
+                try:
+                    chunk = loop.run_until_complete(chunks.__anext__())
+                except StopAsyncIteration:
+                    break
+                yield from chunk
+        finally:
+            loop.run_until_complete(chunks.aclose())
+            loop.close()
@@ -0,0 +1,67 @@
+from macro_analysis.chunked import batched
+from macro_analysis.dtypes import is_frame, normalize_columns
+from macro_analysis.records import RecordStore
+from macro_analysis.selection import generate_report
+
+
+def merge_columns(report_classes):
+    """
+    Union of the columns declared by ``report_classes``.
+
+    Returns None (load every column) if any report does not declare its
+    columns. A column declared with different dtypes is kept as text and
+    left for each report to parse.
+    """
+    merged = {}
+    for report_cls in report_classes:
+        columns = normalize_columns(getattr(report_cls, 'columns', None))
+        if columns is None:
+            return None
+        for name, dtype in columns.items():
+            merged[name] = dtype if merged.get(name, dtype) is dtype else str
+    return merged
+
+
+def aggregate_reports(report_classes, data):
+    """
+    Fold ``data`` into one new aggregate per report class in a single pass.
+
+    ``data`` may be a one-shot row iterator: rows are read in batches of
+    chunked.DEFAULT_BATCH_ROWS and every batch is handed to each report's
+    aggregate before the next one is read.
+    """
+    aggregates = [report_cls.aggregate_class() for report_cls in report_classes]
+    if is_frame(data):
+        for aggregate in aggregates:
+            aggregate.update_frame(data)
+    elif len(aggregates) == 1:
+        aggregates[0].update(data)
+    elif isinstance(data, RecordStore):
+        # Хранилище можно читать многократно, и каждый агрегат читает его по колонкам
+        for aggregate in aggregates:
+            aggregate.update(data)
+    else:
+        # Строки читаются один раз, а каждый агрегат обрабатывает их пакетами
+        for batch in batched(data):
+            for aggregate in aggregates:
+                aggregate.update(batch)
+    return aggregates
+
+
+def generate_reports(report_classes, data, top=None, bottom=None):
+    """
+    Generate every report in ``report_classes`` from a single pass over ``data``.
+
+    ``top`` / ``bottom`` keep only the first / last N rows of each report.
+    """
+    if not all(hasattr(report_cls, 'aggregate_class') for report_cls in report_classes):
+        # Отчеты без агрегатов получают данные целиком, поэтому строки читаются один раз в память
+        if not is_frame(data) and len(report_classes) > 1:
+            data = list(data)
+        return [generate_report(report_cls(data), top, bottom) for report_cls in report_classes]
+
+    aggregates = aggregate_reports(report_classes, data)
+    return [
+        generate_report(report_cls(aggregate=aggregate), top, bottom)
+        for report_cls, aggregate in zip(report_classes, aggregates)
+    ]
@@ -0,0 +1,247 @@
+import hashlib
+import os
+import pickle
+import tempfile
+import time
+from itertools import islice
+
+from macro_analysis.chunked import DEFAULT_BATCH_ROWS, batched
+
+# Меняется при изменении формата сохраненных данных
+CACHE_VERSION = 3
+DEFAULT_MAX_BYTES = 1024 ** 3
+# Время изменения файлов идет по грубым часам ядра (на некоторых ФС — с шагом до 2 с),
+# поэтому начало запуска отсчитывается с запасом
+MTIME_SLACK_NS = 2 * 10 ** 9
+
+
+def default_cache_dir() -> str:
+    if os.environ.get('MACRO_ANALYSIS_CACHE_DIR'):
+        return os.environ['MACRO_ANALYSIS_CACHE_DIR']
+    base = os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache')
+    return os.path.join(base, 'macro_analysis')
+
+
+class FileCache:
+    """
+    Persistent cache of parsed input files.
+
+    Entries are pickled to ``directory`` and keyed on the absolute path,
+    modification time and size of the source file (plus a SHA-256 of its
+    content when ``hash_content`` is set), so any change to a file makes
+    its old entry unreachable. Least recently used entries are evicted once
+    the cache grows beyond ``max_bytes``, but only those of earlier runs:
+    entries read or written since this FileCache was created are kept, and
+    once they fill ``max_bytes`` new entries are no longer written. An input
+    set larger than the cache thus keeps hitting on the files that fit
+    instead of evicting each entry before it is read again.
+    """
+
+    def __init__(self, directory=None, max_bytes=DEFAULT_MAX_BYTES, hash_content=False):
+        self.directory = directory or default_cache_dir()
+        self.max_bytes = max_bytes
+        self.hash_content = hash_content
+        # Записи, прочитанные или записанные после этого момента, относятся к текущему запуску
+        self.started_ns = time.time_ns() - MTIME_SLACK_NS
+
+    def key(self, file_path, kind):
+        stat = os.stat(file_path)
+        parts = [str(CACHE_VERSION), kind, os.path.abspath(file_path), str(stat.st_mtime_ns), str(stat.st_size)]
+        if self.hash_content:
+            parts.append(_file_digest(file_path))
+        return hashlib.sha256('\0'.join(parts).encode('utf-8')).hexdigest()
+
+    def get(self, file_path, kind):
+        """Return the cached value for ``file_path`` or None on a miss."""
+        try:
+            entry_path = self._entry_path(self.key(file_path, kind))
+            with open(entry_path, 'rb') as entry:
+                value = pickle.load(entry)
+            # Обновляем время доступа для LRU-вытеснения
+            os.utime(entry_path)
+            return value
+        except Exception:
+            return None
+
+    def put(self, file_path, kind, value):
+        """Store ``value`` for ``file_path``; cache write failures are ignored."""
+        entry = self._open_entry(file_path, kind)
+        if entry is not None and entry.write_value(value):
+            entry.commit()
+
+    def stream(self, file_path, kind, read_rows):
+        """
+        Yield the rows of ``file_path`` without holding the file in memory.
+
+        On a hit the rows are read back from the entry batch by batch. On a
+        miss ``read_rows()`` is iterated and its rows are written to a new
+        entry in batches of chunked.DEFAULT_BATCH_ROWS as they are yielded;
+        the entry is stored only if every row was read and it stayed within
+        ``max_bytes``.
+        """
+        try:
+            entry_path = self._entry_path(self.key(file_path, kind))
+        except OSError:
+            yield from read_rows()
+            return
+
+        yielded = 0
+        try:
+            with open(entry_path, 'rb') as file:
+                os.utime(entry_path)
+                while True:
+                    try:
+                        batch = pickle.load(file)
+                    except EOFError:
+                        return
+                    yield from batch
+                    yielded += len(batch)
+        except FileNotFoundError:
+            pass
+        except (OSError, pickle.UnpicklingError, AttributeError, ValueError):
+            # Поврежденную запись удаляем и дочитываем файл без кэша
+            _unlink(entry_path)
+            yield from islice(read_rows(), yielded, None)
+            return
+
+        entry = self._open_entry(file_path, kind)
+        complete = False
+        try:
+            for batch in batched(read_rows(), DEFAULT_BATCH_ROWS):
+                if entry is not None and not entry.write_value(batch):
+                    entry = None
+                yield from batch
+            complete = True
+        finally:
+            if entry is not None:
+                if complete:
+                    entry.commit()
+                else:
+                    entry.abort()
+
+    def evict(self):
+        """
+        Remove least recently used entries of earlier runs until the cache fits in max_bytes.
+
+        Returns the size of the cache afterwards, which stays above
+        ``max_bytes`` only if the entries of the current run do not fit.
+        """
+        entries = self._stat_entries()
+        total = sum(size for _, size, _ in entries)
+        for mtime_ns, size, path in sorted(entries):
+            if total <= self.max_bytes or mtime_ns >= self.started_ns:
+                break
+            _unlink(path)
+            total -= size
+        return total
+
+    def room(self):
+        """Bytes left for new entries once every entry of earlier runs is evicted."""
+        used = sum(size for mtime_ns, size, _ in self._stat_entries() if mtime_ns >= self.started_ns)
+        return self.max_bytes - used
+
+    def clear(self):
+        for entry in self._entries():
+            try:
+                os.unlink(entry.path)
+            except FileNotFoundError:
+                pass
+
+    def _entries(self):
+        try:
+            with os.scandir(self.directory) as it:
+                return [entry for entry in it if entry.name.endswith('.pickle')]
+        except FileNotFoundError:
+            return []
+
+    def _stat_entries(self):
+        """``(mtime_ns, size, path)`` of every entry."""
+        entries = []
+        for entry in self._entries():
+            try:
+                stat = entry.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime_ns, stat.st_size, entry.path))
+        return entries
+
+    def _entry_path(self, key):
+        return os.path.join(self.directory, f'{key}.pickle')
+
+    def _open_entry(self, file_path, kind):
+        try:
+            entry_path = self._entry_path(self.key(file_path, kind))
+            # Кэш заполнен записями текущего запуска: новую не пишем, чтобы не вытеснять их
+            room = self.room()
+            if room <= 0:
+                return None
+            os.makedirs(self.directory, exist_ok=True)
+            # Пишем во временный файл и переименовываем, чтобы не оставлять битых записей
+            fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+        except OSError:
+            return None
+        return _PendingEntry(self, os.fdopen(fd, 'wb'), tmp_path, entry_path, room)
+
+
+class _EntryTooLarge(Exception):
+    pass
+
+
+class _PendingEntry:
+    """Temporary file of a cache entry that is abandoned once it exceeds ``max_bytes``."""
+
+    def __init__(self, cache, file, tmp_path, entry_path, max_bytes):
+        self.cache = cache
+        self.file = file
+        self.tmp_path = tmp_path
+        self.entry_path = entry_path
+        self.max_bytes = max_bytes
+        self.size = 0
+
+    def write(self, data):
+        self.size += len(data)
+        if self.size > self.max_bytes:
+            raise _EntryTooLarge()
+        return self.file.write(data)
+
+    def write_value(self, value):
+        """Append one pickled value; returns False (and drops the entry) if it cannot be stored."""
+        try:
+            pickle.dump(value, self, protocol=pickle.HIGHEST_PROTOCOL)
+            return True
+        except (OSError, _EntryTooLarge):
+            self.abort()
+            return False
+
+    def commit(self):
+        try:
+            self.file.close()
+            os.replace(self.tmp_path, self.entry_path)
+        except OSError:
+            self.abort()
+            return
+        # Другие процессы того же запуска могли заполнить кэш, пока запись писалась
+        if self.cache.evict() > self.cache.max_bytes:
+            _unlink(self.entry_path)
+
+    def abort(self):
+        try:
+            self.file.close()
+        except OSError:
+            pass
+        _unlink(self.tmp_path)
+
+
+def _unlink(path):
+    try:
+        os.unlink(path)
+    except FileNotFoundError:
+        pass
+
+
+def _file_digest(file_path):
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as file:
+        for block in iter(lambda: file.read(1024 * 1024), b''):
+            digest.update(block)
+    return digest.hexdigest()
@@ -0,0 +1,230 @@
+import heapq
+import os
+import pickle
+import re
+import shutil
+import tempfile
+import zlib
+from itertools import islice
+
+from macro_analysis.selection import generate_report, select_rows
+
+DEFAULT_BATCH_ROWS = 10000
+SPILL_PARTITIONS = 16
+
+# Оценки памяти: строка-словарь в пакете и одна группа (ключ, сумма, счетчик) в агрегате
+ROW_BYTES = 512
+GROUP_BYTES = 256
+
+_SIZE = re.compile(r'^\s*(\d+(?:\.\d+)?)\s*([KMGT]?)(?:i?B)?\s*$', re.IGNORECASE)
+_UNITS = {'': 1, 'K': 1024, 'M': 1024 ** 2, 'G': 1024 ** 3, 'T': 1024 ** 4}
+
+
+def parse_memory_size(text):
+    """``'512M'``, ``'2G'``, ``'1.5GiB'`` or a plain number of bytes -> bytes."""
+    match = _SIZE.match(str(text))
+    if not match:
+        raise ValueError(f"Некорректный размер памяти: {text}")
+    number, unit = match.groups()
+    return int(float(number) * _UNITS[unit.upper()])
+
+
+def batched(rows, batch_rows=DEFAULT_BATCH_ROWS):
+    """Split a row iterator into lists of at most ``batch_rows`` rows."""
+    rows = iter(rows)
+    while True:
+        batch = list(islice(rows, batch_rows))
+        if not batch:
+            return
+        yield batch
+
+
+def key_budget(memory_limit, batch_rows, reports=1, group_bytes=GROUP_BYTES):
+    """How many groups of ``group_bytes`` each of ``reports`` aggregates may hold within ``memory_limit`` bytes."""
+    budget = (memory_limit - batch_rows * ROW_BYTES) // (group_bytes * reports)
+    if budget < 1:
+        raise ValueError(f"Лимит памяти {memory_limit} байт меньше одного пакета из {batch_rows} строк "
+                         f"и одной группы")
+    return budget
+
+
+def group_bytes(aggregate_class):
+    """
+    Estimated memory of one group of ``aggregate_class``.
+
+    Aggregates may define a ``group_bytes()`` classmethod (GroupAggregate
+    does); the default is GROUP_BYTES. Aggregates whose ``keeps_values()``
+    is true grow with every row of a group and cannot be bounded at all.
+    """
+    keeps_values = getattr(aggregate_class, 'keeps_values', None)
+    if keeps_values is not None and keeps_values():
+        raise ValueError("Отчеты с точной медианой хранят все значения групп и не поддерживают "
+                         "--memory-limit; используйте приближенную медиану p50")
+    estimate = getattr(aggregate_class, 'group_bytes', None)
+    return estimate() if estimate is not None else GROUP_BYTES
+
+
+class SpillingAggregate:
+    """
+    Running aggregate that moves its groups to disk when it grows past ``max_keys``.
+
+    Works with aggregates whose ``to_dict()`` maps group keys to values,
+    such as GDPAggregate. Spilled groups are split by key hash into
+    ``partitions`` files, so each partition can later be merged back on
+    its own with a fraction of the memory.
+    """
+
+    def __init__(self, aggregate_class, max_keys, directory=None, partitions=SPILL_PARTITIONS):
+        self.aggregate_class = aggregate_class
+        self.max_keys = max_keys
+        self.directory = directory
+        self.partitions = partitions
+        self.aggregate = aggregate_class()
+        self.spills = 0
+        self._spill_dir = None
+
+    def update(self, rows):
+        self.aggregate.update(rows)
+        if len(self.aggregate) > self.max_keys:
+            self.spill()
+        return self
+
+    def spill(self):
+        if self._spill_dir is None:
+            self._spill_dir = tempfile.mkdtemp(prefix='macro_analysis-', dir=self.directory)
+        parts = [{} for _ in range(self.partitions)]
+        for key, value in self.aggregate.to_dict().items():
+            parts[_partition(key, self.partitions)][key] = value
+        for index, part in enumerate(parts):
+            if part:
+                with open(self._partition_path(index), 'ab') as file:
+                    pickle.dump(part, file, protocol=pickle.HIGHEST_PROTOCOL)
+        self.aggregate = self.aggregate_class()
+        self.spills += 1
+
+    def iter_partitions(self):
+        """
+        Yield the final aggregate as one or more disjoint parts.
+
+        Without spills this is the in-memory aggregate itself; otherwise
+        each disk partition is merged and yielded in turn.
+        """
+        if not self.spills:
+            yield self.aggregate
+            return
+        if len(self.aggregate):
+            self.spill()
+        for index in range(self.partitions):
+            path = self._partition_path(index)
+            if not os.path.exists(path):
+                continue
+            aggregate = self.aggregate_class()
+            with open(path, 'rb') as file:
+                while True:
+                    try:
+                        part = pickle.load(file)
+                    except EOFError:
+                        break
+                    aggregate.merge(self.aggregate_class.from_dict(part))
+            os.unlink(path)
+            yield aggregate
+
+    def close(self):
+        if self._spill_dir is not None:
+            shutil.rmtree(self._spill_dir, ignore_errors=True)
+            self._spill_dir = None
+
+    def _partition_path(self, index):
+        return os.path.join(self._spill_dir, f'partition-{index}.pickle')
+
+
+def _partition(key, partitions):
+    # crc32 не зависит от PYTHONHASHSEED, в отличие от hash()
+    return zlib.crc32(str(key).encode('utf-8')) % partitions
+
+
+def aggregate_chunked(report_classes, rows, memory_limit, batch_rows=DEFAULT_BATCH_ROWS, directory=None):
+    """
+    Fold ``rows`` in batches of ``batch_rows`` into one SpillingAggregate per report.
+
+    The number of groups kept in memory is derived from ``memory_limit``
+    (bytes, see key_budget and group_bytes); groups beyond it are spilled
+    to ``directory``.
+    """
+    size = max(group_bytes(report_cls.aggregate_class) for report_cls in report_classes)
+    max_keys = key_budget(memory_limit, batch_rows, len(report_classes), size)
+    spilling = [SpillingAggregate(report_cls.aggregate_class, max_keys, directory) for report_cls in report_classes]
+    try:
+        for batch in batched(rows, batch_rows):
+            for aggregate in spilling:
+                aggregate.update(batch)
+    except BaseException:
+        for aggregate in spilling:
+            aggregate.close()
+        raise
+    return spilling
+
+
+def generate_chunked(report_cls, spilling, top=None, bottom=None):
+    """
+    Generate a report from a SpillingAggregate.
+
+    Without spills the report is generated as usual. Otherwise each
+    partition is reported separately, written to disk as a sorted run and
+    the runs are merged with the report's ``sort_key``, so the rows are
+    streamed without holding every group in memory. Reports whose rows
+    combine several groups (``row_per_group = False``, such as rollups)
+    get all partitions merged back into one aggregate instead.
+
+    With ``top`` / ``bottom`` every run holds only the first / last N rows
+    of its partition, since the overall first N are among them.
+    """
+    if not spilling.spills:
+        result = generate_report(report_cls(aggregate=spilling.aggregate), top, bottom)
+        spilling.close()
+        return result
+    if not getattr(report_cls, 'row_per_group', True):
+        try:
+            aggregate = spilling.aggregate_class()
+            for part in spilling.iter_partitions():
+                aggregate.merge(part)
+            return generate_report(report_cls(aggregate=aggregate), top, bottom)
+        finally:
+            spilling.close()
+    rows = _merge_runs(report_cls, spilling, top, bottom)
+    if top is None and bottom is None:
+        return rows
+    try:
+        return select_rows(rows, None, top, bottom)
+    finally:
+        rows.close()
+
+
+def _merge_runs(report_cls, spilling, top=None, bottom=None):
+    try:
+        run_paths = []
+        for index, aggregate in enumerate(spilling.iter_partitions()):
+            run_path = os.path.join(spilling._spill_dir, f'run-{index}.pickle')
+            with open(run_path, 'wb') as file:
+                for row in generate_report(report_cls(aggregate=aggregate), top, bottom):
+                    pickle.dump(row, file, protocol=pickle.HIGHEST_PROTOCOL)
+            run_paths.append(run_path)
+
+        runs = [_read_run(path) for path in run_paths]
+        sort_key = getattr(report_cls, 'sort_key', None)
+        if sort_key is None:
+            for run in runs:
+                yield from run
+        else:
+            yield from heapq.merge(*runs, key=sort_key)
+    finally:
+        spilling.close()
+
+
+def _read_run(path):
+    with open(path, 'rb') as file:
+        while True:
+            try:
+                yield pickle.load(file)
+            except EOFError:
+                return
@@ -1,42 +1,207 @@
 import argparse
-import tabulate
+import os
+import sys
+from importlib import import_module
+
+from macro_analysis.batch import generate_reports, merge_columns
+from macro_analysis.cache import DEFAULT_MAX_BYTES, FileCache
+from macro_analysis.chunked import DEFAULT_BATCH_ROWS, aggregate_chunked, generate_chunked, parse_memory_size
+from macro_analysis.filters import parse_filters
+from macro_analysis.incremental import IncrementalState
 from macro_analysis.loader import DataLoader
+from macro_analysis.profiling import NullProfiler, Profiler, peak_memory_bytes
 from macro_analysis.registry import ReportRegistry
+from macro_analysis.selection import generate_report
+from macro_analysis.writers import FORMATS, write_results
 
+# Подкоманды и модули с их функцией main(argv)
+COMMANDS = {
+    'serve': 'macro_analysis.server',
+    'convert': 'macro_analysis.convert',
+}
 
-def main():
-    parser = argparse.ArgumentParser(description='Макроэкономический анализ')
-    parser.add_argument('--files', nargs='+', required=True, help='Список CSV файлов')
-    parser.add_argument('--report', required=True, help='Тип отчета')
 
-    args = parser.parse_args()
+def build_parser():
+    parser = argparse.ArgumentParser(description='Макроэкономический анализ',
+                                     epilog='Подкоманды: serve, convert (macro-analysis <подкоманда> --help)')
+    parser.add_argument('--files', nargs='+',
+                        help='Список файлов: CSV (в том числе сжатые), Parquet или Arrow IPC')
+    parser.add_argument('--report', action='append',
+                        help='Тип отчета; можно повторять или указать all, '
+                             'все отчеты считаются за один проход по данным')
+    parser.add_argument('--loader', choices=['csv', 'mmap', 'columnar'], default='csv',
+                        help='Способ загрузки: построчный csv, mmap-сканер только нужных колонок '
+                             'или колоночный pandas')
+    parser.add_argument('--where', action='append', default=[], metavar='УСЛОВИЕ',
+                        help='Фильтр строк при загрузке, например "year>=2020" или "continent=Europe"; '
+                             'можно повторять')
+    parser.add_argument('--jobs', type=int, default=1,
+                        help='Количество процессов для параллельного чтения файлов')
+    parser.add_argument('--concurrency', type=int,
+                        help='Асинхронная загрузка: сколько файлов открывать и читать одновременно '
+                             '(для сетевых файловых систем; заменяет --jobs для csv и mmap)')
+    parser.add_argument('--no-cache', action='store_true',
+                        help='Не использовать кэш разобранных файлов')
+    parser.add_argument('--cache-dir', help='Каталог кэша разобранных файлов')
+    parser.add_argument('--cache-max-bytes', metavar='РАЗМЕР',
+                        help='Предельный размер кэша, например 512M или 10G (по умолчанию 1G)')
+    parser.add_argument('--state',
+                        help='Файл состояния для инкрементального пересчета только измененных файлов')
+    parser.add_argument('--format', choices=FORMATS, default='grid',
+                        help='Формат вывода: таблица grid, csv, jsonl или parquet')
+    parser.add_argument('--output', help='Файл для записи результата (по умолчанию stdout)')
+    parser.add_argument('--profile', action='store_true',
+                        help='Вывести в stderr время этапов, скорость чтения и пиковую память')
+    parser.add_argument('--profile-json', help='Сохранить профиль выполнения в JSON файл')
+    parser.add_argument('--cprofile', help='Сохранить статистику cProfile в файл')
+    parser.add_argument('--memory-limit', metavar='РАЗМЕР',
+                        help='Пакетная обработка с ограничением памяти, например 512M или 2G; '
+                             'группы сверх лимита сбрасываются на диск')
+    parser.add_argument('--batch-rows', type=int, default=DEFAULT_BATCH_ROWS,
+                        help='Количество строк в пакете при --memory-limit')
+    parser.add_argument('--spill-dir', help='Каталог для временных файлов при --memory-limit')
+    limit = parser.add_mutually_exclusive_group()
+    limit.add_argument('--top', type=int, metavar='N',
+                       help='Вывести только первые N строк каждого отчета (например, N стран '
+                            'с наибольшим средним ВВП)')
+    limit.add_argument('--bottom', type=int, metavar='N',
+                       help='Вывести только последние N строк каждого отчета')
+    parser.add_argument('--list-reports', action='store_true',
+                        help='Вывести список доступных отчетов, включая отчеты из плагинов')
+    return parser
 
-    try:
-        loader = DataLoader()
-        data = loader.load_files(args.files)
 
-        report_cls = ReportRegistry.get_report(args.report)
+def resolve_reports(names):
+    """Expand ``all``, drop duplicates and look up report classes in the registry."""
+    report_names = []
+    for name in names:
+        for expanded in (ReportRegistry.names() if name == 'all' else [name]):
+            if expanded not in report_names:
+                report_names.append(expanded)
+
+    report_classes = []
+    for name in report_names:
+        report_cls = ReportRegistry.get_report(name)
         if not report_cls:
-            raise ValueError(f"Неизвестный тип отчета: {args.report}")
+            raise ValueError(f"Неизвестный тип отчета: {name}")
+        report_classes.append(report_cls)
+    return report_names, report_classes
+
+
+def make_reader(args, report_classes, filters, profiler):
+    """Return a function that loads a list of files with the selected loader."""
+    cache = None
+    if not args.no_cache:
+        max_bytes = parse_memory_size(args.cache_max_bytes) if args.cache_max_bytes else DEFAULT_MAX_BYTES
+        cache = FileCache(args.cache_dir, max_bytes=max_bytes)
+    # Загрузчик разбирает только колонки, объявленные отчетами
+    columns = merge_columns(report_classes)
+
+    if args.loader == 'columnar':
+        # pandas импортируется только для колоночного загрузчика
+        from macro_analysis.columnar import ColumnarLoader
+
+        loader = ColumnarLoader(workers=args.jobs, cache=cache, columns=columns, filters=filters)
+
+        def read(file_paths):
+            with profiler.span('load'):
+                frame = loader.load_files(file_paths)
+            profiler.rows += len(frame)
+            return frame
+    else:
+        if args.concurrency:
+            from macro_analysis.async_loader import AsyncDataLoader
+
+            loader = AsyncDataLoader(args.concurrency, cache=cache, engine=args.loader,
+                                     columns=columns, filters=filters)
+        else:
+            loader = DataLoader(workers=args.jobs, cache=cache, engine=args.loader,
+                                columns=columns, filters=filters)
+
+        def read(file_paths):
+            return profiler.iter_span('load', loader.iter_rows(file_paths))
+
+    return read
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    if argv[:1] and argv[0] in COMMANDS:
+        return import_module(COMMANDS[argv[0]]).main(argv[1:])
+
+    parser = build_parser()
+    args = parser.parse_args(argv)
+
+    if args.list_reports:
+        print('\n'.join(ReportRegistry.names()))
+        return
+    for option, value in (('--files', args.files), ('--report', args.report)):
+        if not value:
+            parser.error(f"the following arguments are required: {option}")
+
+    if args.profile or args.profile_json or args.cprofile:
+        profiler = Profiler(cprofile=bool(args.cprofile))
+    else:
+        profiler = NullProfiler()
+
+    try:
+        report_names, report_classes = resolve_reports(args.report)
+
+        filters = parse_filters(args.where)
+        memory_limit = None
+        if args.memory_limit:
+            if args.loader == 'columnar' or args.state:
+                raise ValueError("--memory-limit нельзя сочетать с --loader columnar и --state")
+            memory_limit = parse_memory_size(args.memory_limit)
+        read = make_reader(args, report_classes, filters, profiler)
+        profiler.add_files(args.files)
+
+        if args.state:
+            state = IncrementalState(args.state, report_names, filters).load()
+            with profiler.span('aggregate'):
+                aggregates = state.aggregate(report_classes, args.files, lambda path: read([path]))
+                results = [
+                    generate_report(report_cls(aggregate=aggregate), args.top, args.bottom)
+                    for report_cls, aggregate in zip(report_classes, aggregates)
+                ]
+            state.save()
+        elif memory_limit:
+            data = read(args.files)
+            with profiler.span('aggregate'):
+                spilling = aggregate_chunked(report_classes, data, memory_limit, args.batch_rows, args.spill_dir)
+                results = [
+                    generate_chunked(report_cls, aggregate, args.top, args.bottom)
+                    for report_cls, aggregate in zip(report_classes, spilling)
+                ]
+        else:
+            data = read(args.files)
+            with profiler.span('aggregate'):
+                results = generate_reports(report_classes, data, args.top, args.bottom)
 
-        report = report_cls(data)
-        result = report.generate()
+        with profiler.span('render'):
+            write_results(list(zip(report_names, results)), args.format, args.output)
 
-        # Добавляем нумерацию строк
-        numbered_result = []
-        for idx, row in enumerate(result, 1):
-            numbered_row = {'№': idx, **row}
-            # Заменяем None на "Н/Д" для отображения
-            if numbered_row['Средний ВВП'] is None:
-                numbered_row['Средний ВВП'] = "Н/Д"
-            numbered_result.append(numbered_row)
+        if memory_limit:
+            peak = peak_memory_bytes()
+            spills = sum(aggregate.spills for aggregate in spilling)
+            print(f"Пиковая память: {'н/д' if peak is None else f'{peak / 1024 ** 2:.1f} МБ'}, "
+                  f"сбросов на диск: {spills}", file=sys.stderr)
 
-        # Выводим с нумерацией
-        print(tabulate.tabulate(numbered_result, headers='keys', tablefmt='grid'))
+        profiler.finish()
+        if args.profile:
+            print(profiler.format(), file=sys.stderr)
+        if args.profile_json:
+            profiler.to_json(args.profile_json)
+        if args.cprofile:
+            profiler.dump_cprofile(args.cprofile)
 
+    except BrokenPipeError:
+        # Получатель вывода (например, head) закрыл канал раньше времени
+        devnull = os.open(os.devnull, os.O_WRONLY)
+        os.dup2(devnull, sys.stdout.fileno())
     except Exception as e:
         print(f"Ошибка: {str(e)}")
 
 
 if __name__ == '__main__':
-    main()
\ No newline at end of file
+    main()
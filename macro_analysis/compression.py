@@ -0,0 +1,107 @@
+import bz2
+import gzip
+import io
+import lzma
+import os
+
+# Сигнатуры сжатых файлов
+MAGIC = {
+    b'\x1f\x8b': 'gzip',
+    b'\x28\xb5\x2f\xfd': 'zstd',
+    b'\xfd7zXZ\x00': 'xz',
+    b'BZh': 'bz2',
+}
+EXTENSIONS = {
+    '.gz': 'gzip',
+    '.gzip': 'gzip',
+    '.zst': 'zstd',
+    '.zstd': 'zstd',
+    '.xz': 'xz',
+    '.bz2': 'bz2',
+}
+MAGIC_BYTES = max(len(magic) for magic in MAGIC)
+
+
+def detect_compression(file_path):
+    """
+    Return 'gzip', 'zstd', 'xz' or 'bz2' for a compressed file, None for plain text.
+
+    The extension is checked first; files without a known extension are
+    recognized by their magic bytes.
+    """
+    compression = compression_by_extension(file_path)
+    if compression is not None:
+        return compression
+    with open(file_path, 'rb') as file:
+        return compression_by_magic(file.read(MAGIC_BYTES))
+
+
+def compression_by_extension(file_path):
+    return EXTENSIONS.get(os.path.splitext(str(file_path))[1].lower())
+
+
+def compression_by_magic(head):
+    """Compression recognized from the first bytes of a file, None for plain text."""
+    for magic, name in MAGIC.items():
+        if head.startswith(magic):
+            return name
+    return None
+
+
+def open_binary(file_path, compression=None):
+    """Open ``file_path`` for reading, decompressing ``compression`` on the fly."""
+    if compression is None:
+        return open(file_path, 'rb')
+    if compression == 'gzip':
+        return gzip.open(file_path, 'rb')
+    if compression == 'xz':
+        return lzma.open(file_path, 'rb')
+    if compression == 'bz2':
+        return bz2.open(file_path, 'rb')
+    if compression == 'zstd':
+        return _open_zstd(file_path)
+    raise ValueError(f"Неизвестный формат сжатия: {compression}")
+
+
+def open_input(file_path):
+    """
+    Open a plain or compressed file as a binary stream of its content.
+
+    Unless the extension names the compression, the magic bytes are peeked
+    from the same handle that is then read, so a plain file is opened only
+    once (on network file systems every open costs a round trip).
+    """
+    compression = compression_by_extension(file_path)
+    if compression is None:
+        file = open(file_path, 'rb')
+        compression = compression_by_magic(file.peek(MAGIC_BYTES))
+        if compression is None:
+            return file
+        file.close()
+    return open_binary(file_path, compression)
+
+
+def open_text(file_path, newline=None):
+    """
+    Open a plain or compressed UTF-8 file as a text stream.
+
+    Compressed files are decompressed while they are read, so nothing is
+    written to disk and only a small buffer is held in memory.
+    """
+    return io.TextIOWrapper(open_input(file_path), encoding='utf-8', newline=newline)
+
+
+def _open_zstd(file_path):
+    try:
+        # Python 3.14+
+        from compression import zstd
+        return zstd.open(file_path, 'rb')
+    except ImportError:
+        pass
+    try:
+        import zstandard
+    except ImportError:
+        raise ImportError("Для файлов zstd требуется пакет zstandard (pip install macro_analysis[zstd])")
+    file = open(file_path, 'rb')
+    reader = zstandard.ZstdDecompressor().stream_reader(file, read_across_frames=True, closefd=True)
+    return io.BufferedReader(reader)
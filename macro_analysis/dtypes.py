@@ -0,0 +1,59 @@
+import sys
+from collections.abc import Mapping
+
+
+def parse_float(value):
+    """Return ``float(value)``, or None for missing and malformed values."""
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def parse_int(value):
+    """Return ``int(value)``, or None for missing and malformed values."""
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def is_frame(data):
+    """Return True if ``data`` is a pandas DataFrame, without importing pandas."""
+    # Если pandas еще не импортирован, DataFrame создать было нечем
+    pandas = sys.modules.get('pandas')
+    return pandas is not None and isinstance(data, pandas.DataFrame)
+
+
+# Поддерживаемые типы колонок и функции разбора (None — оставить строку как есть)
+PARSERS = {
+    str: None,
+    float: parse_float,
+    int: parse_int,
+}
+
+
+def normalize_columns(columns):
+    """
+    Turn a column declaration into a ``{name: dtype}`` dict.
+
+    ``columns`` may be None (all columns, no conversion), an iterable of
+    names (kept as strings) or a mapping of names to str, float or int.
+    """
+    if columns is None:
+        return None
+    if isinstance(columns, Mapping):
+        dtypes = dict(columns)
+    else:
+        dtypes = {name: str for name in columns}
+    for name, dtype in dtypes.items():
+        if dtype not in PARSERS:
+            raise ValueError(f"Неподдерживаемый тип колонки {name}: {dtype}")
+    return dtypes
+
+
+def column_key(columns):
+    """Stable text form of a column declaration, used in cache keys."""
+    if columns is None:
+        return '*'
+    return ','.join(f'{name}:{dtype.__name__}' for name, dtype in normalize_columns(columns).items())
@@ -0,0 +1,109 @@
+import operator
+import re
+
+from macro_analysis.dtypes import parse_float
+
+OPERATORS = {
+    '>=': operator.ge,
+    '<=': operator.le,
+    '!=': operator.ne,
+    '==': operator.eq,
+    '=': operator.eq,
+    '>': operator.gt,
+    '<': operator.lt,
+}
+
+_EXPRESSION = re.compile(r'^\s*([^<>=!\s]+)\s*(>=|<=|!=|==|=|>|<)\s*([^<>=!\s].*?)\s*$')
+
+
+class Filter:
+    """
+    Row predicate ``column <op> value`` such as ``year>=2020`` or ``continent=Europe``.
+
+    Values that look like numbers are compared numerically, anything else as
+    text. Rows where the column is missing or not comparable never match.
+    """
+
+    def __init__(self, column, op, value):
+        if op not in OPERATORS:
+            raise ValueError(f"Неизвестный оператор фильтра: {op}")
+        self.column = column
+        self.op = op
+        self.value = value
+        self.number = parse_float(value)
+        self._compare = OPERATORS[op]
+
+    def __repr__(self):
+        return f'Filter({self})'
+
+    def __str__(self):
+        return f'{self.column}{self.op}{self.value}'
+
+    @classmethod
+    def parse(cls, expression):
+        match = _EXPRESSION.match(expression)
+        if not match:
+            raise ValueError(f"Некорректное условие фильтра: {expression}")
+        return cls(*match.groups())
+
+    def test(self, raw):
+        """Check a single field value (str, bytes, number or None)."""
+        if raw is None:
+            return False
+        if self.number is not None:
+            number = parse_float(raw)
+            return number is not None and self._compare(number, self.number)
+        if isinstance(raw, bytes):
+            raw = raw.decode('utf-8')
+        return self._compare(str(raw), self.value)
+
+    def matches(self, row):
+        return self.test(row.get(self.column))
+
+    def mask(self, frame):
+        """Vectorized check of every row of a DataFrame; returns a boolean Series."""
+        import pandas as pd
+
+        if self.column not in frame:
+            return pd.Series(False, index=frame.index)
+        column = frame[self.column]
+        if self.number is not None:
+            numbers = pd.to_numeric(column, errors='coerce')
+            return self._compare(numbers, self.number).fillna(False).astype(bool)
+        return self._compare(column.astype(str), self.value) & column.notna()
+
+    def may_match(self, minimum, maximum):
+        """
+        Whether any value between ``minimum`` and ``maximum`` can match.
+
+        Used with Parquet row-group statistics. Bounds that are not
+        comparable with the filter value (text bounds for a numeric filter
+        and vice versa) always give True.
+        """
+        if self.number is not None:
+            if not all(isinstance(bound, (int, float)) and not isinstance(bound, bool)
+                       for bound in (minimum, maximum)):
+                return True
+            value = self.number
+        else:
+            if not (isinstance(minimum, str) and isinstance(maximum, str)):
+                return True
+            value = self.value
+
+        if self.op in ('=', '=='):
+            return minimum <= value <= maximum
+        if self.op == '!=':
+            return not minimum == maximum == value
+        if self.op in ('>', '>='):
+            return self._compare(maximum, value)
+        return self._compare(minimum, value)
+
+
+def parse_filters(filters):
+    """Turn expressions (or Filter objects) into a list of Filter objects."""
+    return [item if isinstance(item, Filter) else Filter.parse(item) for item in filters or ()]
+
+
+def filter_key(filters):
+    """Stable text form of a filter list, used in cache keys."""
+    return '&'.join(str(item) for item in parse_filters(filters))
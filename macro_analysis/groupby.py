@@ -0,0 +1,493 @@
+import json
+import re
+import statistics
+from math import isnan
+
+from macro_analysis.chunked import GROUP_BYTES
+from macro_analysis.columnar import SCHEMA
+from macro_analysis.dtypes import is_frame, parse_float
+from macro_analysis.records import RecordStore
+from macro_analysis.selection import select_rows
+from macro_analysis.sketches import DEFAULT_ERROR, KLLSketch, k_for_error, max_items
+
+FUNCTIONS = ['mean', 'weighted_mean', 'median', 'min', 'max', 'sum', 'count']
+# Приближенные квантили: p50 — медиана, p90 — 90-й перцентиль и т. д.
+QUANTILE_FUNCTION = re.compile(r'p(\d{1,2}(?:\.\d+)?)')
+
+# Сколько строк собирается в DataFrame перед векторной агрегацией
+FRAME_BATCH_ROWS = 65536
+
+KEY_LABELS = {
+    'country': 'Страна',
+    'continent': 'Континент',
+    'year': 'Год',
+}
+METRIC_LABELS = {
+    'gdp': 'ВВП',
+    'gdp_growth': 'Рост ВВП',
+    'inflation': 'Инфляция',
+    'unemployment': 'Безработица',
+    'population': 'Население',
+}
+FUNCTION_LABELS = {
+    'mean': 'среднее',
+    'median': 'медиана',
+    'min': 'мин',
+    'max': 'макс',
+    'sum': 'сумма',
+    'count': 'количество',
+    'weighted_mean': 'взвешенное среднее',
+    'p50': 'медиана, прибл.',
+}
+WORLD_LABEL = 'Мир'
+
+# Память на метрику группы и на одно значение в списке или скетче (float и ссылка на него)
+METRIC_BYTES = 120
+VALUE_BYTES = 32
+
+# Частичное состояние метрики в группе:
+# [сумма, количество, минимум, максимум, сумма значение*вес, сумма весов, значения, скетч квантилей]
+SUM, COUNT, MIN, MAX, WSUM, WEIGHT, VALUES, SKETCH = range(8)
+
+
+def quantile_fraction(function):
+    """Fraction of a quantile function such as ``'p90'`` (0.9), or None for other functions."""
+    match = QUANTILE_FUNCTION.fullmatch(function)
+    return float(match.group(1)) / 100 if match else None
+
+
+class GroupAggregate:
+    """
+    Mergeable partial aggregate of ``metrics`` columns grouped by ``keys``.
+
+    Every group keeps sum, count, min and max per metric, which is enough
+    for mean/min/max/sum/count and merges exactly. Metrics that need the
+    exact median also keep their values; approximate quantiles (``p50``,
+    ``p90``, ...) keep a KLLSketch of constant size with rank error
+    ``quantile_error`` instead. Metrics listed in ``weights``
+    (``{column: weight column}``, e.g. inflation weighted by population)
+    also keep the sums of value*weight and of weights. Frames are
+    aggregated with one pandas groupby over all metric columns; rows are
+    collected into frames in batches of FRAME_BATCH_ROWS. Groups are kept
+    in order of first appearance.
+
+    Subclasses set ``keys`` (tuple of column names), ``metrics``
+    (``{column: functions}``) and ``weights``; GroupByReport does this for
+    each report.
+    """
+
+    keys = ()
+    metrics = {}
+    weights = {}
+    quantile_error = DEFAULT_ERROR
+
+    def __init__(self):
+        self.groups = {}
+        self._keep_values = {name for name, functions in self.metrics.items() if 'median' in functions}
+        self._sketched = {
+            name for name, functions in self.metrics.items()
+            if any(quantile_fraction(function) is not None for function in functions)
+        }
+
+    def __len__(self):
+        return len(self.groups)
+
+    @classmethod
+    def keeps_values(cls):
+        """Whether group state grows with the rows: the exact median keeps every value."""
+        return any('median' in functions for functions in cls.metrics.values())
+
+    @classmethod
+    def group_bytes(cls):
+        """Estimated memory of one group, used by --memory-limit budgets (see chunked.group_bytes)."""
+        sketches = sum(
+            any(quantile_fraction(function) is not None for function in functions)
+            for functions in cls.metrics.values()
+        )
+        return GROUP_BYTES + METRIC_BYTES * len(cls.metrics) + sketches * VALUE_BYTES * max_items(cls.quantile_error)
+
+    def __eq__(self, other):
+        if not isinstance(other, GroupAggregate):
+            return NotImplemented
+        return self.keys == other.keys and self.groups == other.groups
+
+    def _group(self, key):
+        group = self.groups.get(key)
+        if group is None:
+            group = self.groups[key] = {
+                name: [0.0, 0, None, None, 0.0, 0.0, [] if name in self._keep_values else None,
+                       KLLSketch(self.quantile_error) if name in self._sketched else None]
+                for name in self.metrics
+            }
+        return group
+
+    def add_row(self, row):
+        key = tuple(row.get(name) for name in self.keys)
+        if any(value is None or value == '' for value in key):
+            return
+        group = self._group(key)
+        for name, state in group.items():
+            value = parse_float(row.get(name))
+            if value is None or isnan(value):
+                continue
+            _add_value(state, value)
+            if name in self.weights:
+                weight = parse_float(row.get(self.weights[name]))
+                if weight is not None and not isnan(weight):
+                    state[WSUM] += value * weight
+                    state[WEIGHT] += weight
+
+    def update(self, rows):
+        if is_frame(rows):
+            return self.update_frame(rows)
+        if isinstance(rows, RecordStore):
+            return self.update_store(rows)
+        import pandas as pd
+        from macro_analysis.chunked import batched
+
+        names = self._columns()
+        for batch in batched(rows, FRAME_BATCH_ROWS):
+            self.update_frame(pd.DataFrame.from_records(batch, columns=names))
+        return self
+
+    def update_store(self, store):
+        """Update from a RecordStore, building one frame from its columns."""
+        import pandas as pd
+
+        names = [name for name in self._columns() if name in store.fieldnames]
+        return self.update_frame(pd.DataFrame({name: store.column(name) for name in names}))
+
+    def update_frame(self, frame):
+        """Vectorized update: one groupby computing every metric of every group."""
+        import pandas as pd
+
+        if len(frame) == 0 or any(name not in frame for name in self.keys):
+            return self
+        metrics = [name for name in self.metrics if name in frame]
+        values = pd.DataFrame({name: pd.to_numeric(frame[name], errors='coerce') for name in metrics},
+                              index=frame.index)
+        # Пустые ключи, как и отсутствующие, в группы не попадают
+        keys = [frame[name].mask(frame[name] == '') for name in self.keys]
+        grouped = values.groupby(keys, sort=False, dropna=True)
+
+        stats = grouped.agg(['sum', 'count', 'min', 'max']) if metrics else grouped.size().to_frame('size')
+        table = stats.to_numpy(dtype='float64') if metrics else None
+        weighted = self._weighted_sums(frame, values, keys, [name for name in metrics if name in self.weights])
+        lists = {name: self._group_values(grouped, values[name], len(stats))
+                 for name in metrics if name in self._keep_values | self._sketched}
+
+        for position, key in enumerate(stats.index):
+            key = key if isinstance(key, tuple) else (key,)
+            group = self._group(key)
+            for column, name in enumerate(metrics):
+                total, count, minimum, maximum = table[position, 4 * column:4 * column + 4]
+                if not count:
+                    continue
+                wsum, weight = weighted[name][position] if name in weighted else (0.0, 0.0)
+                partial = [float(total), int(count), float(minimum), float(maximum), float(wsum), float(weight),
+                           lists[name][position] if name in self._keep_values else None, None]
+                _merge_state(group[name], partial)
+                if name in self._sketched:
+                    group[name][SKETCH].extend(lists[name][position])
+        return self
+
+    def _columns(self):
+        names = list(self.keys) + list(self.metrics)
+        return names + [name for name in dict.fromkeys(self.weights.values()) if name not in names]
+
+    def _weighted_sums(self, frame, values, keys, metrics):
+        """Per-group ``(sum of value*weight, sum of weights)`` arrays for weighted ``metrics``."""
+        import pandas as pd
+
+        if not metrics:
+            return {}
+        columns = {}
+        for name in metrics:
+            weight_name = self.weights[name]
+            if weight_name in frame:
+                weight = pd.to_numeric(frame[weight_name], errors='coerce')
+            else:
+                weight = pd.Series(float('nan'), index=frame.index)
+            # Учитываются только строки, где есть и значение, и вес
+            both = values[name].notna() & weight.notna()
+            columns[(name, WSUM)] = (values[name] * weight).where(both)
+            columns[(name, WEIGHT)] = weight.where(both)
+        sums = pd.DataFrame(columns, index=frame.index).groupby(keys, sort=False, dropna=True).sum()
+        return {name: sums[[(name, WSUM), (name, WEIGHT)]].to_numpy(dtype='float64') for name in metrics}
+
+    def rollup(self, depth):
+        """
+        Aggregate grouped by the first ``depth`` keys, derived from this one's groups.
+
+        No rows are read again: the partial states of the groups sharing a
+        key prefix are merged, so every level of a hierarchy is exact.
+        ``depth=0`` gives a single group with the key ``()``.
+        """
+        parent = self.__class__()
+        parent.keys = self.keys[:depth]
+        for key, group in self.groups.items():
+            target = parent._group(key[:depth])
+            for name, state in group.items():
+                _merge_state(target[name], state)
+        return parent
+
+    @staticmethod
+    def _group_values(grouped, column, size):
+        """Non-missing values of ``column`` as one list per group, in group order."""
+        import numpy as np
+
+        # Строки без ключа получают номер группы NaN
+        codes = grouped.ngroup().to_numpy(dtype='float64')
+        values = column.to_numpy(dtype='float64')
+        valid = ~np.isnan(codes) & ~np.isnan(values)
+        codes, values = codes[valid].astype('int64'), values[valid]
+        order = np.argsort(codes, kind='stable')
+        bounds = np.cumsum(np.bincount(codes, minlength=size))[:-1]
+        return [part.tolist() for part in np.split(values[order], bounds)]
+
+    def merge(self, other):
+        for key, group in other.groups.items():
+            target = self._group(key)
+            for name, state in group.items():
+                if name in target:
+                    _merge_state(target[name], state)
+        return self
+
+    def results(self):
+        """Yield ``(key, {(metric, function): value})`` for every group."""
+        for key, group in self.groups.items():
+            values = {}
+            for name, functions in self.metrics.items():
+                state = group[name]
+                for function in functions:
+                    values[(name, function)] = _finalize(state, function)
+            yield key, values
+
+    def to_dict(self):
+        """Serialize to a JSON-compatible ``{group key: {metric: state}}`` mapping."""
+        return {
+            json.dumps(list(key), ensure_ascii=False): {
+                name: list(state[:VALUES]) + [
+                    list(state[VALUES]) if state[VALUES] is not None else None,
+                    state[SKETCH].to_dict() if state[SKETCH] is not None else None,
+                ]
+                for name, state in group.items()
+            }
+            for key, group in self.groups.items()
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        aggregate = cls()
+        for key, group in data.items():
+            target = aggregate._group(tuple(json.loads(key)))
+            for name, state in group.items():
+                if name in target:
+                    values = list(state[VALUES]) if len(state) > VALUES and state[VALUES] is not None else None
+                    sketch = target[name][SKETCH]
+                    if sketch is not None and len(state) > SKETCH and state[SKETCH] is not None:
+                        sketch = KLLSketch.from_dict(state[SKETCH])
+                    target[name][:] = [float(state[SUM]), int(state[COUNT]), state[MIN], state[MAX],
+                                       float(state[WSUM]), float(state[WEIGHT]),
+                                       values if name in aggregate._keep_values else None, sketch]
+        return aggregate
+
+
+def _add_value(state, value):
+    state[SUM] += value
+    state[COUNT] += 1
+    state[MIN] = value if state[MIN] is None else min(state[MIN], value)
+    state[MAX] = value if state[MAX] is None else max(state[MAX], value)
+    if state[VALUES] is not None:
+        state[VALUES].append(value)
+    if state[SKETCH] is not None:
+        state[SKETCH].update(value)
+
+
+def _merge_state(state, other):
+    if not other[COUNT]:
+        return
+    state[SUM] += other[SUM]
+    state[COUNT] += other[COUNT]
+    state[MIN] = other[MIN] if state[MIN] is None else min(state[MIN], other[MIN])
+    state[MAX] = other[MAX] if state[MAX] is None else max(state[MAX], other[MAX])
+    state[WSUM] += other[WSUM]
+    state[WEIGHT] += other[WEIGHT]
+    if state[VALUES] is not None and other[VALUES] is not None:
+        state[VALUES].extend(other[VALUES])
+    if state[SKETCH] is not None and other[SKETCH] is not None:
+        state[SKETCH].merge(other[SKETCH])
+
+
+def _finalize(state, function):
+    count = state[COUNT]
+    if function == 'count':
+        return count
+    if function == 'sum':
+        return state[SUM]
+    if not count:
+        return None
+    if function == 'mean':
+        return state[SUM] / count
+    if function == 'weighted_mean':
+        return state[WSUM] / state[WEIGHT] if state[WEIGHT] else None
+    if function == 'min':
+        return state[MIN]
+    if function == 'max':
+        return state[MAX]
+    if function == 'median':
+        return statistics.median(state[VALUES])
+    fraction = quantile_fraction(function)
+    if fraction is not None:
+        return state[SKETCH].quantile(fraction)
+    raise ValueError(f"Неизвестная функция агрегации: {function}")
+
+
+class GroupByReport:
+    """
+    Base class for reports defined on GroupAggregate.
+
+    A report lists its group ``keys``, the ``metrics`` to compute
+    (``{column: (function, ...)}`` with functions from FUNCTIONS), the
+    ``weights`` column of every metric with ``weighted_mean`` and
+    optionally ``labels`` for output columns (``{column or (column,
+    function): label}``) and ``sort_by`` (``(column, function)``, sorted
+    descending; groups without a value go last). ``quantile_error`` is the
+    rank error of approximate quantile functions. The loader columns and
+    the aggregate class are derived from them.
+    """
+
+    keys = ('country',)
+    metrics = {}
+    weights = {}
+    labels = {}
+    sort_by = None
+    quantile_error = DEFAULT_ERROR
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        for name, functions in cls.metrics.items():
+            for function in functions:
+                if function not in FUNCTIONS and quantile_fraction(function) is None:
+                    raise ValueError(f"Неизвестная функция агрегации: {function}")
+                if function == 'weighted_mean' and name not in cls.weights:
+                    raise ValueError(f"Для взвешенного среднего не задан вес: {name}")
+        k_for_error(cls.quantile_error)
+        if cls.sort_by is None:
+            cls.sort_key = None
+        cls.columns = {name: SCHEMA.get(name, str) for name in cls.keys}
+        cls.columns.update({name: float for name in list(cls.metrics) + list(cls.weights.values())})
+        # Класс агрегата доступен по пути Report.aggregate_class, поэтому его можно сериализовать pickle
+        cls.aggregate_class = type(f'{cls.__name__}Aggregate', (GroupAggregate,), {
+            'keys': tuple(cls.keys),
+            'metrics': {name: tuple(functions) for name, functions in cls.metrics.items()},
+            'weights': dict(cls.weights),
+            'quantile_error': cls.quantile_error,
+            '__module__': cls.__module__,
+            '__qualname__': f'{cls.__qualname__}.aggregate_class',
+        })
+
+    def __init__(self, data=(), aggregate=None):
+        self.data = data
+        self.aggregate = aggregate
+
+    def aggregate_data(self):
+        """Fold the report data into a new aggregate in a single pass."""
+        return self.aggregate_class().update(self.data)
+
+    @classmethod
+    def label(cls, name, function=None):
+        if function is None:
+            return cls.labels.get(name, KEY_LABELS.get(name, name))
+        default = f"{METRIC_LABELS.get(name, name)} ({FUNCTION_LABELS.get(function, f'{function}, прибл.')})"
+        return cls.labels.get((name, function), default)
+
+    def generate(self, top=None, bottom=None):
+        """
+        Calculate the metrics of every group.
+
+        ``top`` / ``bottom`` keep only the first / last N rows (see
+        selection.select_rows).
+
+        Returns:
+            List of dictionaries with the group key columns and one column
+            per metric and function, sorted by ``sort_by`` if it is set
+        """
+        aggregate = self.aggregate if self.aggregate is not None else self.aggregate_data()
+        return select_rows(self._rows(aggregate), self.sort_key, top, bottom)
+
+    def _rows(self, aggregate):
+        key_labels = [self.label(name) for name in self.keys]
+        for key, values in aggregate.results():
+            row = dict(zip(key_labels, key))
+            for (name, function), value in values.items():
+                row[self.label(name, function)] = value
+            yield row
+
+    @classmethod
+    def sort_key(cls, row):
+        value = row[cls.label(*cls.sort_by)]
+        # Группы без значения — в конце
+        return (value is None, -value if value is not None else 0)
+
+
+class RollupReport(GroupByReport):
+    """
+    Group-by report over nested ``keys`` that also reports every higher level.
+
+    With ``keys = ('continent', 'country')`` the leaf aggregate is computed
+    once from the rows; continent totals are derived from the countries and
+    the world total from the continents (see GroupAggregate.rollup). Rows
+    come in hierarchical order: the world, then each group followed by its
+    subgroups. ``levels`` lists the depths to output (0 is the world, the
+    number of keys is the leaf level); key columns above a row's level are
+    empty.
+    """
+
+    keys = ('continent', 'country')
+    levels = None
+    # Строки отчета зависят от нескольких групп сразу (итоги по уровням)
+    row_per_group = False
+
+    def generate(self, top=None, bottom=None):
+        """
+        Calculate the metrics of every level of the hierarchy.
+
+        ``top`` / ``bottom`` keep only the first / last N rows in
+        hierarchical order.
+
+        Returns:
+            List of dictionaries with the level name, the key columns and
+            one column per metric and function
+        """
+        aggregate = self.aggregate if self.aggregate is not None else self.aggregate_data()
+        depth = len(self.keys)
+        levels = set(range(depth + 1) if self.levels is None else self.levels)
+        aggregates = {depth: aggregate}
+        for level in range(depth - 1, min(levels, default=depth) - 1, -1):
+            aggregates[level] = aggregates[level + 1].rollup(level)
+
+        results = {level: dict(aggregates[level].results()) for level in aggregates}
+        children = {}
+        for level in range(1, depth + 1):
+            for key in results.get(level, ()):
+                children.setdefault((level, key[:-1]), []).append(key)
+
+        rows = []
+        highest = min(levels, default=depth)
+        stack = list(reversed(list(results[highest])))
+        while stack:
+            key = stack.pop()
+            level = len(key)
+            if level in levels:
+                rows.append(self._row(level, key, results[level][key]))
+            stack.extend(reversed(children.get((level + 1, key), [])))
+        return select_rows(rows, None, top, bottom)
+
+    def _row(self, level, key, values):
+        row = {'Уровень': self.label(self.keys[level - 1]) if level else WORLD_LABEL}
+        for index, name in enumerate(self.keys):
+            row[self.label(name)] = key[index] if index < level else ''
+        for (name, function), value in values.items():
+            row[self.label(name, function)] = value
+        return row
@@ -0,0 +1,103 @@
+import json
+import os
+import tempfile
+
+from macro_analysis.batch import aggregate_reports
+
+# Меняется при изменении формата файла состояния
+STATE_VERSION = 5
+
+
+class IncrementalState:
+    """
+    Per-file aggregates of one or more reports persisted between runs in a JSON state file.
+
+    On each run only files that were added or changed (by mtime or size) are
+    read again; aggregates of files no longer listed are dropped. The total
+    is merged from the per-file aggregates in the order of the file list, so
+    it does not depend on which files happened to be recomputed.
+    """
+
+    def __init__(self, path, report_names, filters=()):
+        self.path = path
+        self.report_names = list(report_names)
+        # Агрегаты зависят от условий --where, поэтому они входят в идентичность состояния
+        self.filters = [str(item) for item in filters]
+        self.files = {}
+        self.recomputed = []
+
+    def load(self) -> 'IncrementalState':
+        try:
+            with open(self.path, 'r', encoding='utf-8') as file:
+                state = json.load(file)
+        except FileNotFoundError:
+            return self
+        except (OSError, ValueError) as e:
+            raise Exception(f"Ошибка чтения файла состояния {self.path}: {str(e)}")
+
+        # Состояние другого отчета, других условий или старого формата не используем
+        if (state.get('version') == STATE_VERSION and state.get('reports') == self.report_names
+                and state.get('filters', []) == self.filters):
+            self.files = state.get('files', {})
+        return self
+
+    def save(self) -> None:
+        state = {
+            'version': STATE_VERSION,
+            'reports': self.report_names,
+            'filters': self.filters,
+            'files': self.files,
+        }
+        directory = os.path.dirname(os.path.abspath(self.path))
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as file:
+                json.dump(state, file, ensure_ascii=False)
+            os.replace(tmp_path, self.path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+
+    def aggregate(self, report_classes, file_paths, read_file):
+        """
+        Return the merged aggregate of each of ``report_classes`` over ``file_paths``.
+
+        ``read_file(path)`` must return data accepted by the reports; it is
+        only called, once for all reports, for files without an up-to-date
+        entry in the state.
+        """
+        for name, report_cls in zip(self.report_names, report_classes):
+            if getattr(report_cls, 'aggregate_class', None) is None:
+                raise ValueError(f"Отчет {name} не поддерживает инкрементальный режим")
+
+        files = {}
+        self.recomputed = []
+        totals = [report_cls.aggregate_class() for report_cls in report_classes]
+        for file_path in file_paths:
+            key = os.path.abspath(file_path)
+            try:
+                stat = os.stat(file_path)
+            except FileNotFoundError:
+                raise FileNotFoundError(f"Файл не найден: {file_path}")
+
+            entry = self.files.get(key)
+            if entry is None or entry['mtime_ns'] != stat.st_mtime_ns or entry['size'] != stat.st_size:
+                partials = aggregate_reports(report_classes, read_file(file_path))
+                entry = {
+                    'mtime_ns': stat.st_mtime_ns,
+                    'size': stat.st_size,
+                    'aggregates': [partial.to_dict() for partial in partials],
+                }
+                self.recomputed.append(file_path)
+            else:
+                partials = [
+                    report_cls.aggregate_class.from_dict(data)
+                    for report_cls, data in zip(report_classes, entry['aggregates'])
+                ]
+
+            files[key] = entry
+            for total, partial in zip(totals, partials):
+                total.merge(partial)
+
+        self.files = files
+        return totals
@@ -1,15 +1,102 @@
-import csv
+from functools import partial
+
+from macro_analysis.arrow import detect_format, iter_rows as iter_arrow_rows
+from macro_analysis.chunked import DEFAULT_BATCH_ROWS, batched
+from macro_analysis.compression import open_text
+from macro_analysis.dtypes import column_key, normalize_columns
+from macro_analysis.filters import filter_key, parse_filters
+from macro_analysis.parallel import ordered_map
+from macro_analysis.records import RecordStore
+from macro_analysis.scanner import project_rows, scan_file
+
+ENGINES = ['csv', 'mmap']
+
 
 class DataLoader:
+    def __init__(self, workers=1, cache=None, engine='csv', columns=None, filters=(), compact=False):
+        if engine not in ENGINES:
+            raise ValueError(f"Неизвестный способ чтения: {engine}")
+        self.workers = workers
+        self.cache = cache
+        self.engine = engine
+        self.columns = normalize_columns(columns)
+        self.filters = parse_filters(filters)
+        self.compact = compact
+
     def load_files(self, file_paths):
-        data = []
+        """
+        Read all rows into memory.
+
+        Returns a list of row dicts, or with ``compact`` a RecordStore that
+        keeps typed columns and dictionary-encoded strings and takes several
+        times less memory; its rows are read by name like dicts.
+        """
+        if self.compact:
+            return RecordStore(self.iter_rows(file_paths), self.columns)
+        return list(self.iter_rows(file_paths))
+
+    def iter_rows(self, file_paths):
+        """
+        Lazily yield rows from the given CSV files, one file after another.
+
+        Only the file currently being read is open and no rows are kept,
+        so memory use does not depend on the number or size of the files.
+        With ``workers > 1`` files are parsed in a process pool; rows are
+        still yielded in the order of ``file_paths``. With a ``cache``
+        (see FileCache), unchanged files are not parsed again; rows are
+        written to and read from the cache in batches, so it does not hold
+        whole files in memory either.
+
+        ``engine='mmap'`` reads files with the memory-mapped scanner.
+        ``columns`` (names, or a mapping of names to str/float/int such as
+        a report's ``columns`` declaration) limits rows to those columns and
+        parses their values; other columns are never put into row dicts.
+        ``filters`` (expressions such as ``'year>=2020'`` or Filter objects)
+        are checked while parsing, and rejected rows are never yielded.
+        Files compressed with gzip, zstd, xz or bz2 are decompressed while
+        they are parsed (see compression.open_text). Parquet and Arrow IPC
+        files are read with pyarrow instead (see arrow.iter_rows).
+        """
+        if self.workers > 1:
+            read = partial(_read_file_rows, cache=self.cache, engine=self.engine,
+                           columns=self.columns, filters=self.filters)
+            for rows in ordered_map(read, file_paths, self.workers):
+                yield from rows
+            return
+
         for file_path in file_paths:
-            try:
-                with open(file_path, mode='r', encoding='utf-8') as file:
-                    reader = csv.DictReader(file)
-                    data.extend(reader)
-            except FileNotFoundError:
-                raise FileNotFoundError(f"Файл не найден: {file_path}")
-            except Exception as e:
-                raise Exception(f"Ошибка чтения файла {file_path}: {str(e)}")
-        return data
+            yield from _iter_file_rows(file_path, self.cache, self.engine, self.columns, self.filters)
+
+    def iter_batches(self, file_paths, batch_rows=DEFAULT_BATCH_ROWS):
+        """Yield the rows of iter_rows() in lists of at most ``batch_rows`` rows."""
+        return batched(self.iter_rows(file_paths), batch_rows)
+
+    @staticmethod
+    def _read_file(file_path, engine='csv', columns=None, filters=()):
+        try:
+            file_format = detect_format(file_path)
+            if file_format is not None:
+                yield from iter_arrow_rows(file_path, columns, filters, file_format)
+                return
+            if engine == 'mmap':
+                yield from scan_file(file_path, columns, filters)
+                return
+            with open_text(file_path) as file:
+                yield from project_rows(file, normalize_columns(columns), filters)
+        except FileNotFoundError:
+            raise FileNotFoundError(f"Файл не найден: {file_path}")
+        except Exception as e:
+            raise Exception(f"Ошибка чтения файла {file_path}: {str(e)}")
+
+
+def _iter_file_rows(file_path, cache=None, engine='csv', columns=None, filters=()):
+    read_rows = partial(DataLoader._read_file, file_path, engine, columns, filters)
+    if cache is None:
+        return read_rows()
+    kind = f"rows:{engine}:{column_key(columns)}:{filter_key(filters)}"
+    return cache.stream(file_path, kind, read_rows)
+
+
+def _read_file_rows(file_path, cache=None, engine='csv', columns=None, filters=()):
+    # Функция уровня модуля, чтобы ее можно было передать в пул процессов
+    return list(_iter_file_rows(file_path, cache, engine, columns, filters))
@@ -0,0 +1,24 @@
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+
+def ordered_map(func, items, workers):
+    """
+    Apply ``func`` to ``items`` in a process pool and yield results in input order.
+
+    At most ``2 * workers`` results are held at once, so a slow consumer does not
+    make finished results pile up in memory. Exceptions raised by ``func`` are
+    re-raised unchanged when their result is reached.
+    """
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        pending = deque()
+        try:
+            for item in items:
+                pending.append(executor.submit(func, item))
+                if len(pending) >= 2 * workers:
+                    yield pending.popleft().result()
+            while pending:
+                yield pending.popleft().result()
+        finally:
+            for future in pending:
+                future.cancel()
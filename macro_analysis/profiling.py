@@ -0,0 +1,140 @@
+import cProfile
+import json
+import os
+import sys
+import time
+from contextlib import contextmanager, nullcontext
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+
+def peak_memory_bytes():
+    """Peak resident set size of the current process, or None if unknown."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux сообщает килобайты, macOS — байты
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+
+_END = object()
+
+
+class Profiler:
+    """
+    Timing spans, throughput counters and peak memory for one CLI run.
+
+    Span times are exclusive: time spent pulling items from an iterator
+    wrapped with ``iter_span`` is charged to that iterator's stage rather
+    than to the span that consumes it, so streaming load and aggregation
+    are reported separately even though they interleave.
+    """
+
+    def __init__(self, cprofile=False):
+        self.stages = {}
+        self.rows = 0
+        self.bytes = 0
+        self._stack = []
+        self._started = time.perf_counter()
+        self._finished = None
+        self._cprofile = cProfile.Profile() if cprofile else None
+        if self._cprofile is not None:
+            self._cprofile.enable()
+
+    @contextmanager
+    def span(self, name):
+        self._stack.append(0.0)
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            nested = self._stack.pop()
+            self._add(name, elapsed - nested)
+
+    def iter_span(self, name, items):
+        """Yield from ``items``, charging the time of each step to ``name`` and counting rows."""
+        iterator = iter(items)
+        while True:
+            start = time.perf_counter()
+            item = next(iterator, _END)
+            elapsed = time.perf_counter() - start
+            self._add(name, elapsed)
+            if self._stack:
+                self._stack[-1] += elapsed
+            if item is _END:
+                return
+            self.rows += 1
+            yield item
+
+    def add_files(self, file_paths):
+        for file_path in file_paths:
+            try:
+                self.bytes += os.path.getsize(file_path)
+            except OSError:
+                pass
+
+    def finish(self):
+        self._finished = time.perf_counter()
+        if self._cprofile is not None:
+            self._cprofile.disable()
+
+    def dump_cprofile(self, path):
+        if self._cprofile is not None:
+            self._cprofile.dump_stats(path)
+
+    def to_dict(self):
+        total = (self._finished or time.perf_counter()) - self._started
+        load = self.stages.get('load')
+        return {
+            'stages': dict(self.stages),
+            'total_seconds': total,
+            'rows': self.rows,
+            'bytes': self.bytes,
+            'rows_per_second': self.rows / load if load else None,
+            'bytes_per_second': self.bytes / load if load else None,
+            'peak_memory_bytes': peak_memory_bytes(),
+        }
+
+    def to_json(self, path):
+        with open(path, 'w', encoding='utf-8') as file:
+            json.dump(self.to_dict(), file, indent=2)
+
+    def format(self):
+        stats = self.to_dict()
+        rows = [[f'Этап: {name}', f'{seconds:.4f} с'] for name, seconds in stats['stages'].items()]
+        rows.append(['Всего', f"{stats['total_seconds']:.4f} с"])
+        rows.append(['Строк', stats['rows']])
+        rows.append(['Байт', stats['bytes']])
+        if stats['rows_per_second'] is not None:
+            rows.append(['Строк/с', f"{stats['rows_per_second']:.0f}"])
+            rows.append(['Байт/с', f"{stats['bytes_per_second']:.0f}"])
+        if stats['peak_memory_bytes'] is not None:
+            rows.append(['Пиковая память', f"{stats['peak_memory_bytes'] / 1024 ** 2:.1f} МБ"])
+        import tabulate
+
+        return tabulate.tabulate(rows, headers=['Профиль', 'Значение'], tablefmt='grid')
+
+    def _add(self, name, seconds):
+        self.stages[name] = self.stages.get(name, 0.0) + seconds
+
+
+class NullProfiler:
+    """Profiler stand-in used when profiling is off; adds no per-row overhead."""
+
+    rows = 0
+
+    def span(self, name):
+        return nullcontext()
+
+    def iter_span(self, name, items):
+        return items
+
+    def add_files(self, file_paths):
+        pass
+
+    def finish(self):
+        pass
@@ -0,0 +1,180 @@
+from array import array
+from collections.abc import Mapping, Sequence
+from math import isnan
+
+# Отсутствующее значение в числовой колонке хранится как NaN и читается как None
+_MISSING = float('nan')
+# В целочисленной колонке отсутствующее значение — минимальное int64
+_MISSING_INT = -2 ** 63
+
+
+class _FloatColumn:
+    __slots__ = ('values',)
+
+    def __init__(self, size=0):
+        self.values = array('d', [_MISSING]) * size
+
+    def append(self, value):
+        self.values.append(_MISSING if value is None else value)
+
+    def __getitem__(self, index):
+        value = self.values[index]
+        return None if isnan(value) else value
+
+    def nbytes(self):
+        return self.values.itemsize * len(self.values)
+
+
+class _IntColumn:
+    __slots__ = ('values',)
+
+    def __init__(self, size=0):
+        self.values = array('q', [_MISSING_INT]) * size
+
+    def append(self, value):
+        self.values.append(_MISSING_INT if value is None else value)
+
+    def __getitem__(self, index):
+        value = self.values[index]
+        return None if value == _MISSING_INT else value
+
+    def nbytes(self):
+        return self.values.itemsize * len(self.values)
+
+
+class _CategoryColumn:
+    """Dictionary-encoded column: each distinct value is stored once, rows keep integer codes."""
+
+    __slots__ = ('codes', 'categories', 'index')
+
+    def __init__(self, size=0):
+        self.categories = [None]
+        self.index = {None: 0}
+        self.codes = array('I', [0]) * size
+
+    def append(self, value):
+        code = self.index.get(value)
+        if code is None:
+            code = self.index[value] = len(self.categories)
+            self.categories.append(value)
+        self.codes.append(code)
+
+    def __getitem__(self, index):
+        return self.categories[self.codes[index]]
+
+    def nbytes(self):
+        return self.codes.itemsize * len(self.codes)
+
+
+class Record(Mapping):
+    """
+    Read-only view of one row of a RecordStore.
+
+    Behaves like the row dict it was built from (``row['gdp']``,
+    ``row.get('country')``, ``dict(row)``), but holds only a reference to
+    the store and the row number.
+    """
+
+    __slots__ = ('_store', '_index')
+
+    def __init__(self, store, index):
+        self._store = store
+        self._index = index
+
+    def __getitem__(self, name):
+        return self._store._columns[name][self._index]
+
+    def __contains__(self, name):
+        return name in self._store._columns
+
+    def __iter__(self):
+        return iter(self._store._columns)
+
+    def __len__(self):
+        return len(self._store._columns)
+
+    def __repr__(self):
+        return f'Record({dict(self)!r})'
+
+
+class RecordStore(Sequence):
+    """
+    Compact in-memory table of rows, used instead of a list of dicts.
+
+    Float and int columns (per ``dtypes``, see dtypes.normalize_columns)
+    are stored in typed arrays; every other column is dictionary-encoded,
+    so repeated strings such as country and continent names are kept once
+    and each row stores a 4-byte code. Items are Record views that can be
+    read like the original row dicts. Missing values read back as None;
+    columns that first appear in a later row are None in earlier rows.
+    Columns keep the order in which they first appear. A typed column that
+    receives a value its array cannot hold (e.g. an int beyond 64 bits)
+    is turned into a dictionary-encoded one.
+    """
+
+    def __init__(self, rows=(), dtypes=None):
+        self.dtypes = dict(dtypes or {})
+        self._columns = {}
+        self._size = 0
+        self.extend(rows)
+
+    def __len__(self):
+        return self._size
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [Record(self, i) for i in range(*index.indices(self._size))]
+        if index < 0:
+            index += self._size
+        if not 0 <= index < self._size:
+            raise IndexError('RecordStore index out of range')
+        return Record(self, index)
+
+    def __iter__(self):
+        for index in range(self._size):
+            yield Record(self, index)
+
+    @property
+    def fieldnames(self):
+        return list(self._columns)
+
+    def append(self, row):
+        columns = self._columns
+        for name in row:
+            if name not in columns and name is not None:
+                columns[name] = self._new_column(name)
+        for name, column in columns.items():
+            value = row.get(name)
+            try:
+                column.append(value)
+            except (TypeError, OverflowError):
+                column = columns[name] = self._as_category(column)
+                column.append(value)
+        self._size += 1
+
+    def extend(self, rows):
+        for row in rows:
+            self.append(row)
+
+    def column(self, name):
+        """All values of one column as a list."""
+        column = self._columns[name]
+        return [column[index] for index in range(self._size)]
+
+    def nbytes(self):
+        """Approximate size of the row storage in bytes, excluding distinct category values."""
+        return sum(column.nbytes() for column in self._columns.values())
+
+    def _new_column(self, name):
+        dtype = self.dtypes.get(name)
+        if dtype is float:
+            return _FloatColumn(self._size)
+        if dtype is int:
+            return _IntColumn(self._size)
+        return _CategoryColumn(self._size)
+
+    def _as_category(self, column):
+        category = _CategoryColumn()
+        for index in range(self._size):
+            category.append(column[index])
+        return category
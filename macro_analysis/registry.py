@@ -1,11 +1,111 @@
-from macro_analysis.reports.average_gdp import AverageGDPReport
+from importlib import import_module
+
+ENTRY_POINT_GROUP = 'macro_analysis.reports'
+
+
+class LazyReports(dict):
+    """
+    Report classes by name, imported on first access.
+
+    Values are report classes or ``'module:attribute'`` references; a
+    reference is replaced with the imported class when it is looked up,
+    so only the modules of reports that are actually used get imported.
+    """
+
+    def __getitem__(self, name):
+        value = super().__getitem__(name)
+        if isinstance(value, str):
+            value = _import_object(value)
+            super().__setitem__(name, value)
+        return value
+
+    def get(self, name, default=None):
+        if name in self:
+            return self[name]
+        return default
+
+    def values(self):
+        return [self[name] for name in self]
+
+    def items(self):
+        return [(name, self[name]) for name in self]
+
+    def copy(self):
+        return dict(self.items())
+
+
+def _import_object(reference):
+    module_name, _, attribute = reference.partition(':')
+    value = import_module(module_name)
+    for part in attribute.split('.') if attribute else ():
+        value = getattr(value, part)
+    return value
+
+
+def _entry_points(group):
+    from importlib.metadata import entry_points
+
+    try:
+        return entry_points(group=group)
+    except TypeError:
+        # Python < 3.10: entry_points() возвращает словарь групп
+        return entry_points().get(group, [])
 
 
 class ReportRegistry:
-    _reports = {
-        'average-gdp': AverageGDPReport
-    }
+    _reports = LazyReports({
+        'average-gdp': 'macro_analysis.reports.average_gdp:AverageGDPReport',
+        'average-gdp-growth': 'macro_analysis.reports.indicators:AverageGDPGrowthReport',
+        'average-inflation': 'macro_analysis.reports.indicators:AverageInflationReport',
+        'average-unemployment': 'macro_analysis.reports.indicators:AverageUnemploymentReport',
+        'average-population': 'macro_analysis.reports.indicators:AveragePopulationReport',
+        'country-indicators': 'macro_analysis.reports.indicators:CountryIndicatorsReport',
+        'country-rollup': 'macro_analysis.reports.rollups:CountryRollupReport',
+        'continent-rollup': 'macro_analysis.reports.rollups:ContinentRollupReport',
+        'gdp-cagr': 'macro_analysis.reports.growth:GDPGrowthReport',
+        'gdp-trends': 'macro_analysis.reports.growth:GDPTrendsReport',
+        'continent-quantiles': 'macro_analysis.reports.quantiles:ContinentQuantilesReport',
+    })
+    _discovered = False
+
+    @classmethod
+    def register(cls, name):
+        """Class decorator registering a report under ``name``."""
+        def decorator(report_cls):
+            cls._reports[name] = report_cls
+            return report_cls
+        return decorator
+
+    @classmethod
+    def register_lazy(cls, name, reference):
+        """Register a report by ``'module:Class'`` reference without importing it."""
+        cls._reports.setdefault(name, reference)
+
+    @classmethod
+    def discover(cls):
+        """
+        Register reports published by installed packages.
+
+        Packages declare reports as entry points in the
+        ``macro_analysis.reports`` group (``name = module:Class``); the
+        modules are imported only when the report is requested. Reports
+        registered in the package itself take precedence.
+        """
+        if cls._discovered:
+            return
+        cls._discovered = True
+        for entry_point in _entry_points(ENTRY_POINT_GROUP):
+            cls.register_lazy(entry_point.name, entry_point.value)
 
     @classmethod
     def get_report(cls, report_name):
-        return cls._reports.get(report_name)
+        report_cls = cls._reports.get(report_name)
+        if report_cls is None and isinstance(report_name, str):
+            cls.discover()
+            report_cls = cls._reports.get(report_name)
+        return report_cls
+
+    @classmethod
+    def names(cls):
+        cls.discover()
+        return list(cls._reports)
@@ -1,3 +1,40 @@
-from .average_gdp import AverageGDPReport
+from importlib import import_module
 
-__all__ = ['AverageGDPReport']
+__all__ = [
+    'AverageGDPReport',
+    'GDPAggregate',
+    'AverageGDPGrowthReport',
+    'AverageInflationReport',
+    'AverageUnemploymentReport',
+    'AveragePopulationReport',
+    'CountryIndicatorsReport',
+    'CountryRollupReport',
+    'ContinentRollupReport',
+    'GDPGrowthReport',
+    'GDPTrendsReport',
+    'ContinentQuantilesReport',
+]
+
+# Модули отчетов импортируются только при обращении к ним
+_EXPORTS = {
+    'AverageGDPReport': 'macro_analysis.reports.average_gdp',
+    'GDPAggregate': 'macro_analysis.reports.average_gdp',
+    'AverageGDPGrowthReport': 'macro_analysis.reports.indicators',
+    'AverageInflationReport': 'macro_analysis.reports.indicators',
+    'AverageUnemploymentReport': 'macro_analysis.reports.indicators',
+    'AveragePopulationReport': 'macro_analysis.reports.indicators',
+    'CountryIndicatorsReport': 'macro_analysis.reports.indicators',
+    'CountryRollupReport': 'macro_analysis.reports.rollups',
+    'ContinentRollupReport': 'macro_analysis.reports.rollups',
+    'GDPGrowthReport': 'macro_analysis.reports.growth',
+    'GDPTrendsReport': 'macro_analysis.reports.growth',
+    'ContinentQuantilesReport': 'macro_analysis.reports.quantiles',
+}
+
+
+def __getattr__(name):
+    if name not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(import_module(_EXPORTS[name]), name)
+    globals()[name] = value
+    return value
@@ -1,50 +1,234 @@
-from collections import defaultdict
-from typing import List, Dict, Any, Union
+import math
+from collections.abc import Mapping
+from typing import List, Dict, Any, Iterable, Optional, Union
 
+from macro_analysis.chunked import GROUP_BYTES
+from macro_analysis.dtypes import is_frame
+from macro_analysis.records import RecordStore
+from macro_analysis.selection import select_rows
 
-class AverageGDPReport:
-    def __init__(self, data: List[Dict[str, Any]]):
-        self.data = data
+# Сколько слагаемых копится по стране, прежде чем они сжимаются до точного представления суммы
+COMPACT_TERMS = 64
+# Оценка памяти одного слагаемого (объект float и ссылка на него в списке)
+FLOAT_BYTES = 32
 
-    def generate(self) -> List[Dict[str, Union[str, float]]]:
-        """
-        Calculate average GDP for each country.
 
-        Returns:
-            List of dictionaries with 'Страна' and 'Средний ВВП',
-            sorted by average GDP descending
-        """
-        gdp_data = defaultdict(list)
+def exact_terms(values: Iterable[float]) -> List[float]:
+    """
+    Non-overlapping floats whose exact sum equals the exact sum of ``values``.
 
-        for row in self.data:
-            # Проверяем наличие обоих ключей
-            if not isinstance(row, dict):
-                continue
+    The first term is the correctly rounded sum; the rest hold what it
+    loses. Usually this is one or two floats however many values there were.
+    """
+    values = list(values)
+    rest = list(values)
+    terms = []
+    while True:
+        try:
+            total = math.fsum(rest)
+        except (ValueError, OverflowError):
+            # inf - inf или переполнение: точной суммы нет, как и при обычном сложении
+            return [sum(values)]
+        if not math.isfinite(total):
+            return [total]
+        if total == 0.0:
+            return terms or [0.0]
+        terms.append(total)
+        rest.append(-total)
 
-            if 'country' not in row or 'gdp' not in row:
-                continue
 
+class GDPAggregate:
+    """
+    Partial result of AverageGDPReport: GDP sum and row count per country.
+
+    Memory is proportional to the number of countries, not rows. Sums are
+    kept exactly (see exact_terms) and rounded only in means(), so
+    aggregates computed over separate files or chunks can be merged in any
+    order and serialized, and the merged aggregate yields the same averages
+    as a single pass.
+    """
+
+    def __init__(self):
+        self.terms: Dict[str, List[float]] = {}
+        self.counts: Dict[str, int] = {}
+
+    def __len__(self) -> int:
+        return len(self.terms)
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, GDPAggregate):
+            return NotImplemented
+        return self.sums == other.sums and self.counts == other.counts
+
+    @classmethod
+    def group_bytes(cls) -> int:
+        """Estimated memory of one country, used by --memory-limit budgets (see chunked.group_bytes)."""
+        return GROUP_BYTES + COMPACT_TERMS * FLOAT_BYTES
+
+    @property
+    def sums(self) -> Dict[str, float]:
+        """Correctly rounded GDP sum per country."""
+        return {country: exact_terms(terms)[0] for country, terms in self.terms.items()}
+
+    def add(self, country: str, gdp: float) -> None:
+        terms = self.terms.get(country)
+        if terms is None:
+            self.terms[country] = [gdp]
+            self.counts[country] = 1
+            return
+        terms.append(gdp)
+        count = self.counts[country] + 1
+        self.counts[country] = count
+        # Сжимаем раз в COMPACT_TERMS строк: между сжатиями копится не больше COMPACT_TERMS значений
+        if not count % COMPACT_TERMS:
+            self.terms[country] = exact_terms(terms)
+
+    def extend(self, country: str, values: List[float], count: int) -> None:
+        """Add ``count`` rows of ``country`` whose GDP values sum exactly to ``values``."""
+        terms = self.terms.get(country)
+        if terms is None:
+            self.terms[country] = exact_terms(values)
+            self.counts[country] = count
+        else:
+            self.terms[country] = exact_terms(terms + list(values))
+            self.counts[country] += count
+
+    def add_row(self, row: Dict[str, Any]) -> None:
+        # Проверяем наличие обоих ключей; строки могут быть dict или Record
+        if not isinstance(row, (dict, Mapping)):
+            return
+
+        if 'country' not in row or 'gdp' not in row:
+            return
+
+        gdp = row['gdp']
+        # Загрузчик с объявленными типами уже разобрал число; иначе разбираем строку здесь
+        if type(gdp) is not float:
             # Пропускаем None или пустые значения
-            if row['gdp'] is None or row['gdp'] == '':
-                continue
+            if gdp is None or gdp == '':
+                return
 
             try:
-                gdp = float(row['gdp'])
-                gdp_data[row['country']].append(gdp)
+                gdp = float(gdp)
             except (ValueError, TypeError):
                 # Пропускаем некорректные значения
+                return
+        self.add(row['country'], gdp)
+
+    def update(self, rows: Iterable[Dict[str, Any]]) -> 'GDPAggregate':
+        if isinstance(rows, RecordStore):
+            return self.update_store(rows)
+        for row in rows:
+            self.add_row(row)
+        return self
+
+    def update_store(self, store: RecordStore) -> 'GDPAggregate':
+        """Update from a RecordStore column by column, without building Record views."""
+        if 'country' not in store.fieldnames or 'gdp' not in store.fieldnames:
+            return self
+        for country, gdp in zip(store.column('country'), store.column('gdp')):
+            # Те же проверки, что и в add_row
+            if gdp is None or gdp == '':
+                continue
+            try:
+                gdp = float(gdp)
+            except (ValueError, TypeError):
                 continue
+            self.add(country, gdp)
+        return self
+
+    def update_frame(self, frame) -> 'GDPAggregate':
+        """Vectorized update from a typed DataFrame."""
+        import pandas as pd
+
+        if 'country' not in frame or 'gdp' not in frame:
+            return self
+
+        gdp = pd.to_numeric(frame['gdp'], errors='coerce')
+        valid = gdp.notna() & frame['country'].notna()
+        if not valid.any():
+            return self
+
+        # sort=False сохраняет порядок первого появления стран, как в построчном пути;
+        # значения группы складываются точно, как в add(), а не через sum() pandas
+        for country, values in gdp[valid].groupby(frame['country'][valid], sort=False):
+            self.extend(country, values.tolist(), len(values))
+        return self
+
+    def merge(self, other: 'GDPAggregate') -> 'GDPAggregate':
+        for country, terms in other.terms.items():
+            self.extend(country, terms, other.counts[country])
+        return self
+
+    def means(self) -> Dict[str, float]:
+        return {country: total / self.counts[country] for country, total in self.sums.items()}
+
+    def to_dict(self) -> Dict[str, List[Union[float, int, List[float]]]]:
+        """
+        Serialize to a JSON-compatible ``{country: [sum, count]}`` mapping.
+
+        When one float cannot hold the exact sum, ``sum`` is the list of
+        its exact_terms().
+        """
+        data = {}
+        for country, terms in self.terms.items():
+            terms = exact_terms(terms)
+            data[country] = [terms[0] if len(terms) == 1 else terms, self.counts[country]]
+        return data
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, List[Union[float, int, List[float]]]]) -> 'GDPAggregate':
+        aggregate = cls()
+        for country, (total, count) in data.items():
+            terms = total if isinstance(total, list) else [total]
+            aggregate.terms[country] = [float(term) for term in terms]
+            aggregate.counts[country] = int(count)
+        return aggregate
+
+
+class AverageGDPReport:
+    # Колонки и типы, которые читает отчет; загрузчик пропускает остальные
+    columns = {'country': str, 'gdp': float}
+    aggregate_class = GDPAggregate
+
+    def __init__(self, data: Iterable[Dict[str, Any]] = (), aggregate: Optional[GDPAggregate] = None):
+        self.data = data
+        self.aggregate = aggregate
+
+    def aggregate_data(self) -> GDPAggregate:
+        """Fold the report data into a new GDPAggregate in a single pass."""
+        if is_frame(self.data):
+            return self.aggregate_class().update_frame(self.data)
+        return self.aggregate_class().update(self.data)
+
+    def generate(self, top: Optional[int] = None, bottom: Optional[int] = None) -> List[Dict[str, Union[str, float]]]:
+        """
+        Calculate average GDP for each country.
+
+        The data is consumed in a single pass, so it may be a lazy
+        iterator such as DataLoader.iter_rows(). If the report was created
+        with a precomputed ``aggregate``, it is used instead of the data.
+        ``top`` / ``bottom`` keep only the first / last N countries; they
+        are selected with a bounded heap instead of sorting every country.
+
+        Returns:
+            List of dictionaries with 'Страна' and 'Средний ВВП',
+            sorted by average GDP descending
+        """
+        aggregate = self.aggregate if self.aggregate is not None else self.aggregate_data()
 
-        # Если нет данных, возвращаем пустой список
-        if not gdp_data:
-            return []
+        # Строки создаются только для выбранных стран; порядок тот же, что у sort_key
+        averages = select_rows(aggregate.means().items(), lambda item: -item[1], top, bottom)
 
-        result = [
+        return [
             {
                 'Страна': country,
-                'Средний ВВП': sum(gdps) / len(gdps)
+                'Средний ВВП': average
             }
-            for country, gdps in gdp_data.items()
+            for country, average in averages
         ]
 
-        return sorted(result, key=lambda x: x['Средний ВВП'], reverse=True)
\ No newline at end of file
+    @staticmethod
+    def sort_key(row: Dict[str, Union[str, float]]) -> float:
+        # Строки отчета упорядочены по убыванию среднего ВВП
+        return -row['Средний ВВП']
@@ -0,0 +1,58 @@
+from macro_analysis.timeseries import TimeSeriesReport, as_value, as_year
+
+
+class GDPGrowthReport(TimeSeriesReport):
+    """Compound annual growth rate of GDP per country over the available years."""
+
+    def compute(self, index):
+        """
+        Returns:
+            List of dictionaries with the country, the first and last year,
+            GDP in those years and CAGR in percent
+        """
+        first_year, last_year, first_value, last_value, rate = index.growth_rates()
+        return [
+            {
+                'Страна': country,
+                'Первый год': as_year(first_year[code]),
+                'Последний год': as_year(last_year[code]),
+                'ВВП в первый год': as_value(first_value[code]),
+                'ВВП в последний год': as_value(last_value[code]),
+                'Среднегодовой рост, %': as_value(rate[code]),
+            }
+            for code, country in enumerate(index.countries)
+        ]
+
+    @staticmethod
+    def order_key(row):
+        # По убыванию роста; страны без показателя роста — в конце
+        rate = row['Среднегодовой рост, %']
+        return (rate is None, -rate if rate is not None else 0)
+
+
+class GDPTrendsReport(TimeSeriesReport):
+    """GDP per country and year with the year-over-year change and a rolling average."""
+
+    window = 3
+
+    def compute(self, index):
+        """
+        Returns:
+            List of dictionaries with the country, year, GDP, change
+            against the previous year (absolute and in percent) and the
+            average over the last ``window`` years, ordered by country and year
+        """
+        delta, percent = index.year_over_year()
+        rolling = index.rolling_mean(self.window)
+        average_label = f'Скользящее среднее ({self.window} г.)'
+        return [
+            {
+                'Страна': index.countries[index.codes[position]],
+                'Год': as_year(index.years[position]),
+                'ВВП': as_value(index.values[position]),
+                'Изменение за год': as_value(delta[position]),
+                'Изменение за год, %': as_value(percent[position]),
+                average_label: as_value(rolling[position]),
+            }
+            for position in range(len(index))
+        ]
@@ -0,0 +1,38 @@
+from macro_analysis.groupby import GroupByReport
+
+INDICATORS = ('gdp_growth', 'inflation', 'unemployment', 'population')
+
+
+class AverageGDPGrowthReport(GroupByReport):
+    keys = ('country',)
+    metrics = {'gdp_growth': ('mean',)}
+    labels = {('gdp_growth', 'mean'): 'Средний рост ВВП'}
+    sort_by = ('gdp_growth', 'mean')
+
+
+class AverageInflationReport(GroupByReport):
+    keys = ('country',)
+    metrics = {'inflation': ('mean',)}
+    labels = {('inflation', 'mean'): 'Средняя инфляция'}
+    sort_by = ('inflation', 'mean')
+
+
+class AverageUnemploymentReport(GroupByReport):
+    keys = ('country',)
+    metrics = {'unemployment': ('mean',)}
+    labels = {('unemployment', 'mean'): 'Средняя безработица'}
+    sort_by = ('unemployment', 'mean')
+
+
+class AveragePopulationReport(GroupByReport):
+    keys = ('country',)
+    metrics = {'population': ('mean',)}
+    labels = {('population', 'mean'): 'Среднее население'}
+    sort_by = ('population', 'mean')
+
+
+class CountryIndicatorsReport(GroupByReport):
+    """Mean, median, min and max of every indicator per country, in one pass."""
+
+    keys = ('country',)
+    metrics = {name: ('mean', 'median', 'min', 'max') for name in INDICATORS}
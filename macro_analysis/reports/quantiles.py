@@ -0,0 +1,21 @@
+from macro_analysis.groupby import GroupByReport
+
+
+class ContinentQuantilesReport(GroupByReport):
+    """
+    Approximate median and 90th percentile of GDP and inflation per continent.
+
+    Every continent keeps one constant-size sketch per metric instead of
+    all values; the rank error is ``quantile_error`` (1% by default) and
+    can be changed in a subclass.
+    """
+
+    keys = ('continent',)
+    metrics = {'gdp': ('p50', 'p90'), 'inflation': ('p50', 'p90')}
+    labels = {
+        ('gdp', 'p50'): 'Медиана ВВП',
+        ('gdp', 'p90'): 'ВВП, 90-й перцентиль',
+        ('inflation', 'p50'): 'Медиана инфляции',
+        ('inflation', 'p90'): 'Инфляция, 90-й перцентиль',
+    }
+    sort_by = ('gdp', 'p50')
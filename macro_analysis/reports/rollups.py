@@ -0,0 +1,36 @@
+from macro_analysis.groupby import RollupReport
+
+ROLLUP_METRICS = {
+    'gdp': ('mean',),
+    'gdp_growth': ('mean',),
+    'inflation': ('mean', 'weighted_mean'),
+    'unemployment': ('mean', 'weighted_mean'),
+    'population': ('mean',),
+}
+POPULATION_WEIGHTS = {
+    'inflation': 'population',
+    'unemployment': 'population',
+}
+ROLLUP_LABELS = {
+    ('inflation', 'weighted_mean'): 'Инфляция (взвеш. по населению)',
+    ('unemployment', 'weighted_mean'): 'Безработица (взвеш. по населению)',
+}
+
+
+class CountryRollupReport(RollupReport):
+    """Indicators per country with continent and world totals."""
+
+    keys = ('continent', 'country')
+    metrics = ROLLUP_METRICS
+    weights = POPULATION_WEIGHTS
+    labels = ROLLUP_LABELS
+
+
+class ContinentRollupReport(RollupReport):
+    """Indicators per continent and for the world, derived from per-country partials."""
+
+    keys = ('continent', 'country')
+    metrics = ROLLUP_METRICS
+    weights = POPULATION_WEIGHTS
+    labels = ROLLUP_LABELS
+    levels = (0, 1)
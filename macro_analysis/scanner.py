@@ -0,0 +1,184 @@
+import csv
+import io
+import mmap
+from operator import itemgetter
+
+from macro_analysis.compression import MAGIC_BYTES, compression_by_extension, compression_by_magic, open_text
+from macro_analysis.dtypes import PARSERS, normalize_columns
+from macro_analysis.filters import parse_filters
+
+# Размер блока, который разбивается на строки за один вызов split
+CHUNK_BYTES = 1024 * 1024
+
+
+def scan_file(file_path, columns=None, filters=()):
+    """
+    Yield rows of a UTF-8 CSV file as dicts, decoding only ``columns``.
+
+    The file is memory-mapped and split into lines and fields as bytes, so
+    only the selected fields are ever decoded to ``str``. Rows have the same
+    shape as csv.DictReader rows restricted to ``columns`` (all columns when
+    None); columns missing from the header are left out. When ``columns``
+    maps names to dtypes (see dtypes.normalize_columns), numeric fields are
+    parsed straight from bytes without decoding. Rows rejected by
+    ``filters`` (see filters.Filter) are skipped before any dict is built;
+    only the filtered fields are inspected. Files containing quotes fall
+    back to the csv module, since quoted fields may hide delimiters and
+    line breaks. Compressed files cannot be mapped and are streamed
+    through the csv module as well.
+    """
+    columns = normalize_columns(columns)
+    filters = parse_filters(filters)
+    if compression_by_extension(file_path) is not None:
+        yield from _scan_quoted(file_path, columns, filters)
+        return
+    with open(file_path, 'rb') as file:
+        # Сигнатура сжатия читается из того же дескриптора, что и данные
+        if compression_by_magic(file.peek(MAGIC_BYTES)) is not None:
+            yield from _scan_quoted(file_path, columns, filters)
+            return
+        if file.seek(0, 2) == 0:
+            return
+        with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            if mm.find(b'"') == -1:
+                yield from _scan_mapped(mm, columns, filters)
+                return
+        # Файл с кавычками читается модулем csv через уже открытый дескриптор
+        file.seek(0)
+        text = io.TextIOWrapper(file, encoding='utf-8', newline='')
+        try:
+            yield from project_rows(text, columns, filters)
+        finally:
+            text.detach()
+
+
+def _scan_mapped(mm, columns, filters):
+    # Заголовок — первая непустая строка, как в csv.DictReader
+    size = len(mm)
+    position = 0
+    header = b''
+    while not header and position < size:
+        end = mm.find(b'\n', position)
+        end = size if end == -1 else end
+        header = mm[position:end].rstrip(b'\r')
+        position = end + 1
+    if not header:
+        return
+    fieldnames = header.decode('utf-8').split(',')
+    width = len(fieldnames)
+
+    if any(item.column not in fieldnames for item in filters):
+        # Условие по отсутствующей колонке не выполняется ни для одной строки
+        return
+    checks = [(fieldnames.index(item.column), item.test) for item in filters]
+
+    if columns is None:
+        selected = list(enumerate(fieldnames))
+        maxsplit = -1
+    else:
+        selected = [(fieldnames.index(name), name) for name in columns if name in fieldnames]
+        # Поля правее последней нужной колонки не разделяются вовсе
+        maxsplit = max([index for index, _ in selected + checks] or [0]) + 1
+    names = [name for _, name in selected]
+    indexes = [index for index, _ in selected]
+    needed = max(indexes, default=-1) + 1
+    getter = itemgetter(*indexes) if len(indexes) > 1 else lambda fields: tuple(fields[i] for i in indexes)
+    decode = bytes.decode
+    # float() и int() принимают байты, поэтому числовые поля не декодируются
+    parsers = [(PARSERS[columns[name]] if columns else None) or decode for name in names]
+    typed = any(parser is not decode for parser in parsers)
+
+    for lines in _iter_chunks(mm, position):
+        for line in lines:
+            # Окончание \r\n может встречаться не во всех строках (например, в склеенных выгрузках)
+            line = line.rstrip(b'\r')
+            if not line:
+                continue
+            fields = line.split(b',', maxsplit)
+            count = len(fields)
+            if checks and not all(index < count and test(fields[index]) for index, test in checks):
+                continue
+            if count < needed:
+                # Короткая строка: недостающие поля равны None, как в csv.DictReader
+                row = {
+                    name: parse(fields[index]) if index < count else None
+                    for index, name, parse in zip(indexes, names, parsers)
+                }
+            elif typed:
+                row = dict(zip(names, [parse(value) for parse, value in zip(parsers, getter(fields))]))
+            else:
+                row = dict(zip(names, map(decode, getter(fields))))
+            # Как csv.DictReader: лишние поля собираются под ключом None
+            if columns is None and count > width:
+                row[None] = [decode(field) for field in fields[width:]]
+            yield row
+
+
+def _iter_chunks(mm, position):
+    """Yield the mapping from ``position`` as lists of lines, about CHUNK_BYTES at a time."""
+    size = len(mm)
+    while position < size:
+        limit = position + CHUNK_BYTES
+        if limit >= size:
+            end = size
+        else:
+            end = mm.rfind(b'\n', position, limit)
+            if end == -1:
+                # Строка длиннее блока
+                end = mm.find(b'\n', limit)
+                if end == -1:
+                    end = size
+        yield mm[position:end].split(b'\n')
+        position = end + 1
+
+
+def _scan_quoted(file_path, columns, filters):
+    with open_text(file_path, newline='') as file:
+        yield from project_rows(file, columns, filters)
+
+
+def project_rows(file, columns=None, filters=()):
+    """
+    Read rows of a CSV text ``file`` like csv.DictReader, restricted to ``columns`` ({name: dtype}).
+
+    Rows rejected by ``filters`` are dropped before projection and parsing.
+    With ``columns`` the fields are taken from csv.reader lists by index,
+    so only one dict with the selected fields is built per row.
+    """
+    if columns is None:
+        rows = csv.DictReader(file)
+        if filters:
+            rows = (row for row in rows if all(item.matches(row) for item in filters))
+        yield from rows
+        return
+
+    reader = csv.reader(file)
+    # Заголовок — первая непустая строка, как в csv.DictReader
+    fieldnames = next((fields for fields in reader if fields), None)
+    if fieldnames is None or any(item.column not in fieldnames for item in filters):
+        return
+    checks = [(fieldnames.index(item.column), item.test) for item in filters]
+    selected = [(fieldnames.index(name), name, PARSERS[dtype]) for name, dtype in columns.items() if name in fieldnames]
+    indexes = [index for index, _, _ in selected]
+    names = [name for _, name, _ in selected]
+    parsers = [parse for _, _, parse in selected]
+    needed = max(indexes, default=-1) + 1
+    getter = itemgetter(*indexes) if len(indexes) > 1 else lambda fields: tuple(fields[i] for i in indexes)
+    typed = any(parsers)
+
+    for fields in reader:
+        if not fields:
+            continue
+        count = len(fields)
+        if checks and not all(index < count and test(fields[index]) for index, test in checks):
+            continue
+        if count < needed:
+            # Короткая строка: недостающие поля равны None, как в csv.DictReader
+            yield {
+                name: (parse(fields[index]) if parse else fields[index]) if index < count else None
+                for index, name, parse in selected
+            }
+        elif typed:
+            yield dict(zip(names, [parse(value) if parse else value for parse, value in zip(parsers, getter(fields))]))
+        else:
+            yield dict(zip(names, getter(fields)))
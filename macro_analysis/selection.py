@@ -0,0 +1,52 @@
+import heapq
+from collections import deque
+from itertools import islice
+
+
+def select_rows(rows, sort_key=None, top=None, bottom=None):
+    """
+    First ``top`` or last ``bottom`` rows of a report in ``sort_key`` order.
+
+    The rows are selected with a heap bounded by N, so only N rows are
+    kept and sorted and ``rows`` may be a lazy iterable. The result equals
+    ``sorted(rows, key=sort_key)[:top]`` (or ``[-bottom:]``), ties
+    included. Without ``sort_key`` the rows are taken as already ordered;
+    without ``top`` and ``bottom`` every row is returned.
+    """
+    if top is not None and bottom is not None:
+        raise ValueError("Нельзя одновременно выбирать первые и последние строки")
+    for count in (top, bottom):
+        if count is not None and count < 0:
+            raise ValueError(f"Количество строк не может быть отрицательным: {count}")
+
+    if sort_key is None:
+        if top is not None:
+            return list(islice(rows, top))
+        if bottom is not None:
+            return list(deque(rows, maxlen=bottom))
+        return list(rows)
+    if top is not None:
+        return heapq.nsmallest(top, rows, key=sort_key)
+    if bottom is not None:
+        # Номер строки сохраняет исходный порядок равных строк, как в sorted()
+        last = heapq.nlargest(bottom, enumerate(rows), key=lambda item: (sort_key(item[1]), item[0]))
+        return [row for _, row in reversed(last)]
+    return sorted(rows, key=sort_key)
+
+
+def generate_report(report, top=None, bottom=None):
+    """
+    ``report.generate()`` limited to the first ``top`` or last ``bottom`` rows.
+
+    Reports whose generate() accepts ``top`` and ``bottom`` select the rows
+    themselves; for others (e.g. from plugins) the full result is generated
+    and then limited by the report's ``sort_key``.
+    """
+    if top is None and bottom is None:
+        return report.generate()
+    # inspect нужен только при ограничении строк и заметно замедляет запуск CLI
+    import inspect
+
+    if 'top' in inspect.signature(report.generate).parameters:
+        return report.generate(top=top, bottom=bottom)
+    return select_rows(report.generate(), getattr(report, 'sort_key', None), top, bottom)
@@ -0,0 +1,253 @@
+import argparse
+import json
+import os
+import socketserver
+import sys
+import threading
+from collections import OrderedDict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, unquote, urlsplit
+
+from macro_analysis.batch import aggregate_reports, generate_reports
+from macro_analysis.dtypes import is_frame
+from macro_analysis.filters import filter_key, parse_filters
+from macro_analysis.loader import DataLoader
+from macro_analysis.registry import ReportRegistry
+from macro_analysis.selection import generate_report
+
+# Сколько агрегатов (отчет, условия) хранится на файл; давно не запрошенные вытесняются
+MAX_AGGREGATES = 32
+
+
+class _LoadedFile:
+    def __init__(self, mtime_ns, size, data):
+        self.mtime_ns = mtime_ns
+        self.size = size
+        self.data = data
+        # (отчет, условия) -> агрегат этого файла, в порядке последнего использования
+        self.aggregates = OrderedDict()
+
+
+class Dataset:
+    """
+    Input files kept resident in memory for repeated report queries.
+
+    Each file is loaded once and reloaded by refresh() only when its mtime
+    or size changes. Per-file report aggregates are cached per set of
+    filters, so a repeated query only merges one small aggregate per file;
+    each file keeps the ``max_aggregates`` most recently used ones, so
+    memory does not grow with every distinct filter clients send.
+    """
+
+    def __init__(self, file_paths, loader='csv', compact=False, max_aggregates=MAX_AGGREGATES):
+        self.file_paths = list(file_paths)
+        self.max_aggregates = max_aggregates
+        if loader == 'columnar':
+            from macro_analysis.columnar import ColumnarLoader
+
+            self.loader = ColumnarLoader()
+        else:
+            self.loader = DataLoader(engine=loader, compact=compact)
+        self._files = {}
+        self._lock = threading.Lock()
+
+    def refresh(self, strict=False):
+        """
+        Reload files that changed on disk and return their paths.
+
+        With ``strict`` a missing or unreadable file raises; otherwise the
+        last loaded version keeps being served and the error is logged.
+        """
+        reloaded = []
+        for file_path in self.file_paths:
+            try:
+                stat = os.stat(file_path)
+                current = self._files.get(file_path)
+                if current is not None and (current.mtime_ns, current.size) == (stat.st_mtime_ns, stat.st_size):
+                    continue
+                loaded = _LoadedFile(stat.st_mtime_ns, stat.st_size, self.loader.load_files([file_path]))
+            except FileNotFoundError:
+                if strict:
+                    raise FileNotFoundError(f"Файл не найден: {file_path}")
+                print(f"Ошибка: Файл не найден: {file_path}", file=sys.stderr)
+                continue
+            except Exception as e:
+                if strict:
+                    raise
+                print(f"Ошибка: {str(e)}", file=sys.stderr)
+                continue
+            with self._lock:
+                self._files[file_path] = loaded
+            reloaded.append(file_path)
+        return reloaded
+
+    def files(self):
+        with self._lock:
+            return [
+                {'path': path, 'mtime_ns': loaded.mtime_ns, 'size': loaded.size, 'rows': len(loaded.data)}
+                for path, loaded in self._files.items()
+            ]
+
+    def query(self, report_name, filters=(), top=None, bottom=None):
+        """
+        Generate ``report_name`` over the resident data; raises KeyError for unknown reports.
+
+        ``top`` / ``bottom`` keep only the first / last N rows.
+        """
+        report_cls = ReportRegistry.get_report(report_name)
+        if not report_cls:
+            raise KeyError(f"Неизвестный тип отчета: {report_name}")
+        filters = parse_filters(filters)
+        with self._lock:
+            loaded_files = [self._files[path] for path in self.file_paths if path in self._files]
+
+        if not hasattr(report_cls, 'aggregate_class'):
+            rows = [row for loaded in loaded_files for row in _filtered(loaded.data, filters)]
+            return generate_reports([report_cls], rows, top, bottom)[0]
+
+        key = (report_name, filter_key(filters))
+        total = report_cls.aggregate_class()
+        for loaded in loaded_files:
+            with self._lock:
+                aggregate = loaded.aggregates.get(key)
+                if aggregate is not None:
+                    loaded.aggregates.move_to_end(key)
+            if aggregate is None:
+                aggregate, = aggregate_reports([report_cls], _filtered(loaded.data, filters))
+                with self._lock:
+                    loaded.aggregates[key] = aggregate
+                    while len(loaded.aggregates) > self.max_aggregates:
+                        loaded.aggregates.popitem(last=False)
+            total.merge(aggregate)
+        return generate_report(report_cls(aggregate=total), top, bottom)
+
+
+def _filtered(data, filters):
+    if not filters:
+        return data
+    if not is_frame(data):
+        return [row for row in data if all(item.matches(row) for item in filters)]
+    mask = filters[0].mask(data)
+    for item in filters[1:]:
+        mask &= item.mask(data)
+    return data[mask]
+
+
+class ReportRequestHandler(BaseHTTPRequestHandler):
+    """
+    JSON API over the resident dataset.
+
+    GET /reports                      -> {"reports": [...]}
+    GET /reports/<name>?where=<cond>  -> {"report": name, "rows": [...]}
+        &top=<N> or &bottom=<N> limits the rows
+    GET /files                        -> {"files": [...]}
+    """
+
+    dataset = None
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        parts = [unquote(part) for part in url.path.strip('/').split('/') if part]
+        try:
+            if parts == ['reports']:
+                self._send(200, {'reports': ReportRegistry.names()})
+            elif len(parts) == 2 and parts[0] == 'reports':
+                params = parse_qs(url.query)
+                limits = {name: int(params[name][0]) for name in ('top', 'bottom') if name in params}
+                rows = self.dataset.query(parts[1], params.get('where', []), **limits)
+                self._send(200, {'report': parts[1], 'rows': rows})
+            elif parts == ['files']:
+                self._send(200, {'files': self.dataset.files()})
+            else:
+                self._send(404, {'error': f"Неизвестный путь: {url.path}"})
+        except KeyError as e:
+            self._send(404, {'error': e.args[0]})
+        except ValueError as e:
+            self._send(400, {'error': str(e)})
+        except Exception as e:
+            self._send(500, {'error': str(e)})
+
+    def address_string(self):
+        # У Unix-сокета нет адреса клиента
+        return self.client_address[0] if self.client_address else 'unix'
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+    def _send(self, status, payload):
+        body = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+class ThreadingUnixHTTPServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+    def server_bind(self):
+        socketserver.UnixStreamServer.server_bind(self)
+        self.server_name = 'unix'
+        self.server_port = 0
+
+
+def make_server(dataset, host='127.0.0.1', port=8000, socket_path=None, verbose=False):
+    """Create an HTTP server (TCP, or a Unix socket when ``socket_path`` is set) over ``dataset``."""
+    handler = type('DatasetRequestHandler', (ReportRequestHandler,), {'dataset': dataset})
+    if socket_path:
+        if os.path.exists(socket_path):
+            os.unlink(socket_path)
+        server = ThreadingUnixHTTPServer(socket_path, handler)
+    else:
+        server = ThreadingHTTPServer((host, port), handler)
+    server.verbose = verbose
+    return server
+
+
+def watch(dataset, interval, stop_event):
+    """Poll the dataset files every ``interval`` seconds until ``stop_event`` is set."""
+    while not stop_event.wait(interval):
+        for file_path in dataset.refresh():
+            print(f"Файл перезагружен: {file_path}", file=sys.stderr)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='macro-analysis serve',
+                                     description='Сервер отчетов с данными в памяти')
+    parser.add_argument('--files', nargs='+', required=True, help='Список CSV файлов')
+    parser.add_argument('--loader', choices=['csv', 'mmap', 'columnar'], default='csv',
+                        help='Способ загрузки данных в память')
+    parser.add_argument('--compact', action='store_true',
+                        help='Хранить строки компактно (RecordStore): в несколько раз меньше памяти')
+    parser.add_argument('--host', default='127.0.0.1', help='Адрес HTTP сервера')
+    parser.add_argument('--port', type=int, default=8000, help='Порт HTTP сервера')
+    parser.add_argument('--socket', help='Слушать Unix-сокет вместо TCP порта')
+    parser.add_argument('--watch-interval', type=float, default=1.0,
+                        help='Период проверки изменений файлов в секундах')
+    parser.add_argument('--verbose', action='store_true', help='Журналировать запросы в stderr')
+    args = parser.parse_args(argv)
+
+    try:
+        dataset = Dataset(args.files, args.loader, args.compact)
+        dataset.refresh(strict=True)
+        server = make_server(dataset, args.host, args.port, args.socket, args.verbose)
+    except Exception as e:
+        print(f"Ошибка: {str(e)}")
+        return
+
+    stop_event = threading.Event()
+    watcher = threading.Thread(target=watch, args=(dataset, args.watch_interval, stop_event), daemon=True)
+    watcher.start()
+    address = args.socket or f'http://{args.host}:{server.server_address[1]}'
+    print(f"Сервер отчетов запущен: {address}", file=sys.stderr)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        stop_event.set()
+        server.server_close()
+        if args.socket and os.path.exists(args.socket):
+            os.unlink(args.socket)
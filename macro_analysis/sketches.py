@@ -0,0 +1,174 @@
+import math
+
+# Ошибка ранга по умолчанию: 1% от количества значений
+DEFAULT_ERROR = 0.01
+MIN_K = 8
+# Во сколько раз емкость уровня меньше емкости уровня выше
+CAPACITY_RATIO = 2 / 3
+
+
+def k_for_error(error):
+    """Sketch size ``k`` giving about ``error`` normalized rank error (empirical fit for KLL)."""
+    if not 0 < error < 1:
+        raise ValueError(f"Ошибка квантиля должна быть в интервале (0, 1): {error}")
+    return max(MIN_K, math.ceil((2.296 / error) ** (1 / 0.9723)))
+
+
+def max_items(error=DEFAULT_ERROR):
+    """Upper bound of the number of values a sketch keeps (at most two extra per level, 64 levels)."""
+    return math.ceil(k_for_error(error) / (1 - CAPACITY_RATIO)) + 2 * 64
+
+
+class KLLSketch:
+    """
+    Mergeable quantile sketch (Karnin, Lang, Liberty, 2016).
+
+    Values are kept in levels: an item at level ``h`` stands for ``2**h``
+    values. When the sketch is over capacity, the lowest full level is
+    sorted and every other item is promoted one level up, so the sketch
+    holds O(k) items however many values it has seen. A quantile query
+    returns a value whose rank is within ``error * count`` of the
+    requested rank with high probability.
+
+    Merging concatenates the levels and compacts, which gives the same
+    guarantee as one sketch over all values, so sketches from separate
+    files, workers or spilled partitions combine without extra error.
+    While the values fit into the first level nothing is compacted and
+    quantiles are exact. Compaction alternates the kept half per level
+    instead of flipping a coin, so results are reproducible.
+    """
+
+    __slots__ = ('k', 'count', 'minimum', 'maximum', 'levels', '_offsets', '_size', '_limit')
+
+    def __init__(self, error=DEFAULT_ERROR, k=None):
+        self.k = k if k is not None else k_for_error(error)
+        self.count = 0
+        self.minimum = None
+        self.maximum = None
+        self.levels = [[]]
+        self._offsets = [0]
+        # Количество хранимых значений и суммарная емкость уровней
+        self._size = 0
+        self._limit = self._capacity(0)
+
+    def __len__(self):
+        return self.count
+
+    def __eq__(self, other):
+        if not isinstance(other, KLLSketch):
+            return NotImplemented
+        return self.to_dict() == other.to_dict()
+
+    def _capacity(self, level):
+        return max(2, math.ceil(self.k * CAPACITY_RATIO ** (len(self.levels) - level - 1)))
+
+    def update(self, value):
+        self.levels[0].append(value)
+        self.count += 1
+        self._size += 1
+        if self.minimum is None or value < self.minimum:
+            self.minimum = value
+        if self.maximum is None or value > self.maximum:
+            self.maximum = value
+        if self._size > self._limit:
+            self._compress()
+        return self
+
+    def extend(self, values):
+        """Add a batch of values and compact once for the whole batch."""
+        values = list(values)
+        if not values:
+            return self
+        self.levels[0].extend(values)
+        self.count += len(values)
+        self._size += len(values)
+        low, high = min(values), max(values)
+        self.minimum = low if self.minimum is None else min(self.minimum, low)
+        self.maximum = high if self.maximum is None else max(self.maximum, high)
+        self._compress()
+        return self
+
+    def merge(self, other):
+        if not other.count:
+            return self
+        while len(self.levels) < len(other.levels):
+            self._grow()
+        for level, items in enumerate(other.levels):
+            self.levels[level].extend(items)
+        self.count += other.count
+        self._size += other._size
+        self.minimum = other.minimum if self.minimum is None else min(self.minimum, other.minimum)
+        self.maximum = other.maximum if self.maximum is None else max(self.maximum, other.maximum)
+        self._compress()
+        return self
+
+    def _grow(self):
+        self.levels.append([])
+        self._offsets.append(0)
+        self._limit = sum(self._capacity(level) for level in range(len(self.levels)))
+
+    def _compress(self):
+        while self._size > self._limit:
+            for level, items in enumerate(self.levels):
+                if len(items) >= self._capacity(level):
+                    self._compact(level)
+                    break
+
+    def _compact(self, level):
+        if level + 1 == len(self.levels):
+            self._grow()
+        items = sorted(self.levels[level])
+        # При нечетном количестве одно значение остается на уровне
+        kept = [items.pop()] if len(items) % 2 else []
+        offset = self._offsets[level]
+        self._offsets[level] = 1 - offset
+        promoted = items[offset::2]
+        self.levels[level + 1].extend(promoted)
+        self.levels[level] = kept
+        self._size -= len(items) - len(promoted)
+
+    def quantiles(self, fractions):
+        """Approximate values at ``fractions`` (0..1) of the sorted values; None for an empty sketch."""
+        if not self.count:
+            return [None] * len(fractions)
+        weighted = sorted((value, 1 << level) for level, items in enumerate(self.levels) for value in items)
+        total = sum(weight for _, weight in weighted)
+        result = []
+        for fraction in fractions:
+            if fraction <= 0:
+                result.append(self.minimum)
+                continue
+            if fraction >= 1:
+                result.append(self.maximum)
+                continue
+            rank, seen = math.ceil(fraction * total), 0
+            for value, weight in weighted:
+                seen += weight
+                if seen >= rank:
+                    result.append(value)
+                    break
+        return result
+
+    def quantile(self, fraction):
+        return self.quantiles([fraction])[0]
+
+    def to_dict(self):
+        return {
+            'k': self.k,
+            'count': self.count,
+            'min': self.minimum,
+            'max': self.maximum,
+            'levels': [list(items) for items in self.levels],
+            'offsets': list(self._offsets),
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        sketch = cls(k=int(data['k']))
+        sketch.count = int(data['count'])
+        sketch.minimum, sketch.maximum = data['min'], data['max']
+        sketch.levels = [[float(value) for value in items] for items in data['levels']]
+        sketch._offsets = [int(offset) for offset in data['offsets']]
+        sketch._size = sum(map(len, sketch.levels))
+        sketch._limit = sum(sketch._capacity(level) for level in range(len(sketch.levels)))
+        return sketch
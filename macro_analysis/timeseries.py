@@ -0,0 +1,154 @@
+from abc import ABC, abstractmethod
+
+import numpy as np
+
+from macro_analysis.groupby import GroupByReport
+from macro_analysis.selection import select_rows
+
+
+class TimeSeriesIndex:
+    """
+    Yearly values of one metric sorted by (country, year) into contiguous arrays.
+
+    ``countries`` are in order of first appearance; the series of
+    ``countries[i]`` is ``years[starts[i]:ends[i]]`` /
+    ``values[starts[i]:ends[i]]`` with years ascending. ``codes`` gives the
+    country number of every position. Window computations are vectorized
+    over the whole arrays and check ``codes`` and ``years`` to stay inside
+    one country's consecutive years, so each runs in linear time after
+    the single sort.
+    """
+
+    def __init__(self, countries, codes, years, values):
+        self.countries = countries
+        self.codes = codes
+        self.years = years
+        self.values = values
+        boundaries = np.flatnonzero(np.diff(codes)) + 1
+        self.starts = np.concatenate(([0], boundaries)) if len(codes) else np.array([], dtype=np.int64)
+        self.ends = np.concatenate((boundaries, [len(codes)])) if len(codes) else np.array([], dtype=np.int64)
+
+    def __len__(self):
+        return len(self.values)
+
+    @classmethod
+    def from_cells(cls, cells):
+        """Build from ``(country, year, value)`` triples with at most one triple per country and year."""
+        countries = {}
+        codes, years, values = [], [], []
+        for country, year, value in cells:
+            codes.append(countries.setdefault(country, len(countries)))
+            years.append(year)
+            values.append(np.nan if value is None else value)
+        codes = np.array(codes, dtype=np.int64)
+        years = np.array(years, dtype=np.float64)
+        values = np.array(values, dtype=np.float64)
+        order = np.lexsort((years, codes))
+        return cls(list(countries), codes[order], years[order], values[order])
+
+    @classmethod
+    def from_aggregate(cls, aggregate, metric):
+        """Build from a GroupAggregate keyed by (country, year), using the mean of ``metric`` per cell."""
+        return cls.from_cells(
+            (country, year, values[(metric, 'mean')])
+            for (country, year), values in aggregate.results()
+        )
+
+    def _window_valid(self, lag):
+        """Positions ``i >= lag`` whose window ``i - lag .. i`` covers ``lag + 1`` consecutive years of one country."""
+        valid = np.zeros(len(self), dtype=bool)
+        if len(self) > lag:
+            valid[lag:] = (self.codes[lag:] == self.codes[:-lag]) & (self.years[lag:] - self.years[:-lag] == lag)
+        return valid
+
+    def year_over_year(self):
+        """Absolute and relative change against the previous year; NaN without a previous year."""
+        delta = np.full(len(self), np.nan)
+        valid = self._window_valid(1)
+        delta[1:] = self.values[1:] - self.values[:-1]
+        delta[~valid] = np.nan
+        previous = np.full(len(self), np.nan)
+        previous[1:] = self.values[:-1]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            percent = np.where(valid & (previous != 0), delta / np.abs(previous) * 100, np.nan)
+        return delta, percent
+
+    def rolling_mean(self, window=3):
+        """Mean over the last ``window`` consecutive years; NaN until a full window is available."""
+        result = np.full(len(self), np.nan)
+        if not len(self):
+            return result
+        # Пропуски не входят в сумму, а окна с пропусками отбрасываются
+        missing = np.isnan(self.values)
+        sums = np.concatenate(([0.0], np.cumsum(np.where(missing, 0.0, self.values))))
+        gaps = np.concatenate(([0], np.cumsum(missing)))
+        lag = window - 1
+        valid = self._window_valid(lag) if lag else np.ones(len(self), dtype=bool)
+        end = np.arange(1, len(self) + 1)
+        start = np.maximum(end - window, 0)
+        valid &= (gaps[end] - gaps[start]) == 0
+        result[valid] = (sums[end] - sums[start])[valid] / window
+        return result
+
+    def growth_rates(self):
+        """
+        Per-country compound annual growth rate between the first and last year with a value.
+
+        Returns arrays of first year, last year, first value, last value and
+        the rate in percent (NaN when it is undefined).
+        """
+        size = len(self.countries)
+        first_year, last_year = np.full(size, np.nan), np.full(size, np.nan)
+        first_value, last_value = np.full(size, np.nan), np.full(size, np.nan)
+        present = ~np.isnan(self.values)
+        codes, years, values = self.codes[present], self.years[present], self.values[present]
+        if len(codes):
+            starts = np.concatenate(([True], codes[1:] != codes[:-1]))
+            ends = np.concatenate((codes[1:] != codes[:-1], [True]))
+            first_year[codes[starts]], first_value[codes[starts]] = years[starts], values[starts]
+            last_year[codes[ends]], last_value[codes[ends]] = years[ends], values[ends]
+        span = last_year - first_year
+        with np.errstate(divide='ignore', invalid='ignore'):
+            defined = (span > 0) & (first_value > 0) & (last_value > 0)
+            rate = np.where(defined, (last_value / first_value) ** (1 / np.where(defined, span, 1)) - 1, np.nan)
+        return first_year, last_year, first_value, last_value, rate * 100
+
+
+def as_value(value):
+    """NumPy scalar -> float or None for missing values."""
+    if value is None or np.isnan(value):
+        return None
+    return float(value)
+
+
+def as_year(value):
+    """NumPy scalar -> int year or None for missing values."""
+    value = as_value(value)
+    return None if value is None else int(value)
+
+
+class TimeSeriesReport(GroupByReport, ABC):
+    """
+    Base class for reports over the yearly series of one metric per country.
+
+    Rows are aggregated into (country, year) cells with the group-by
+    engine, so the aggregate is mergeable like any other; generate()
+    sorts the cells once into a TimeSeriesIndex and passes it to
+    ``compute``. The rows are ordered by ``order_key`` if it is set and
+    by country and year otherwise.
+    """
+
+    keys = ('country', 'year')
+    metric = 'gdp'
+    metrics = {'gdp': ('mean',)}
+    row_per_group = False
+    order_key = None
+
+    def generate(self, top=None, bottom=None):
+        aggregate = self.aggregate if self.aggregate is not None else self.aggregate_data()
+        rows = self.compute(TimeSeriesIndex.from_aggregate(aggregate, self.metric))
+        return select_rows(rows, self.order_key, top, bottom)
+
+    @abstractmethod
+    def compute(self, index):
+        """Report rows for the series in ``index`` (a TimeSeriesIndex)."""
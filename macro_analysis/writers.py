@@ -0,0 +1,160 @@
+import csv
+import json
+import os
+import sys
+from itertools import islice
+
+FORMATS = ['grid', 'csv', 'jsonl', 'parquet']
+
+# Сколько строк отчета накапливать перед записью очередной группы строк parquet
+PARQUET_BATCH_ROWS = 65536
+
+
+def write_grid(rows, stream):
+    """Human readable numbered table; the whole table is built in memory."""
+    # tabulate импортируется только при выводе таблицы, а не при запуске CLI
+    import tabulate
+
+    # Добавляем нумерацию строк
+    numbered_result = []
+    for idx, row in enumerate(rows, 1):
+        # Заменяем None на "Н/Д" для отображения
+        numbered_row = {'№': idx, **{key: "Н/Д" if value is None else value for key, value in row.items()}}
+        numbered_result.append(numbered_row)
+
+    # Выводим с нумерацией
+    print(tabulate.tabulate(numbered_result, headers='keys', tablefmt='grid'), file=stream)
+
+
+def write_csv(rows, stream):
+    """Stream rows as CSV with a header taken from the first row."""
+    writer = None
+    for row in rows:
+        if writer is None:
+            writer = csv.DictWriter(stream, fieldnames=list(row), lineterminator='\n')
+            writer.writeheader()
+        writer.writerow(row)
+
+
+def write_jsonl(rows, stream):
+    """Stream rows as JSON Lines, one object per line."""
+    for row in rows:
+        stream.write(json.dumps(row, ensure_ascii=False))
+        stream.write('\n')
+
+
+def write_parquet(rows, path):
+    """
+    Write rows to a Parquet file in row groups of PARQUET_BATCH_ROWS rows.
+
+    The file schema is inferred from the rows: int columns that later get
+    floats are widened to double, and batches are held back while some
+    column has only had None. Values that still do not fit the schema
+    raise ValueError instead of being truncated.
+    """
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise ValueError("Для формата parquet требуется пакет pyarrow (pip install macro_analysis[parquet])")
+
+    iterator = iter(rows)
+    pending = []
+    schema = None
+    writer = None
+    try:
+        while True:
+            batch = list(islice(iterator, PARQUET_BATCH_ROWS))
+            if not batch:
+                break
+            table = pa.Table.from_pylist(batch)
+            if writer is not None:
+                writer.write_table(_cast_table(table, writer.schema))
+                continue
+            pending.append(table)
+            schema = pa.unify_schemas([schema or table.schema, table.schema], promote_options='permissive')
+            # Пока у столбца нет ни одного значения, его тип неизвестен: группы строк не записываются
+            if any(pa.types.is_null(field.type) for field in schema):
+                continue
+            writer = pq.ParquetWriter(path, schema)
+            for table in pending:
+                writer.write_table(_cast_table(table, schema))
+            pending = []
+        if pending:
+            writer = pq.ParquetWriter(path, schema)
+            for table in pending:
+                writer.write_table(_cast_table(table, schema))
+    finally:
+        if writer is not None:
+            writer.close()
+
+
+def _cast_table(table, schema):
+    """Cast a batch to the file schema; lossy conversions raise ValueError."""
+    import pyarrow as pa
+
+    try:
+        return table.cast(schema, safe=True)
+    except (pa.ArrowInvalid, pa.ArrowNotImplementedError) as error:
+        raise ValueError(f"Значения отчета не совпадают с типами столбцов parquet: {error}")
+
+
+TEXT_WRITERS = {
+    'grid': write_grid,
+    'csv': write_csv,
+    'jsonl': write_jsonl,
+}
+
+
+def write_result(rows, fmt='grid', output=None):
+    """
+    Write report rows in the given format to ``output`` or stdout.
+
+    csv, jsonl and parquet consume ``rows`` one at a time and never build the
+    whole output in memory; grid is meant for humans and small results.
+    """
+    if fmt == 'parquet':
+        if output is None:
+            raise ValueError("Для формата parquet нужно указать файл --output")
+        write_parquet(rows, output)
+        return
+
+    writer = TEXT_WRITERS.get(fmt)
+    if writer is None:
+        raise ValueError(f"Неизвестный формат вывода: {fmt}")
+
+    if output is None:
+        writer(rows, sys.stdout)
+        return
+    with open(output, 'w', encoding='utf-8', newline='') as stream:
+        writer(rows, stream)
+
+
+def section_path(output, report_name):
+    """``out/result.csv`` -> ``out/result.<report_name>.csv``."""
+    root, ext = os.path.splitext(output)
+    return f'{root}.{report_name}{ext}'
+
+
+def write_results(results, fmt='grid', output=None):
+    """
+    Write ``(report_name, rows)`` pairs, one section or file per report.
+
+    A single report is written exactly as by write_result(). With several
+    reports, stdout gets a titled section per report and ``output`` becomes
+    one file per report (see section_path).
+    """
+    if len(results) == 1:
+        write_result(results[0][1], fmt, output)
+        return
+
+    for index, (report_name, rows) in enumerate(results):
+        if output is not None:
+            write_result(rows, fmt, section_path(output, report_name))
+            continue
+        if fmt == 'parquet':
+            raise ValueError("Для формата parquet нужно указать файл --output")
+        if index:
+            print()
+        print(f"Отчет: {report_name}")
+        write_result(rows, fmt)
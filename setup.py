@@ -12,6 +12,10 @@ setup(
         'pandas',
         'numpy'
     ],
+    extras_require={
+        'parquet': ['pyarrow>=14'],
+        'zstd': ['zstandard'],
+    },
     entry_points={
         'console_scripts': [
             'macro-analysis=macro_analysis.cli:main'
@@ -0,0 +1,10 @@
+"""Shared pytest fixtures."""
+import pytest
+
+
+@pytest.fixture(autouse=True)
+def isolated_cache_dir(tmp_path, monkeypatch):
+    """Keep the CLI file cache out of the user's home directory."""
+    cache_dir = tmp_path / "cache"
+    monkeypatch.setenv('MACRO_ANALYSIS_CACHE_DIR', str(cache_dir))
+    return cache_dir
@@ -0,0 +1,160 @@
+"""Tests for Parquet / Arrow IPC input and the convert subcommand."""
+import os
+
+import pytest
+
+pa = pytest.importorskip('pyarrow')
+import pyarrow.parquet as pq  # noqa: E402
+
+from macro_analysis import arrow  # noqa: E402
+from macro_analysis.cli import main  # noqa: E402
+from macro_analysis.columnar import ColumnarLoader  # noqa: E402
+from macro_analysis.convert import parquet_path  # noqa: E402
+from macro_analysis.loader import DataLoader  # noqa: E402
+
+CONTENT = """country,year,gdp,gdp_growth,inflation,unemployment,population,continent
+United States,2021,23315,5.9,4.7,5.4,337,North America
+China,2021,17734,8.4,0.9,4.0,1412,Asia
+United States,2022,25462,2.1,8.0,3.6,338,North America
+China,2022,17963,3.0,2.0,5.6,1412,Asia
+United States,2023,27360,2.5,4.1,3.7,339,North America
+Germany,2023,4430,-0.3,5.9,3.0,84,Europe
+"""
+
+
+@pytest.fixture
+def csv_file(tmp_path):
+    path = tmp_path / "data.csv"
+    path.write_text(CONTENT, encoding='utf-8')
+    return str(path)
+
+
+@pytest.fixture
+def table(csv_file):
+    return pa.Table.from_pandas(ColumnarLoader._read_file(csv_file), preserve_index=False)
+
+
+@pytest.fixture
+def parquet_file(tmp_path, table):
+    path = tmp_path / "data.parquet"
+    # По группе строк на каждый год
+    pq.write_table(table, str(path), row_group_size=2)
+    return str(path)
+
+
+@pytest.fixture
+def ipc_file(tmp_path, table):
+    path = tmp_path / "data.arrow"
+    with pa.ipc.new_file(str(path), table.schema) as writer:
+        writer.write_table(table, max_chunksize=2)
+    return str(path)
+
+
+class TestArrowInput:
+    """Test cases for reading Parquet and Arrow IPC files."""
+
+    def test_detect_format(self, csv_file, parquet_file, ipc_file, tmp_path):
+        """Test detection by extension and by magic bytes."""
+        assert arrow.detect_format(csv_file) is None
+        assert arrow.detect_format(parquet_file) == 'parquet'
+        assert arrow.detect_format(ipc_file) == 'arrow'
+
+        renamed = tmp_path / "data.bin"
+        os.rename(parquet_file, renamed)
+        assert arrow.detect_format(str(renamed)) == 'parquet'
+
+    @pytest.mark.parametrize('engine', ['csv', 'mmap'])
+    def test_rows_match_csv(self, csv_file, parquet_file, ipc_file, engine):
+        """Test that declared columns give the same rows as the CSV file."""
+        loader = DataLoader(engine=engine, columns={'country': str, 'gdp': float}, filters=['year>=2022'])
+
+        expected = loader.load_files([csv_file])
+        assert loader.load_files([parquet_file]) == expected
+        assert loader.load_files([ipc_file]) == expected
+        assert len(expected) == 4
+
+    def test_projection(self, parquet_file):
+        """Test that only the declared and filtered columns are read."""
+        batches = list(arrow.iter_batches(parquet_file, {'gdp': float}, ['continent=Asia']))
+
+        assert all(batch.schema.names == ['gdp', 'continent'] for batch in batches)
+
+    def test_row_groups_skipped_by_statistics(self, parquet_file):
+        """Test that row groups outside the filter range are not read."""
+        batches = list(arrow.iter_batches(parquet_file, ['country'], ['year>=2023']))
+
+        assert sum(batch.num_rows for batch in batches) == 2
+        assert list(arrow.iter_batches(parquet_file, ['country'], ['year>2023'])) == []
+
+    def test_missing_filter_column(self, parquet_file):
+        """Test that a filter on a missing column matches no rows."""
+        assert DataLoader(filters=['region=Asia']).load_files([parquet_file]) == []
+
+    def test_columnar_loader(self, csv_file, parquet_file, ipc_file):
+        """Test the columnar loader on Parquet and Arrow IPC files."""
+        loader = ColumnarLoader(columns={'country': str, 'gdp': float}, filters=['continent=Asia'])
+
+        expected = loader.load_files([csv_file])
+        assert loader.load_files([parquet_file]).equals(expected)
+        assert loader.load_files([ipc_file]).equals(expected)
+
+    def test_missing_file(self, tmp_path):
+        """Test the error for a missing Parquet file."""
+        with pytest.raises(FileNotFoundError, match="Файл не найден"):
+            DataLoader().load_files([str(tmp_path / "missing.parquet")])
+
+
+class TestConvert:
+    """Test cases for the convert subcommand."""
+
+    def test_parquet_path(self):
+        """Test output file names."""
+        assert parquet_path('/data/2023.csv') == '/data/2023.parquet'
+        assert parquet_path('/data/2023.csv.gz', '/out') == '/out/2023.parquet'
+
+    def test_convert_and_report(self, csv_file, tmp_path, capsys):
+        """Test that a report over the converted file equals the CSV report."""
+        main(['convert', '--files', csv_file, '--sort-by', 'year', '--row-group-size', '2'])
+        converted = str(tmp_path / "data.parquet")
+
+        assert converted in capsys.readouterr().out
+        assert pq.ParquetFile(converted).metadata.num_row_groups == 3
+        main(['--files', converted, '--report', 'average-gdp'])
+        from_parquet = capsys.readouterr().out
+        main(['--files', csv_file, '--report', 'average-gdp'])
+        assert from_parquet == capsys.readouterr().out
+
+    @pytest.mark.parametrize('loader', ['csv', 'columnar'])
+    def test_convert_keeps_float_values(self, tmp_path, loader, capsys):
+        """Test that fractional values survive conversion bit for bit, so averages match to the last digit."""
+        source = tmp_path / "floats.csv"
+        rows = [f"C{i % 40},{2000 + i % 24},{i * 7919 % 30011 + i / 97:.{2 + i % 13}f}" for i in range(1, 3000)]
+        source.write_text("country,year,gdp\n" + "\n".join(rows) + "\nC0,2000,\n", encoding='utf-8')
+        main(['convert', '--files', str(source), '--sort-by', 'year'])
+        capsys.readouterr()
+
+        report = ['--report', 'average-gdp', '--format', 'csv', '--no-cache']
+        main(['--files', str(tmp_path / "floats.parquet"), '--loader', loader, *report])
+        from_parquet = capsys.readouterr().out
+        main(['--files', str(source), *report])
+        assert from_parquet == capsys.readouterr().out
+
+    def test_convert_skips_up_to_date(self, csv_file, tmp_path, capsys):
+        """Test that an up-to-date parquet file is not rewritten."""
+        main(['convert', '--files', csv_file])
+        capsys.readouterr()
+
+        main(['convert', '--files', csv_file])
+        assert 'без изменений' in capsys.readouterr().out
+        main(['convert', '--files', csv_file, '--force'])
+        assert 'без изменений' not in capsys.readouterr().out
+
+    def test_convert_missing_file(self, tmp_path, capsys):
+        """Test the error for a missing input file."""
+        main(['convert', '--files', str(tmp_path / "missing.csv")])
+
+        assert 'Файл не найден' in capsys.readouterr().out
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
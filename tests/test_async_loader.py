@@ -0,0 +1,97 @@
+"""Tests for the asyncio-based loader."""
+import asyncio
+import sys
+import threading
+import time
+from io import StringIO
+from unittest.mock import patch
+
+import pytest
+
+from macro_analysis import async_loader
+from macro_analysis.async_loader import AsyncDataLoader
+from macro_analysis.cli import main
+from macro_analysis.loader import DataLoader
+
+
+class TestAsyncDataLoader:
+    """Test cases for AsyncDataLoader class."""
+
+    @pytest.fixture
+    def files(self, tmp_path):
+        """Create several small CSV files."""
+        paths = []
+        for i in range(7):
+            path = tmp_path / f"file{i}.csv"
+            path.write_text(f"country,year,gdp\nCountry{i},2023,{100 + i}\nCountry{i},2022,{200 + i}\n",
+                            encoding='utf-8')
+            paths.append(str(path))
+        return paths
+
+    @pytest.mark.parametrize('engine', ['csv', 'mmap'])
+    def test_rows_match_sync_loader(self, files, engine):
+        """Test that rows and their order match DataLoader."""
+        loader = AsyncDataLoader(concurrency=3, engine=engine, columns={'country': str, 'gdp': float})
+
+        expected = DataLoader(engine=engine, columns={'country': str, 'gdp': float}).load_files(files)
+        assert loader.load_files(files) == expected
+        assert list(loader.iter_rows(files)) == expected
+
+    def test_async_api(self, files):
+        """Test loading from a running event loop."""
+        loader = AsyncDataLoader(concurrency=2, filters=['year=2023'])
+
+        result = asyncio.run(loader.aload_files(files))
+
+        assert [row['country'] for row in result] == [f"Country{i}" for i in range(7)]
+
+    def test_concurrency_limit(self, files, monkeypatch):
+        """Test that no more than ``concurrency`` files are read at once."""
+        lock = threading.Lock()
+        active = []
+        peak = []
+        original = async_loader._read_file_rows
+
+        def slow_read(file_path, **kwargs):
+            with lock:
+                active.append(file_path)
+                peak.append(len(active))
+            time.sleep(0.02)
+            with lock:
+                active.remove(file_path)
+            return original(file_path, **kwargs)
+
+        monkeypatch.setattr(async_loader, '_read_file_rows', slow_read)
+        result = AsyncDataLoader(concurrency=3).load_files(files)
+
+        assert len(result) == 14
+        assert max(peak) == 3
+
+    def test_file_not_found(self, files):
+        """Test the error for a missing file."""
+        loader = AsyncDataLoader()
+
+        with pytest.raises(FileNotFoundError, match="Файл не найден"):
+            loader.load_files(files + ["missing.csv"])
+
+    def test_invalid_concurrency(self):
+        """Test that concurrency must be positive."""
+        with pytest.raises(ValueError):
+            AsyncDataLoader(concurrency=0)
+
+    def test_cli_concurrency(self, files):
+        """Test that --concurrency prints the same table as the default loader."""
+        outputs = []
+        for extra in ([], ['--concurrency', '4']):
+            test_args = ['program.py', '--files', *files, '--report', 'average-gdp', *extra]
+            with patch.object(sys, 'argv', test_args):
+                with patch('sys.stdout', new_callable=StringIO) as mock_stdout:
+                    main()
+                    outputs.append(mock_stdout.getvalue())
+
+        assert 'Country6' in outputs[0]
+        assert outputs[0] == outputs[1]
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
@@ -1,6 +1,7 @@
 """Tests for the average GDP report."""
+import pandas as pd
 import pytest
-from macro_analysis.reports.average_gdp import AverageGDPReport
+from macro_analysis.reports.average_gdp import AverageGDPReport, GDPAggregate
 
 
 class TestAverageGDPReport:
@@ -192,3 +193,92 @@ class TestAverageGDPReport:
 
         expected = (100.123456 + 200.789012) / 2
         assert result[0]['Средний ВВП'] == expected
+
+    def test_generate_from_iterator(self):
+        """Test that the report consumes a one-shot iterator."""
+        data = iter([
+            {'country': 'USA', 'gdp': '100'},
+            {'country': 'USA', 'gdp': '300'},
+            {'country': 'Germany', 'gdp': '150'},
+        ])
+        report = AverageGDPReport(data)
+        result = report.generate()
+
+        assert result == [
+            {'Страна': 'USA', 'Средний ВВП': 200.0},
+            {'Страна': 'Germany', 'Средний ВВП': 150.0},
+        ]
+
+    def test_generate_from_dataframe(self):
+        """Test the vectorized path for typed DataFrames."""
+        data = pd.DataFrame({
+            'country': ['USA', 'USA', 'Germany', 'France', 'France'],
+            'gdp': [200.0, 300.0, 250.0, float('nan'), 100.0],
+        })
+        report = AverageGDPReport(data)
+        result = report.generate()
+
+        assert result == [
+            {'Страна': 'USA', 'Средний ВВП': 250.0},
+            {'Страна': 'Germany', 'Средний ВВП': 250.0},
+            {'Страна': 'France', 'Средний ВВП': 100.0},
+        ]
+
+    def test_generate_from_dataframe_without_gdp(self):
+        """Test that a DataFrame without required columns gives no result."""
+        report = AverageGDPReport(pd.DataFrame({'country': ['USA']}))
+        assert report.generate() == []
+
+
+class TestGDPAggregate:
+    """Test cases for GDPAggregate partial results."""
+
+    def test_update_keeps_sum_and_count_per_country(self):
+        """Test that only one sum and count is kept per country."""
+        aggregate = GDPAggregate().update([
+            {'country': 'USA', 'gdp': '100'},
+            {'country': 'USA', 'gdp': '300'},
+            {'country': 'Germany', 'gdp': 'invalid'},
+            {'country': 'Germany', 'gdp': '150'},
+        ])
+
+        assert len(aggregate) == 2
+        assert aggregate.sums == {'USA': 400.0, 'Germany': 150.0}
+        assert aggregate.counts == {'USA': 2, 'Germany': 1}
+
+    def test_merge_matches_single_pass(self):
+        """Test that merging per-chunk aggregates equals one pass over all rows."""
+        rows = [
+            {'country': 'USA', 'gdp': '100'},
+            {'country': 'Germany', 'gdp': '200'},
+            {'country': 'USA', 'gdp': '300'},
+            {'country': 'France', 'gdp': '50'},
+        ]
+
+        merged = GDPAggregate().update(rows[:2]).merge(GDPAggregate().update(rows[2:]))
+
+        assert merged == GDPAggregate().update(rows)
+        assert AverageGDPReport(aggregate=merged).generate() == AverageGDPReport(rows).generate()
+
+    def test_update_frame_matches_rows(self):
+        """Test that the vectorized update gives the same aggregate as rows."""
+        frame = pd.DataFrame({'country': ['USA', 'Germany', 'USA'], 'gdp': [100.0, 200.0, 300.0]})
+        rows = frame.to_dict('records')
+
+        assert GDPAggregate().update_frame(frame) == GDPAggregate().update(rows)
+
+    def test_serialization_round_trip(self):
+        """Test that aggregates survive a to_dict/from_dict round trip."""
+        aggregate = GDPAggregate().update([
+            {'country': 'USA', 'gdp': '100.1'},
+            {'country': 'Россия', 'gdp': '200.2'},
+        ])
+
+        restored = GDPAggregate.from_dict(aggregate.to_dict())
+
+        assert restored == aggregate
+        assert restored.to_dict() == {'USA': [100.1, 1], 'Россия': [200.2, 1]}
+
+    def test_report_from_empty_aggregate(self):
+        """Test that an empty aggregate gives an empty report."""
+        assert AverageGDPReport(aggregate=GDPAggregate()).generate() == []
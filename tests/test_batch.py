@@ -0,0 +1,191 @@
+"""Tests for computing several reports in one pass."""
+from unittest.mock import patch
+
+import pandas as pd
+import pytest
+
+from macro_analysis.batch import aggregate_reports, generate_reports, merge_columns
+from macro_analysis.cli import main
+from macro_analysis.registry import ReportRegistry
+from macro_analysis.reports.average_gdp import AverageGDPReport
+
+
+class CountAggregate:
+    """Minimal mergeable aggregate counting rows."""
+
+    def __init__(self):
+        self.count = 0
+
+    def add_row(self, row):
+        self.count += 1
+
+    def update(self, rows):
+        for row in rows:
+            self.add_row(row)
+        return self
+
+    def update_frame(self, frame):
+        self.count += len(frame)
+        return self
+
+    def merge(self, other):
+        self.count += other.count
+        return self
+
+    def to_dict(self):
+        return {'count': self.count}
+
+    @classmethod
+    def from_dict(cls, data):
+        aggregate = cls()
+        aggregate.count = data['count']
+        return aggregate
+
+
+class RowCountReport:
+    """Report counting the rows it was given."""
+
+    columns = {'country': str, 'year': int}
+    aggregate_class = CountAggregate
+
+    def __init__(self, data=(), aggregate=None):
+        self.data = data
+        self.aggregate = aggregate
+
+    def generate(self):
+        aggregate = self.aggregate if self.aggregate is not None else CountAggregate().update(self.data)
+        return [{'Строк': aggregate.count}]
+
+
+class PlainReport:
+    """Report without an aggregate that needs all data at once."""
+
+    def __init__(self, data):
+        self.data = data
+
+    def generate(self):
+        return [{'Строк': len(list(self.data))}]
+
+
+ROWS = [
+    {'country': 'USA', 'gdp': '100', 'year': '2023'},
+    {'country': 'USA', 'gdp': '300', 'year': '2022'},
+    {'country': 'Germany', 'gdp': '150', 'year': '2023'},
+]
+
+
+class TestBatch:
+    """Test cases for batch report helpers."""
+
+    def test_merge_columns(self):
+        """Test the union of declared columns."""
+        assert merge_columns([AverageGDPReport, RowCountReport]) == {'country': str, 'gdp': float, 'year': int}
+        assert merge_columns([AverageGDPReport, PlainReport]) is None
+
+    def test_merge_columns_conflicting_dtypes(self):
+        """Test that conflicting dtypes fall back to text."""
+        class GdpAsInt(RowCountReport):
+            columns = {'gdp': int}
+
+        assert merge_columns([AverageGDPReport, GdpAsInt]) == {'country': str, 'gdp': str}
+
+    def test_aggregate_reports_single_pass(self):
+        """Test that a one-shot iterator feeds every report."""
+        gdp, count = aggregate_reports([AverageGDPReport, RowCountReport], iter(ROWS))
+
+        assert gdp.counts == {'USA': 2, 'Germany': 1}
+        assert count.count == 3
+
+    def test_aggregate_reports_frame(self):
+        """Test that DataFrames are handed to each report's vectorized update."""
+        gdp, count = aggregate_reports([AverageGDPReport, RowCountReport], pd.DataFrame(ROWS))
+
+        assert gdp.sums == {'USA': 400.0, 'Germany': 150.0}
+        assert count.count == 3
+
+    def test_generate_reports(self):
+        """Test that results match running each report separately."""
+        results = generate_reports([AverageGDPReport, RowCountReport], iter(ROWS))
+
+        assert results == [AverageGDPReport(ROWS).generate(), [{'Строк': 3}]]
+
+    def test_generate_reports_without_aggregates(self):
+        """Test that reports without aggregates still see all rows."""
+        results = generate_reports([PlainReport, RowCountReport], iter(ROWS))
+
+        assert results == [[{'Строк': 3}], [{'Строк': 3}]]
+
+
+class TestBatchCLI:
+    """Test cases for repeated --report on the command line."""
+
+    @pytest.fixture(autouse=True)
+    def extra_report(self):
+        """Register the row count report for the duration of a test."""
+        with patch.dict(ReportRegistry._reports, {'row-count': RowCountReport}):
+            yield
+
+    @pytest.fixture
+    def csv_file(self, tmp_path):
+        """Create a small CSV file."""
+        test_file = tmp_path / "test.csv"
+        test_file.write_text("country,year,gdp\nUSA,2023,100\nUSA,2022,300\nGermany,2023,150\n", encoding='utf-8')
+        return str(test_file)
+
+    def test_repeated_report(self, csv_file, capsys):
+        """Test one titled section per report."""
+        main(['--files', csv_file, '--report', 'average-gdp', '--report', 'row-count'])
+        output = capsys.readouterr().out
+
+        assert 'Отчет: average-gdp' in output
+        assert 'Отчет: row-count' in output
+        assert output.index('USA') < output.index('Отчет: row-count')
+        assert 'Строк' in output
+
+    def test_all_reports_read_files_once(self, csv_file, capsys):
+        """Test that 'all' runs every registered report over a single scan."""
+        with patch('macro_analysis.loader.DataLoader._read_file',
+                   side_effect=lambda *args: iter(ROWS)) as read_file:
+            main(['--files', csv_file, '--report', 'all', '--no-cache'])
+        output = capsys.readouterr().out
+
+        assert read_file.call_count == 1
+        assert 'Отчет: average-gdp' in output
+        assert 'Отчет: row-count' in output
+
+    def test_single_report_has_no_title(self, csv_file, capsys):
+        """Test that a single report is printed without a section title."""
+        main(['--files', csv_file, '--report', 'average-gdp', '--report', 'average-gdp'])
+        output = capsys.readouterr().out
+
+        assert 'Отчет:' not in output
+        assert 'USA' in output
+
+    def test_output_file_per_report(self, csv_file, tmp_path):
+        """Test that --output becomes one file per report."""
+        output = tmp_path / "result.csv"
+        main(['--files', csv_file, '--report', 'all', '--format', 'csv', '--output', str(output)])
+
+        assert (tmp_path / "result.average-gdp.csv").read_text(encoding='utf-8').startswith('Страна,')
+        assert (tmp_path / "result.row-count.csv").read_text(encoding='utf-8') == 'Строк\n3\n'
+
+    def test_incremental_state_for_several_reports(self, csv_file, tmp_path, capsys):
+        """Test that one state file keeps aggregates of every selected report."""
+        args = ['--files', csv_file, '--report', 'all', '--state', str(tmp_path / "state.json")]
+        outputs = []
+        for run_args in (args, args, args[:-2]):
+            main(run_args)
+            outputs.append(capsys.readouterr().out)
+
+        assert outputs[0] == outputs[1] == outputs[2]
+
+    def test_unknown_report_in_list(self, csv_file, capsys):
+        """Test that an unknown report name is reported."""
+        main(['--files', csv_file, '--report', 'average-gdp', '--report', 'invalid'])
+        output = capsys.readouterr().out
+
+        assert 'Неизвестный тип отчета: invalid' in output
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
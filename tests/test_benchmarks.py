@@ -0,0 +1,59 @@
+"""Tests for the benchmark suite helpers."""
+import csv
+import json
+
+import pytest
+
+from benchmarks import compare, run
+from benchmarks.synthetic import COLUMNS, generate_files
+
+
+class TestBenchmarks:
+    """Test cases for the synthetic data generator and benchmark runner."""
+
+    def test_generate_files_schema_and_counts(self, tmp_path):
+        """Test that rows are split across files with the data1.csv header."""
+        paths = generate_files(str(tmp_path), rows=25, files=3)
+
+        assert len(paths) == 3
+        counts = []
+        for path in paths:
+            with open(path, encoding='utf-8') as file:
+                reader = csv.DictReader(file)
+                assert reader.fieldnames == COLUMNS
+                counts.append(len(list(reader)))
+        assert counts == [9, 8, 8]
+
+    def test_generate_files_is_deterministic(self, tmp_path):
+        """Test that the same seed produces the same data."""
+        first = generate_files(str(tmp_path / "a"), rows=10, seed=1)
+        second = generate_files(str(tmp_path / "b"), rows=10, seed=1)
+
+        with open(first[0], encoding='utf-8') as a, open(second[0], encoding='utf-8') as b:
+            assert a.read() == b.read()
+
+    def test_run_reports_every_stage(self, tmp_path):
+        """Test that each case reports separate stage timings as JSON."""
+        output = tmp_path / "results.json"
+        run.main(['--rows', '100', '--files', '1', '2', '--loader', 'csv', '--workdir', str(tmp_path),
+                  '--output', str(output)])
+
+        document = json.loads(output.read_text(encoding='utf-8'))
+
+        assert [(r['rows'], r['files']) for r in document['results']] == [(100, 1), (100, 2)]
+        for result in document['results']:
+            for stage in compare.STAGES:
+                assert result[stage] >= 0
+
+    def test_compare_ratios(self):
+        """Test that comparison reports current/baseline ratios per case."""
+        case = {'rows': 10, 'files': 1, 'loader': 'csv'}
+        baseline = {'results': [{**case, 'load_seconds': 2.0, 'cli_seconds': 4.0}]}
+        current = {'results': [{**case, 'load_seconds': 1.0, 'cli_seconds': 6.0},
+                               {**case, 'loader': 'columnar', 'load_seconds': 1.0}]}
+
+        assert compare.compare(baseline, current) == [{**case, 'load_seconds': 0.5, 'cli_seconds': 1.5}]
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
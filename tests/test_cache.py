@@ -0,0 +1,172 @@
+"""Tests for the persistent file cache."""
+import os
+
+import pytest
+
+from macro_analysis.cache import FileCache, default_cache_dir
+from macro_analysis.chunked import DEFAULT_BATCH_ROWS
+from macro_analysis.columnar import ColumnarLoader
+from macro_analysis.loader import DataLoader
+
+
+class TestFileCache:
+    """Test cases for FileCache class."""
+
+    @pytest.fixture
+    def csv_file(self, tmp_path):
+        """Create a small CSV file."""
+        test_file = tmp_path / "data.csv"
+        test_file.write_text("country,gdp\nUSA,100\nGermany,200\n", encoding='utf-8')
+        return test_file
+
+    def test_miss_then_hit(self, tmp_path, csv_file):
+        """Test that a stored value is returned for an unchanged file."""
+        cache = FileCache(str(tmp_path / "cache"))
+
+        assert cache.get(str(csv_file), 'rows') is None
+        cache.put(str(csv_file), 'rows', [{'country': 'USA'}])
+
+        assert cache.get(str(csv_file), 'rows') == [{'country': 'USA'}]
+        assert cache.get(str(csv_file), 'columnar') is None
+
+    def test_changed_file_is_a_miss(self, tmp_path, csv_file):
+        """Test that changing size or mtime invalidates the entry."""
+        cache = FileCache(str(tmp_path / "cache"))
+        cache.put(str(csv_file), 'rows', ['old'])
+
+        csv_file.write_text("country,gdp\nUSA,100\nGermany,200\nFrance,300\n", encoding='utf-8')
+
+        assert cache.get(str(csv_file), 'rows') is None
+
+    def test_content_hash_detects_same_size_change(self, tmp_path, csv_file):
+        """Test that hash_content catches edits that keep size and mtime."""
+        cache = FileCache(str(tmp_path / "cache"), hash_content=True)
+        cache.put(str(csv_file), 'rows', ['old'])
+        stat = csv_file.stat()
+
+        csv_file.write_text("country,gdp\nUSA,900\nGermany,200\n", encoding='utf-8')
+        os.utime(csv_file, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+
+        assert cache.get(str(csv_file), 'rows') is None
+
+    def test_missing_source_file_is_a_miss(self, tmp_path):
+        """Test that a missing source file is a miss, not an error."""
+        cache = FileCache(str(tmp_path / "cache"))
+
+        assert cache.get(str(tmp_path / "missing.csv"), 'rows') is None
+
+    def test_eviction_respects_size_cap(self, tmp_path):
+        """Test that least recently used entries are evicted over the cap."""
+        cache = FileCache(str(tmp_path / "cache"), max_bytes=15000)
+        paths = []
+        for i in range(3):
+            source = tmp_path / f"file{i}.csv"
+            source.write_text(f"country,gdp\nC{i},{i}\n", encoding='utf-8')
+            paths.append(str(source))
+            cache.put(str(source), 'rows', 'x' * 6000)
+            os.utime(cache._entry_path(cache.key(str(source), 'rows')), ns=(i, i))
+
+        cache.evict()
+
+        assert cache.get(paths[0], 'rows') is None
+        assert cache.get(paths[2], 'rows') == 'x' * 6000
+
+    def test_inputs_larger_than_cache_keep_hitting(self, tmp_path):
+        """Test that entries of the current run are kept and the files that fit hit on every later run."""
+        paths = []
+        for i in range(3):
+            source = tmp_path / f"file{i}.csv"
+            source.write_text("country,gdp\n" + f"C{i},{i}\n" * 1000, encoding='utf-8')
+            paths.append(str(source))
+        list(FileCache(str(tmp_path / "probe")).stream(paths[0], 'rows', lambda: DataLoader._read_file(paths[0])))
+        entry_size, = [entry.stat().st_size for entry in os.scandir(tmp_path / "probe")]
+
+        parsed = []
+        for _ in range(4):
+            cache = FileCache(str(tmp_path / "cache"), max_bytes=int(entry_size * 2.5))
+            parsed.append(0)
+            for path in paths:
+                def read_rows(path=path):
+                    parsed[-1] += 1
+                    return DataLoader._read_file(path)
+                assert len(list(cache.stream(path, 'rows', read_rows))) == 1000
+            # Следующий запуск начинается позже: записи этого запуска становятся старыми
+            for entry in os.scandir(tmp_path / "cache"):
+                os.utime(entry.path, ns=(0, 0))
+
+        assert parsed == [3, 1, 1, 1]
+        assert len(os.listdir(tmp_path / "cache")) == 2
+
+    def test_oversized_entry_is_not_stored(self, tmp_path, csv_file):
+        """Test that an entry larger than max_bytes is dropped while it is written."""
+        cache = FileCache(str(tmp_path / "cache"), max_bytes=1000)
+        cache.put(str(csv_file), 'rows', 'x' * 6000)
+
+        assert cache.get(str(csv_file), 'rows') is None
+        assert os.listdir(tmp_path / "cache") == []
+
+    def test_stream_miss_then_hit(self, tmp_path, csv_file):
+        """Test that streamed rows are cached and read back without parsing."""
+        cache = FileCache(str(tmp_path / "cache"))
+        rows = [{'n': index} for index in range(DEFAULT_BATCH_ROWS * 2 + 5)]
+
+        assert list(cache.stream(str(csv_file), 'rows', lambda: iter(rows))) == rows
+        assert list(cache.stream(str(csv_file), 'rows', _fail)) == rows
+
+    def test_stream_reads_lazily(self, tmp_path, csv_file):
+        """Test that a miss reads at most one batch ahead and an abandoned read stores nothing."""
+        cache = FileCache(str(tmp_path / "cache"))
+        produced = []
+
+        def read_rows():
+            for index in range(DEFAULT_BATCH_ROWS * 3):
+                produced.append(index)
+                yield {'n': index}
+
+        stream = cache.stream(str(csv_file), 'rows', read_rows)
+        next(stream)
+        assert len(produced) == DEFAULT_BATCH_ROWS
+        stream.close()
+
+        assert os.listdir(tmp_path / "cache") == []
+
+    def test_stream_oversized_file_is_not_cached(self, tmp_path, csv_file):
+        """Test that every row is still yielded when the entry outgrows max_bytes."""
+        cache = FileCache(str(tmp_path / "cache"), max_bytes=1000)
+        rows = [{'n': index} for index in range(DEFAULT_BATCH_ROWS + 1)]
+
+        assert list(cache.stream(str(csv_file), 'rows', lambda: iter(rows))) == rows
+        assert os.listdir(tmp_path / "cache") == []
+
+    def test_default_cache_dir_from_environment(self, monkeypatch, tmp_path):
+        """Test that the cache directory can be set through the environment."""
+        monkeypatch.setenv('MACRO_ANALYSIS_CACHE_DIR', str(tmp_path))
+        assert default_cache_dir() == str(tmp_path)
+
+    def test_loader_skips_parsing_on_hit(self, tmp_path, csv_file, monkeypatch):
+        """Test that DataLoader does not parse a cached unchanged file."""
+        cache = FileCache(str(tmp_path / "cache"))
+        first = DataLoader(cache=cache).load_files([str(csv_file)])
+
+        monkeypatch.setattr(DataLoader, '_read_file', staticmethod(_fail))
+        second = DataLoader(cache=cache).load_files([str(csv_file)])
+
+        assert second == first
+
+    def test_columnar_loader_uses_cache(self, tmp_path, csv_file):
+        """Test that typed frames are cached for the columnar loader."""
+        cache = FileCache(str(tmp_path / "cache"))
+        first = ColumnarLoader(cache=cache).load_files([str(csv_file)])
+
+        cached = cache.get(str(csv_file), 'columnar:*:')
+
+        assert cached is not None
+        assert cached.equals(first)
+
+
+def _fail(file_path=None, *args):
+    raise AssertionError(f"{file_path} was parsed again")
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
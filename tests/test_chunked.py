@@ -0,0 +1,194 @@
+"""Tests for chunked aggregation with a memory budget."""
+import os
+from itertools import chain
+
+import pytest
+
+from macro_analysis import cli
+from macro_analysis.chunked import (DEFAULT_BATCH_ROWS, SpillingAggregate, aggregate_chunked,
+                                    batched, generate_chunked, group_bytes, key_budget, parse_memory_size)
+from macro_analysis.cli import main
+from macro_analysis.loader import DataLoader
+from macro_analysis.reports.average_gdp import AverageGDPReport, GDPAggregate
+from macro_analysis.reports.indicators import AverageInflationReport, CountryIndicatorsReport
+from macro_analysis.reports.quantiles import ContinentQuantilesReport
+
+
+def make_rows(countries=50, repeat=3):
+    return [
+        {'country': f"Country{i}", 'gdp': float(i * 10 + j)}
+        for j in range(repeat)
+        for i in range(countries)
+    ]
+
+
+class TestHelpers:
+    """Test cases for memory sizes and batching."""
+
+    @pytest.mark.parametrize("text,expected", [
+        ('1024', 1024),
+        ('512K', 512 * 1024),
+        ('64M', 64 * 1024 ** 2),
+        ('1.5G', int(1.5 * 1024 ** 3)),
+        ('2GiB', 2 * 1024 ** 3),
+    ])
+    def test_parse_memory_size(self, text, expected):
+        """Test memory size suffixes."""
+        assert parse_memory_size(text) == expected
+
+    def test_parse_memory_size_invalid(self):
+        """Test that malformed sizes are rejected."""
+        with pytest.raises(ValueError, match="Некорректный размер памяти"):
+            parse_memory_size('много')
+
+    def test_batched(self):
+        """Test fixed-size batches."""
+        assert [len(batch) for batch in batched(range(25), 10)] == [10, 10, 5]
+
+    def test_loader_iter_batches(self, tmp_path):
+        """Test that DataLoader yields fixed-size batches of rows."""
+        path = tmp_path / "data.csv"
+        path.write_text("country,gdp\n" + "".join(f"C{i},{i}\n" for i in range(7)), encoding='utf-8')
+
+        batches = list(DataLoader().iter_batches([str(path)], batch_rows=3))
+
+        assert [len(batch) for batch in batches] == [3, 3, 1]
+        assert batches[2][0] == {'country': 'C6', 'gdp': '6'}
+
+    def test_key_budget_too_small(self):
+        """Test that a budget below one batch is rejected."""
+        with pytest.raises(ValueError):
+            key_budget(1024, batch_rows=1000)
+
+    def test_group_bytes(self):
+        """Test that quantile sketches are counted in the group size."""
+        assert group_bytes(GDPAggregate) == GDPAggregate.group_bytes()
+        assert group_bytes(AverageInflationReport.aggregate_class) < 1024
+        assert group_bytes(ContinentQuantilesReport.aggregate_class) > 10 * 1024
+
+    def test_exact_median_is_rejected(self):
+        """Test that reports keeping every value of a group cannot run under a memory limit."""
+        with pytest.raises(ValueError, match='p50'):
+            aggregate_chunked([CountryIndicatorsReport], [], memory_limit=64 * 1024 ** 2)
+
+
+class TestSpillingAggregate:
+    """Test cases for spilling groups to disk."""
+
+    def test_spilled_result_matches_in_memory(self, tmp_path):
+        """Test that spilling does not change the averages."""
+        rows = make_rows()
+        spilling = SpillingAggregate(GDPAggregate, max_keys=10, directory=str(tmp_path), partitions=4)
+        for batch in batched(rows, 20):
+            spilling.update(batch)
+
+        merged = GDPAggregate()
+        for part in spilling.iter_partitions():
+            assert len(part) < 50
+            merged.merge(part)
+        spilling.close()
+
+        assert spilling.spills > 1
+        assert merged.means() == GDPAggregate().update(rows).means()
+        assert os.listdir(tmp_path) == []
+
+    def test_generate_chunked_with_spills(self, tmp_path):
+        """Test that merged sorted runs give the report rows in report order."""
+        rows = make_rows()
+        memory_limit = 20 * 512 + GDPAggregate.group_bytes() * 10
+        spilling, = aggregate_chunked([AverageGDPReport], rows, memory_limit=memory_limit,
+                                      batch_rows=20, directory=str(tmp_path))
+
+        result = list(generate_chunked(AverageGDPReport, spilling))
+
+        assert spilling.spills > 0
+        assert result == AverageGDPReport(rows).generate()
+        assert os.listdir(tmp_path) == []
+
+    def test_generate_chunked_top_with_spills(self, tmp_path):
+        """Test that the first and last rows are selected across runs."""
+        rows = make_rows()
+        expected = AverageGDPReport(rows).generate()
+        memory_limit = 20 * 512 + GDPAggregate.group_bytes() * 10
+        for limits, selected in (({'top': 5}, expected[:5]), ({'bottom': 5}, expected[-5:])):
+            spilling, = aggregate_chunked([AverageGDPReport], rows, memory_limit=memory_limit,
+                                          batch_rows=20, directory=str(tmp_path))
+
+            assert generate_chunked(AverageGDPReport, spilling, **limits) == selected
+            assert spilling.spills > 0
+            assert os.listdir(tmp_path) == []
+
+    def test_generate_chunked_without_spills(self):
+        """Test that a run within the budget is identical to the in-memory report."""
+        rows = make_rows()
+        spilling, = aggregate_chunked([AverageGDPReport], rows, memory_limit=64 * 1024 ** 2)
+
+        assert spilling.spills == 0
+        assert generate_chunked(AverageGDPReport, spilling) == AverageGDPReport(rows).generate()
+
+
+class TestCLIMemoryLimit:
+    """Test cases for the --memory-limit option."""
+
+    @pytest.fixture
+    def csv_file(self, tmp_path):
+        path = tmp_path / "data.csv"
+        lines = "".join(f"{row['country']},{row['gdp']}\n" for row in make_rows())
+        path.write_text("country,gdp\n" + lines, encoding='utf-8')
+        return str(path)
+
+    def test_memory_limit_reports_peak_memory(self, csv_file, tmp_path, capsys):
+        """Test that chunked mode prints the same table and reports peak memory."""
+        main(['--files', csv_file, '--report', 'average-gdp'])
+        expected = capsys.readouterr().out
+        main(['--files', csv_file, '--report', 'average-gdp', '--memory-limit', '16K',
+              '--batch-rows', '20', '--spill-dir', str(tmp_path)])
+        output, errors = capsys.readouterr()
+
+        assert output == expected
+        assert 'Пиковая память' in errors
+        assert 'сбросов на диск: 0' not in errors
+
+    def test_memory_limit_streams_through_cache(self, tmp_path, monkeypatch, capsys):
+        """Test that cached files are not read into memory as a whole before batching."""
+        path = tmp_path / "large.csv"
+        lines = "".join(f"Country{i % 50},{i}\n" for i in range(DEFAULT_BATCH_ROWS * 3))
+        path.write_text("country,gdp\n" + lines, encoding='utf-8')
+        produced = []
+        read_file = DataLoader._read_file
+
+        def counting_read_file(*args):
+            for row in read_file(*args):
+                produced.append(row)
+                yield row
+
+        read_ahead = []
+
+        def checking_aggregate_chunked(report_classes, rows, *args):
+            rows = iter(rows)
+            first = next(rows)
+            read_ahead.append(len(produced))
+            return aggregate_chunked(report_classes, chain([first], rows), *args)
+
+        monkeypatch.setattr(DataLoader, '_read_file', staticmethod(counting_read_file))
+        monkeypatch.setattr(cli, 'aggregate_chunked', checking_aggregate_chunked)
+        args = ['--files', str(path), '--report', 'average-gdp', '--memory-limit', '16M',
+                '--cache-dir', str(tmp_path / "cache")]
+        main(args)
+        first_output = capsys.readouterr().out
+        main(args)
+        second_output = capsys.readouterr().out
+
+        assert read_ahead[0] <= DEFAULT_BATCH_ROWS
+        assert len(produced) == DEFAULT_BATCH_ROWS * 3
+        assert second_output == first_output
+
+    def test_memory_limit_with_columnar(self, csv_file, capsys):
+        """Test that chunked mode rejects the columnar loader."""
+        main(['--files', csv_file, '--report', 'average-gdp', '--memory-limit', '1G', '--loader', 'columnar'])
+
+        assert 'Ошибка' in capsys.readouterr().out
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
@@ -26,6 +26,18 @@ USA,2023,100,1.0,2.0,3.0,100,NA""", encoding='utf-8')
                 assert 'USA' in output
                 assert '100' in output
 
+    def test_main_top(self, tmp_path, capsys):
+        """Test that --top prints only the first countries."""
+        test_file = tmp_path / "test.csv"
+        test_file.write_text("""country,year,gdp,gdp_growth,inflation,unemployment,population,continent
+USA,2023,300,1.0,2.0,3.0,100,NA
+China,2023,200,1.0,2.0,3.0,100,Asia
+Malta,2023,100,1.0,2.0,3.0,100,Europe""", encoding='utf-8')
+
+        main(['--files', str(test_file), '--report', 'average-gdp', '--top', '2', '--format', 'csv'])
+
+        assert capsys.readouterr().out.split() == ['Страна,Средний', 'ВВП', 'USA,300.0', 'China,200.0']
+
     def test_main_with_multiple_files(self, tmp_path):
         """Test with multiple CSV files."""
         file1 = tmp_path / "file1.csv"
@@ -43,6 +55,84 @@ USA,2023,100,1.0,2.0,3.0,100,NA""", encoding='utf-8')
                 assert 'USA' in output
                 assert 'Germany' in output
 
+    def test_main_with_columnar_loader(self, tmp_path):
+        """Test the columnar loader option."""
+        test_file = tmp_path / "test.csv"
+        test_file.write_text("country,gdp\nUSA,100\nUSA,300\nGermany,150\n", encoding='utf-8')
+
+        test_args = ['program.py', '--files', str(test_file), '--report', 'average-gdp',
+                     '--loader', 'columnar']
+
+        with patch.object(sys, 'argv', test_args):
+            with patch('sys.stdout', new_callable=StringIO) as mock_stdout:
+                main()
+                output = mock_stdout.getvalue()
+                assert 'USA' in output
+                assert '200' in output
+                assert 'Germany' in output
+
+    def test_main_with_mmap_loader(self, tmp_path):
+        """Test the mmap loader option."""
+        test_file = tmp_path / "test.csv"
+        test_file.write_text("country,year,gdp\nUSA,2023,100\nUSA,2022,300\n", encoding='utf-8')
+
+        test_args = ['program.py', '--files', str(test_file), '--report', 'average-gdp', '--loader', 'mmap']
+
+        with patch.object(sys, 'argv', test_args):
+            with patch('sys.stdout', new_callable=StringIO) as mock_stdout:
+                main()
+                output = mock_stdout.getvalue()
+                assert 'USA' in output
+                assert '200' in output
+
+    def test_main_with_jobs(self, tmp_path):
+        """Test that parallel loading prints the same table as sequential loading."""
+        files = []
+        for i in range(4):
+            test_file = tmp_path / f"file{i}.csv"
+            test_file.write_text(f"country,gdp\nCountry{i},{100 + i}\n", encoding='utf-8')
+            files.append(str(test_file))
+
+        outputs = []
+        for jobs in ('1', '3'):
+            test_args = ['program.py', '--files', *files, '--report', 'average-gdp', '--jobs', jobs]
+            with patch.object(sys, 'argv', test_args):
+                with patch('sys.stdout', new_callable=StringIO) as mock_stdout:
+                    main()
+                    outputs.append(mock_stdout.getvalue())
+
+        assert 'Country3' in outputs[0]
+        assert outputs[0] == outputs[1]
+
+    def test_main_caches_parsed_files(self, tmp_path, isolated_cache_dir):
+        """Test that parsed files are cached unless --no-cache is given."""
+        test_file = tmp_path / "test.csv"
+        test_file.write_text("country,gdp\nUSA,100\n", encoding='utf-8')
+
+        test_args = ['program.py', '--files', str(test_file), '--report', 'average-gdp', '--no-cache']
+        with patch.object(sys, 'argv', test_args):
+            with patch('sys.stdout', new_callable=StringIO):
+                main()
+        assert not isolated_cache_dir.exists()
+
+        with patch.object(sys, 'argv', test_args[:-1]):
+            with patch('sys.stdout', new_callable=StringIO) as mock_stdout:
+                main()
+                assert 'USA' in mock_stdout.getvalue()
+        assert len(list(isolated_cache_dir.glob('*.pickle'))) == 1
+
+    def test_main_cache_max_bytes(self, tmp_path, isolated_cache_dir, capsys):
+        """Test that --cache-max-bytes caps the cache and rejects malformed sizes."""
+        test_file = tmp_path / "test.csv"
+        test_file.write_text("country,gdp\nUSA,100\n", encoding='utf-8')
+
+        main(['--files', str(test_file), '--report', 'average-gdp', '--cache-max-bytes', '10'])
+        assert 'USA' in capsys.readouterr().out
+        assert list(isolated_cache_dir.glob('*.pickle')) == []
+
+        main(['--files', str(test_file), '--report', 'average-gdp', '--cache-max-bytes', 'lots'])
+        assert 'Некорректный размер памяти: lots' in capsys.readouterr().out
+
     def test_main_file_not_found(self):
         """Test with non-existent file."""
         test_args = ['program.py', '--files', 'nonexistent.csv', '--report', 'average-gdp']
@@ -68,6 +158,13 @@ USA,2023,100,1.0,2.0,3.0,100,NA""", encoding='utf-8')
                 assert 'Ошибка' in output
                 assert 'Неизвестный тип отчета' in output
 
+    def test_main_list_reports(self):
+        """Test listing the available reports without --files."""
+        with patch.object(sys, 'argv', ['program.py', '--list-reports']):
+            with patch('sys.stdout', new_callable=StringIO) as mock_stdout:
+                main()
+                assert 'average-gdp' in mock_stdout.getvalue().split()
+
     def test_main_missing_files_argument(self):
         """Test with missing --files argument."""
         test_args = ['program.py', '--report', 'average-gdp']
@@ -141,7 +238,7 @@ USA,2023,100,1.0,2.0,3.0,100,NA""", encoding='utf-8')
                 assert '25462' in output
                 assert '17963' in output
 
-    @patch('macro_analysis.loader.DataLoader.load_files')
+    @patch('macro_analysis.loader.DataLoader.iter_rows')
     def test_main_with_loader_exception(self, mock_load, tmp_path):
         """Test when loader raises an exception."""
         mock_load.side_effect = Exception("Loader error")
@@ -0,0 +1,114 @@
+"""Tests for the columnar loader."""
+import pytest
+
+from macro_analysis.columnar import ColumnarLoader, SCHEMA
+from macro_analysis.loader import DataLoader
+from macro_analysis.reports.average_gdp import AverageGDPReport
+
+
+class TestColumnarLoader:
+    """Test cases for ColumnarLoader class."""
+
+    @pytest.fixture
+    def csv_file(self, tmp_path):
+        """Create a CSV file with the full schema."""
+        test_file = tmp_path / "data.csv"
+        test_file.write_text("""country,year,gdp,gdp_growth,inflation,unemployment,population,continent
+United States,2023,25462,2.1,3.4,3.7,339,North America
+China,2023,17963,5.2,2.5,5.2,1425,Asia
+Germany,2023,invalid,-0.3,6.2,3.0,83,Europe
+France,2023,,0.9,5.2,7.1,68,NA""", encoding='utf-8')
+        return str(test_file)
+
+    def test_load_typed_columns(self, csv_file):
+        """Test that numeric columns are parsed into float arrays."""
+        frame = ColumnarLoader().load_files([csv_file])
+
+        assert list(frame.columns) == list(SCHEMA)
+        assert len(frame) == 4
+        assert frame['gdp'].dtype == 'float64'
+        assert frame['year'].dtype == 'float64'
+        assert frame['gdp'].iloc[0] == 25462.0
+
+    def test_invalid_numbers_become_nan(self, csv_file):
+        """Test that malformed and empty numeric values become NaN."""
+        frame = ColumnarLoader().load_files([csv_file])
+
+        assert frame['gdp'].isna().tolist() == [False, False, True, True]
+
+    def test_strings_are_not_treated_as_missing(self, csv_file):
+        """Test that values such as 'NA' are kept as text."""
+        frame = ColumnarLoader().load_files([csv_file])
+
+        assert frame['continent'].iloc[3] == 'NA'
+
+    def test_column_projection(self, csv_file):
+        """Test that only declared columns are parsed."""
+        frame = ColumnarLoader(columns={'country': str, 'gdp': float}).load_files([csv_file])
+
+        assert list(frame.columns) == ['country', 'gdp']
+        assert frame['gdp'].dtype == 'float64'
+
+    def test_load_multiple_files(self, tmp_path):
+        """Test that files are concatenated in order."""
+        file1 = tmp_path / "file1.csv"
+        file1.write_text("country,gdp\nUSA,100\n", encoding='utf-8')
+        file2 = tmp_path / "file2.csv"
+        file2.write_text("country,gdp\nGermany,200\n", encoding='utf-8')
+
+        frame = ColumnarLoader().load_files([str(file1), str(file2)])
+
+        assert frame['country'].tolist() == ['USA', 'Germany']
+        assert frame['gdp'].tolist() == [100.0, 200.0]
+
+    def test_parallel_load_matches_sequential(self):
+        """Test that parallel loading gives the same frame as sequential loading."""
+        files = ['data/data1.csv', 'data/data2.csv']
+
+        sequential = ColumnarLoader().load_files(files)
+        parallel = ColumnarLoader(workers=2).load_files(files)
+
+        assert parallel.equals(sequential)
+
+    def test_load_empty_file(self, tmp_path):
+        """Test loading an empty CSV file."""
+        empty_file = tmp_path / "empty.csv"
+        empty_file.write_text("", encoding='utf-8')
+
+        frame = ColumnarLoader().load_files([str(empty_file)])
+
+        assert frame.empty
+
+    def test_file_not_found(self):
+        """Test handling of non-existent file."""
+        with pytest.raises(FileNotFoundError) as exc_info:
+            ColumnarLoader().load_files(["nonexistent.csv"])
+
+        assert "Файл не найден" in str(exc_info.value)
+        assert "nonexistent.csv" in str(exc_info.value)
+
+    def test_report_matches_row_loader(self, tmp_path):
+        """Test that the vectorized report gives the same result as the row path."""
+        files = ['data/data1.csv', 'data/data2.csv']
+
+        columnar = AverageGDPReport(ColumnarLoader().load_files(files)).generate()
+        rows = AverageGDPReport(DataLoader().load_files(files)).generate()
+
+        assert columnar == rows
+
+    @pytest.mark.parametrize('missing', ['', 'n/a'])
+    def test_floats_parsed_exactly(self, tmp_path, missing):
+        """Test that fractional values are parsed bit for bit like float(), with and without missing cells."""
+        values = [f'{i * 7919 % 30011 + i / 97:.{2 + i % 13}f}' for i in range(1, 3000)]
+        test_file = tmp_path / "floats.csv"
+        test_file.write_text("country,gdp\n" + "".join(f"C{i % 50},{value}\n" for i, value in enumerate(values))
+                             + f"C0,{missing}\n", encoding='utf-8')
+
+        frame = ColumnarLoader().load_files([str(test_file)])
+
+        assert frame['gdp'].tolist()[:-1] == [float(value) for value in values]
+        assert AverageGDPReport(frame).generate() == AverageGDPReport(DataLoader().load_files([str(test_file)])).generate()
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
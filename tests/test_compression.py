@@ -0,0 +1,148 @@
+"""Tests for reading compressed input files."""
+import builtins
+import bz2
+import gzip
+import importlib.util
+import lzma
+
+import pytest
+
+from macro_analysis.columnar import ColumnarLoader
+from macro_analysis.compression import detect_compression, open_text
+from macro_analysis.loader import DataLoader
+
+CONTENT = """country,year,gdp,continent
+United States,2023,25462,North America
+China,2023,17963,Asia
+"Korea, Republic of",2023,1709,Asia
+"""
+
+COMPRESSORS = {
+    'gzip': ('.csv.gz', gzip.compress),
+    'xz': ('.csv.xz', lzma.compress),
+    'bz2': ('.csv.bz2', bz2.compress),
+}
+
+try:
+    from compression import zstd  # noqa: F401
+    HAS_ZSTD = True
+except ImportError:
+    HAS_ZSTD = importlib.util.find_spec('zstandard') is not None
+
+
+@pytest.fixture
+def plain_file(tmp_path):
+    path = tmp_path / "plain.csv"
+    path.write_text(CONTENT, encoding='utf-8')
+    return str(path)
+
+
+@pytest.fixture(params=sorted(COMPRESSORS))
+def compressed_file(request, tmp_path):
+    suffix, compress = COMPRESSORS[request.param]
+    path = tmp_path / f"data{suffix}"
+    path.write_bytes(compress(CONTENT.encode('utf-8')))
+    return request.param, str(path)
+
+
+class TestDetectCompression:
+    """Test cases for compression detection."""
+
+    def test_by_extension(self, compressed_file):
+        """Test detection by file extension."""
+        compression, path = compressed_file
+        assert detect_compression(path) == compression
+
+    def test_by_magic_bytes(self, tmp_path):
+        """Test detection of a compressed file with a plain .csv name."""
+        path = tmp_path / "archive.csv"
+        path.write_bytes(gzip.compress(CONTENT.encode('utf-8')))
+
+        assert detect_compression(str(path)) == 'gzip'
+        with open_text(str(path)) as file:
+            assert file.read() == CONTENT
+
+    def test_plain_file(self, plain_file):
+        """Test that plain text is not treated as compressed."""
+        assert detect_compression(plain_file) is None
+
+    @pytest.mark.parametrize('engine', ['csv', 'mmap', 'columnar'])
+    def test_csv_file_is_opened_once(self, plain_file, engine, monkeypatch):
+        """Test that a .csv file is opened once, not again to sniff its format."""
+        opened = []
+        original_open = builtins.open
+
+        def counting_open(file, *args, **kwargs):
+            if file == plain_file:
+                opened.append(file)
+            return original_open(file, *args, **kwargs)
+
+        monkeypatch.setattr(builtins, 'open', counting_open)
+        if engine == 'columnar':
+            rows = ColumnarLoader().load_files([plain_file])
+        else:
+            rows = DataLoader(engine=engine).load_files([plain_file])
+
+        assert len(rows) == 3
+        assert opened == [plain_file]
+
+
+class TestCompressedInput:
+    """Test cases for loading compressed files."""
+
+    @pytest.mark.parametrize('engine', ['csv', 'mmap'])
+    def test_rows_match_plain_file(self, plain_file, compressed_file, engine):
+        """Test that a compressed file yields the same rows as the plain one."""
+        loader = DataLoader(engine=engine, columns={'country': str, 'gdp': float})
+
+        assert loader.load_files([compressed_file[1]]) == loader.load_files([plain_file])
+
+    def test_columnar_loader(self, plain_file, compressed_file):
+        """Test the columnar loader on a compressed file."""
+        loader = ColumnarLoader(filters=['continent=Asia'])
+
+        frame = loader.load_files([compressed_file[1]])
+
+        assert frame.equals(loader.load_files([plain_file]))
+        assert list(frame['country']) == ['China', 'Korea, Republic of']
+
+    def test_parallel_decompression(self, tmp_path):
+        """Test that archives are decompressed in worker processes with --jobs."""
+        files = []
+        for i in range(4):
+            path = tmp_path / f"year{i}.csv.gz"
+            path.write_bytes(gzip.compress(f"country,gdp\nCountry{i},{100 + i}\n".encode('utf-8')))
+            files.append(str(path))
+
+        rows = DataLoader(workers=2).load_files(files)
+
+        assert [row['country'] for row in rows] == [f"Country{i}" for i in range(4)]
+
+    def test_corrupt_archive(self, tmp_path):
+        """Test the error for a damaged archive."""
+        path = tmp_path / "broken.csv.gz"
+        path.write_bytes(gzip.compress(CONTENT.encode('utf-8'))[:20])
+
+        with pytest.raises(Exception, match="Ошибка чтения файла"):
+            DataLoader().load_files([str(path)])
+
+    @pytest.mark.skipif(HAS_ZSTD, reason="zstd support is available")
+    def test_zstd_without_module(self, tmp_path):
+        """Test the error for .zst files when no zstd module is installed."""
+        path = tmp_path / "data.csv.zst"
+        path.write_bytes(b'\x28\xb5\x2f\xfd' + b'\x00' * 16)
+
+        with pytest.raises(Exception, match="zstandard"):
+            DataLoader().load_files([str(path)])
+
+    def test_zstd(self, tmp_path, plain_file):
+        """Test reading a zstd archive."""
+        zstandard = pytest.importorskip('zstandard')
+        path = tmp_path / "data.csv.zst"
+        path.write_bytes(zstandard.ZstdCompressor().compress(CONTENT.encode('utf-8')))
+
+        assert DataLoader().load_files([str(path)]) == DataLoader().load_files([plain_file])
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
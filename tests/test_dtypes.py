@@ -0,0 +1,45 @@
+"""Tests for column type declarations."""
+import pytest
+
+from macro_analysis.dtypes import column_key, normalize_columns, parse_float, parse_int
+
+
+class TestDtypes:
+    """Test cases for dtype helpers."""
+
+    @pytest.mark.parametrize('value,expected', [
+        ('100.5', 100.5),
+        (b'200', 200.0),
+        (' 3 ', 3.0),
+        ('', None),
+        ('invalid', None),
+        (None, None),
+    ])
+    def test_parse_float(self, value, expected):
+        """Test that malformed values become None instead of raising."""
+        assert parse_float(value) == expected
+
+    def test_parse_int(self):
+        """Test integer parsing."""
+        assert parse_int(b'2023') == 2023
+        assert parse_int('2023.5') is None
+
+    def test_normalize_columns(self):
+        """Test names and mappings are turned into {name: dtype}."""
+        assert normalize_columns(None) is None
+        assert normalize_columns(['country', 'gdp']) == {'country': str, 'gdp': str}
+        assert normalize_columns({'gdp': float}) == {'gdp': float}
+
+    def test_unsupported_dtype(self):
+        """Test that unknown dtypes are rejected."""
+        with pytest.raises(ValueError):
+            normalize_columns({'gdp': complex})
+
+    def test_column_key(self):
+        """Test the cache key of a column declaration."""
+        assert column_key(None) == '*'
+        assert column_key({'country': str, 'gdp': float}) == 'country:str,gdp:float'
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
@@ -0,0 +1,156 @@
+"""Tests for predicate pushdown filters."""
+import sys
+from io import StringIO
+from unittest.mock import patch
+
+import pandas as pd
+import pytest
+
+from macro_analysis.cli import main
+from macro_analysis.columnar import ColumnarLoader
+from macro_analysis.filters import Filter, parse_filters
+from macro_analysis.loader import DataLoader
+
+CONTENT = """country,year,gdp,gdp_growth,inflation,unemployment,population,continent
+United States,2023,25462,2.1,3.4,3.7,339,North America
+United States,2019,21381,2.3,1.8,3.7,329,North America
+Germany,2023,4086,-0.3,6.2,3.0,83,Europe
+Germany,2021,4260,3.2,3.1,3.6,83,Europe
+France,bad,2937,2.5,2.1,7.4,68,Europe
+"""
+
+
+class TestFilter:
+    """Test cases for Filter class."""
+
+    @pytest.mark.parametrize('expression,column,op,value', [
+        ('year>=2020', 'year', '>=', '2020'),
+        ('continent = Europe', 'continent', '=', 'Europe'),
+        ('continent=North America', 'continent', '=', 'North America'),
+        ('gdp!=0', 'gdp', '!=', '0'),
+        ('inflation<2.5', 'inflation', '<', '2.5'),
+    ])
+    def test_parse(self, expression, column, op, value):
+        """Test parsing of filter expressions."""
+        item = Filter.parse(expression)
+
+        assert (item.column, item.op, item.value) == (column, op, value)
+
+    @pytest.mark.parametrize('expression', ['year', '>=2020', 'year=>2020', ''])
+    def test_parse_invalid(self, expression):
+        """Test that malformed expressions are rejected."""
+        with pytest.raises(ValueError):
+            Filter.parse(expression)
+
+    def test_numeric_comparison(self):
+        """Test that numeric values are compared as numbers."""
+        item = Filter.parse('year>=2020')
+
+        assert item.test('2021')
+        assert item.test(b'2020')
+        assert item.test(2020.0)
+        assert not item.test('999')
+        assert not item.test('bad')
+        assert not item.test(None)
+
+    def test_text_comparison(self):
+        """Test that non-numeric values are compared as text."""
+        item = Filter.parse('continent=Europe')
+
+        assert item.matches({'continent': 'Europe'})
+        assert item.test(b'Europe')
+        assert not item.matches({'continent': 'Asia'})
+        assert not item.matches({'country': 'Germany'})
+
+    def test_mask(self):
+        """Test vectorized evaluation on a DataFrame."""
+        frame = pd.DataFrame({'year': [2019.0, 2023.0, float('nan')], 'continent': ['Europe', 'Asia', None]})
+
+        assert Filter.parse('year>=2020').mask(frame).tolist() == [False, True, False]
+        assert Filter.parse('continent=Europe').mask(frame).tolist() == [True, False, False]
+        assert Filter.parse('missing=1').mask(frame).tolist() == [False, False, False]
+
+    @pytest.mark.parametrize("expression,bounds,expected", [
+        ('year>=2020', (2015, 2019), False),
+        ('year>=2020', (2015, 2020), True),
+        ('year<2020', (2020, 2023), False),
+        ('year=2021', (2020, 2023), True),
+        ('year=2025', (2020, 2023), False),
+        ('year!=2020', (2020, 2020), False),
+        ('continent=Europe', ('Africa', 'Asia'), False),
+        ('continent=Europe', ('Africa', 'Oceania'), True),
+        ('year>=2020', ('2015', '2019'), True),
+    ])
+    def test_may_match(self, expression, bounds, expected):
+        """Test range checks used to skip Parquet row groups."""
+        assert Filter.parse(expression).may_match(*bounds) is expected
+
+
+class TestFilteredLoading:
+    """Test cases for filters applied by the loaders."""
+
+    @pytest.fixture
+    def csv_file(self, tmp_path):
+        """Create a CSV file with the full schema."""
+        test_file = tmp_path / "data.csv"
+        test_file.write_text(CONTENT, encoding='utf-8')
+        return str(test_file)
+
+    @pytest.mark.parametrize('engine', ['csv', 'mmap'])
+    def test_row_loaders(self, csv_file, engine):
+        """Test that only matching rows are yielded, without filter-only columns."""
+        loader = DataLoader(engine=engine, columns={'country': str, 'gdp': float},
+                            filters=['year>=2020', 'continent=Europe'])
+
+        assert loader.load_files([csv_file]) == [
+            {'country': 'Germany', 'gdp': 4086.0},
+            {'country': 'Germany', 'gdp': 4260.0},
+        ]
+
+    def test_filters_without_projection(self, csv_file):
+        """Test that filtering keeps full rows when no columns are declared."""
+        rows = DataLoader(engine='mmap', filters=['year<2020']).load_files([csv_file])
+
+        assert [row['country'] for row in rows] == ['United States']
+        assert rows[0]['continent'] == 'North America'
+
+    def test_filter_on_missing_column(self, csv_file):
+        """Test that a filter on an absent column rejects every row."""
+        for engine in ('csv', 'mmap'):
+            assert DataLoader(engine=engine, filters=['region=EU']).load_files([csv_file]) == []
+
+    def test_columnar_loader(self, csv_file):
+        """Test vectorized filtering in the columnar loader."""
+        frame = ColumnarLoader(columns={'country': str, 'gdp': float},
+                               filters=parse_filters(['year>=2020', 'continent=Europe'])).load_files([csv_file])
+
+        assert list(frame.columns) == ['country', 'gdp']
+        assert frame['gdp'].tolist() == [4086.0, 4260.0]
+
+    def test_cli_where(self, csv_file):
+        """Test that every loader prints the same filtered report."""
+        outputs = []
+        for loader in ('csv', 'mmap', 'columnar'):
+            test_args = ['program.py', '--files', csv_file, '--report', 'average-gdp', '--loader', loader,
+                         '--where', 'year>=2020', '--where', 'continent=Europe']
+            with patch.object(sys, 'argv', test_args):
+                with patch('sys.stdout', new_callable=StringIO) as mock_stdout:
+                    main()
+                    outputs.append(mock_stdout.getvalue())
+
+        assert 'Germany' in outputs[0]
+        assert '4173' in outputs[0]
+        assert 'United States' not in outputs[0]
+        assert outputs[0] == outputs[1] == outputs[2]
+
+    def test_cli_invalid_where(self, csv_file):
+        """Test that a malformed condition is reported as an error."""
+        test_args = ['program.py', '--files', csv_file, '--report', 'average-gdp', '--where', 'year']
+        with patch.object(sys, 'argv', test_args):
+            with patch('sys.stdout', new_callable=StringIO) as mock_stdout:
+                main()
+                assert 'Некорректное условие фильтра' in mock_stdout.getvalue()
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
@@ -0,0 +1,146 @@
+"""Tests for the group-by aggregation engine and the reports built on it."""
+import json
+import pickle
+import sys
+from io import StringIO
+from unittest.mock import patch
+
+import pandas as pd
+import pytest
+
+from macro_analysis.chunked import SpillingAggregate, batched
+from macro_analysis.cli import main
+from macro_analysis.groupby import GroupByReport
+from macro_analysis.records import RecordStore
+from macro_analysis.registry import ReportRegistry
+from macro_analysis.reports.indicators import AverageInflationReport, CountryIndicatorsReport
+
+
+class StatsReport(GroupByReport):
+    keys = ('continent',)
+    metrics = {'inflation': ('mean', 'median', 'min', 'max', 'sum', 'count'), 'population': ('sum',)}
+
+
+ROWS = [
+    {'country': 'France', 'continent': 'Europe', 'inflation': '5.2', 'population': '68'},
+    {'country': 'Germany', 'continent': 'Europe', 'inflation': '6.2', 'population': '83'},
+    {'country': 'China', 'continent': 'Asia', 'inflation': '2.5', 'population': '1425'},
+    {'country': 'Italy', 'continent': 'Europe', 'inflation': '', 'population': '59'},
+    {'country': 'Japan', 'continent': 'Asia', 'inflation': '3.3', 'population': 'n/a'},
+    {'country': 'Nowhere', 'continent': '', 'inflation': '1.0', 'population': '1'},
+    {'country': 'Spain', 'continent': 'Europe', 'inflation': '3.5', 'population': '48'},
+]
+
+EXPECTED = [
+    {'Континент': 'Europe', 'Инфляция (среднее)': pytest.approx(14.9 / 3), 'Инфляция (медиана)': 5.2,
+     'Инфляция (мин)': 3.5, 'Инфляция (макс)': 6.2, 'Инфляция (сумма)': pytest.approx(14.9),
+     'Инфляция (количество)': 3, 'Население (сумма)': 258.0},
+    {'Континент': 'Asia', 'Инфляция (среднее)': pytest.approx(2.9), 'Инфляция (медиана)': pytest.approx(2.9),
+     'Инфляция (мин)': 2.5, 'Инфляция (макс)': 3.3, 'Инфляция (сумма)': pytest.approx(5.8),
+     'Инфляция (количество)': 2, 'Население (сумма)': 1425.0},
+]
+
+
+class TestGroupAggregate:
+    """Test cases for GroupAggregate."""
+
+    def test_all_functions(self):
+        """Test every aggregation function, missing values and empty keys."""
+        assert StatsReport(ROWS).generate() == EXPECTED
+
+    def test_inputs_agree(self):
+        """Test that rows, add_row, frames and record stores give the same result."""
+        frame = pd.DataFrame(ROWS)
+        by_row = StatsReport.aggregate_class()
+        for row in ROWS:
+            by_row.add_row(row)
+
+        for data in (frame, RecordStore(ROWS)):
+            assert StatsReport(data).generate() == EXPECTED
+        assert StatsReport(aggregate=by_row).generate() == EXPECTED
+
+    def test_merge_matches_single_pass(self):
+        """Test that merged partial aggregates equal one pass over all rows."""
+        merged = StatsReport.aggregate_class()
+        for batch in batched(ROWS, 3):
+            merged.merge(StatsReport.aggregate_class().update(batch))
+
+        assert StatsReport(aggregate=merged).generate() == EXPECTED
+
+    def test_serialization(self):
+        """Test JSON and pickle round trips."""
+        aggregate = StatsReport.aggregate_class().update(ROWS)
+
+        restored = StatsReport.aggregate_class.from_dict(json.loads(json.dumps(aggregate.to_dict())))
+        assert restored == aggregate
+        assert pickle.loads(pickle.dumps(aggregate)) == aggregate
+
+    def test_spilling(self, tmp_path):
+        """Test that group aggregates can be spilled to disk."""
+        spilling = SpillingAggregate(StatsReport.aggregate_class, max_keys=1, directory=str(tmp_path))
+        for batch in batched(ROWS, 2):
+            spilling.update(batch)
+
+        merged = StatsReport.aggregate_class()
+        for part in spilling.iter_partitions():
+            merged.merge(part)
+        spilling.close()
+
+        assert sorted(StatsReport(aggregate=merged).generate(), key=lambda row: row['Континент']) == \
+            sorted(EXPECTED, key=lambda row: row['Континент'])
+
+    def test_unknown_function(self):
+        """Test that reports are checked for unknown functions."""
+        with pytest.raises(ValueError, match="Неизвестная функция агрегации"):
+            class BadReport(GroupByReport):
+                metrics = {'gdp': ('mode',)}
+
+    def test_declared_columns(self):
+        """Test that loader columns are derived from keys and metrics."""
+        assert StatsReport.columns == {'continent': str, 'inflation': float, 'population': float}
+
+
+class TestIndicatorReports:
+    """Test cases for the registered indicator reports."""
+
+    @pytest.fixture
+    def csv_file(self, tmp_path):
+        path = tmp_path / "data.csv"
+        path.write_text(
+            "country,year,gdp,gdp_growth,inflation,unemployment,population,continent\n"
+            "France,2022,2780,2.5,5.2,7.3,68,Europe\n"
+            "France,2023,3031,0.9,5.7,7.4,68,Europe\n"
+            "China,2023,17963,5.2,0.2,5.2,1425,Asia\n",
+            encoding='utf-8',
+        )
+        return str(path)
+
+    def test_registered(self):
+        """Test that the reports are available in the registry."""
+        assert ReportRegistry.get_report('average-inflation') is AverageInflationReport
+        assert ReportRegistry.get_report('country-indicators') is CountryIndicatorsReport
+
+    def test_average_inflation_sorted(self, csv_file):
+        """Test the single-metric report and its order."""
+        result = AverageInflationReport(pd.read_csv(csv_file)).generate()
+
+        assert result == [
+            {'Страна': 'France', 'Средняя инфляция': pytest.approx(5.45)},
+            {'Страна': 'China', 'Средняя инфляция': pytest.approx(0.2)},
+        ]
+
+    def test_cli_several_reports(self, csv_file):
+        """Test several engine reports in one CLI run."""
+        test_args = ['program.py', '--files', csv_file, '--report', 'average-unemployment',
+                     '--report', 'country-indicators', '--format', 'jsonl']
+        with patch.object(sys, 'argv', test_args):
+            with patch('sys.stdout', new_callable=StringIO) as mock_stdout:
+                main()
+                output = mock_stdout.getvalue()
+
+        assert 'Средняя безработица' in output
+        assert 'Население (медиана)' in output
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
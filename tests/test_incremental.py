@@ -0,0 +1,126 @@
+"""Tests for incremental report recomputation."""
+import json
+import sys
+from io import StringIO
+from unittest.mock import patch
+
+import pytest
+
+from macro_analysis.cli import main
+from macro_analysis.incremental import IncrementalState
+from macro_analysis.loader import DataLoader
+from macro_analysis.reports.average_gdp import AverageGDPReport
+
+
+class TestIncrementalState:
+    """Test cases for IncrementalState class."""
+
+    @pytest.fixture
+    def files(self, tmp_path):
+        """Create three monthly CSV files."""
+        paths = []
+        for i, (country, gdp) in enumerate([('USA', 100), ('Germany', 200), ('USA', 300)]):
+            test_file = tmp_path / f"month{i}.csv"
+            test_file.write_text(f"country,gdp\n{country},{gdp}\nFrance,{gdp + 1}\n", encoding='utf-8')
+            paths.append(str(test_file))
+        return paths
+
+    def _run(self, state_path, files):
+        state = IncrementalState(str(state_path), ['average-gdp']).load()
+        aggregate, = state.aggregate([AverageGDPReport], files, lambda path: DataLoader().iter_rows([path]))
+        state.save()
+        return state, AverageGDPReport(aggregate=aggregate).generate()
+
+    def test_first_run_matches_full_run(self, tmp_path, files):
+        """Test that the first incremental run reads every file."""
+        state, result = self._run(tmp_path / "state.json", files)
+
+        assert state.recomputed == files
+        assert result == AverageGDPReport(DataLoader().load_files(files)).generate()
+
+    def test_unchanged_files_are_not_read(self, tmp_path, files):
+        """Test that a second run over unchanged files reads nothing."""
+        first = self._run(tmp_path / "state.json", files)[1]
+        state, second = self._run(tmp_path / "state.json", files)
+
+        assert state.recomputed == []
+        assert second == first
+
+    def test_added_and_changed_files(self, tmp_path, files):
+        """Test that only added and changed files are recomputed."""
+        self._run(tmp_path / "state.json", files[:2])
+
+        with open(files[0], 'a', encoding='utf-8') as file:
+            file.write("Japan,50\n")
+        state, result = self._run(tmp_path / "state.json", files)
+
+        assert state.recomputed == [files[0], files[2]]
+        assert result == self._run(tmp_path / "fresh.json", files)[1]
+
+    def test_removed_files_are_dropped(self, tmp_path, files):
+        """Test that files no longer listed no longer contribute."""
+        self._run(tmp_path / "state.json", files)
+        state, result = self._run(tmp_path / "state.json", files[1:])
+
+        assert state.recomputed == []
+        assert len(state.files) == 2
+        assert result == AverageGDPReport(DataLoader().load_files(files[1:])).generate()
+
+    def test_state_of_other_report_is_ignored(self, tmp_path, files):
+        """Test that a state file written for another report is not reused."""
+        state_path = tmp_path / "state.json"
+        self._run(state_path, files)
+        saved = json.loads(state_path.read_text(encoding='utf-8'))
+        saved['reports'] = ['other']
+        state_path.write_text(json.dumps(saved), encoding='utf-8')
+
+        state, _ = self._run(state_path, files)
+
+        assert state.recomputed == files
+
+    def test_missing_file(self, tmp_path):
+        """Test that a missing input file is reported by name."""
+        state = IncrementalState(str(tmp_path / "state.json"), ['average-gdp'])
+
+        with pytest.raises(FileNotFoundError) as exc_info:
+            state.aggregate([AverageGDPReport], ["nonexistent.csv"], DataLoader().load_files)
+
+        assert "Файл не найден: nonexistent.csv" in str(exc_info.value)
+
+    def test_cli_state_option(self, tmp_path, files):
+        """Test that the CLI prints the same table with and without --state."""
+        outputs = []
+        for extra in ([], ['--state', str(tmp_path / "state.json")], ['--state', str(tmp_path / "state.json")]):
+            test_args = ['program.py', '--files', *files, '--report', 'average-gdp', *extra]
+            with patch.object(sys, 'argv', test_args):
+                with patch('sys.stdout', new_callable=StringIO) as mock_stdout:
+                    main()
+                    outputs.append(mock_stdout.getvalue())
+
+        assert 'France' in outputs[0]
+        assert outputs[0] == outputs[1] == outputs[2]
+
+    def test_cli_state_with_fractional_gdp(self, tmp_path, capsys):
+        """Test that --state prints exactly the full-run averages when per-file float sums round differently."""
+        values = iter([0.1, 0.2, 0.3, 1e16, 1.0, -1e16, 2.675, 1234.5678, 0.7, 1e-3] * 30)
+        files = []
+        for i in range(5):
+            test_file = tmp_path / f"month{i}.csv"
+            rows = [f"{country},{next(values)!r}" for _ in range(30) for country in ('USA', 'Germany')]
+            test_file.write_text("country,gdp\n" + "\n".join(rows) + "\n", encoding='utf-8')
+            files.append(str(test_file))
+
+        outputs = []
+        for extra in ([], ['--state', str(tmp_path / "state.json")], ['--state', str(tmp_path / "state.json")]):
+            main(['--files', *files, '--report', 'average-gdp', '--format', 'csv', *extra])
+            outputs.append(capsys.readouterr().out)
+
+        assert outputs[0] == outputs[1] == outputs[2]
+        expected = AverageGDPReport(DataLoader().load_files(files)).generate()
+        assert [row['Средний ВВП'] for row in expected] == [
+            float(line.split(',')[1]) for line in outputs[0].splitlines()[1:]
+        ]
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
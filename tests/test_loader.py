@@ -227,6 +227,78 @@ Japan,2023,4231,1.2,2.8,2.6,125,Asia""", encoding='utf-8')
 
         assert file_paths == file_paths_copy
 
+    def test_iter_rows_matches_load_files(self, temp_csv_files):
+        """Test that iter_rows yields the same rows as load_files."""
+        loader = DataLoader()
+
+        assert list(loader.iter_rows(temp_csv_files)) == loader.load_files(temp_csv_files)
+
+    def test_iter_rows_is_lazy(self):
+        """Test that iter_rows does not open files until iterated."""
+        loader = DataLoader()
+        rows = loader.iter_rows(["nonexistent.csv"])
+
+        with pytest.raises(FileNotFoundError) as exc_info:
+            next(rows)
+
+        assert "nonexistent.csv" in str(exc_info.value)
+
+    def test_iter_rows_reports_failing_file(self, tmp_path):
+        """Test that rows from earlier files are yielded before a missing file fails."""
+        valid_file = tmp_path / "valid.csv"
+        valid_file.write_text("country,gdp\nUSA,100\n", encoding='utf-8')
+
+        loader = DataLoader()
+        rows = loader.iter_rows([str(valid_file), "missing.csv"])
+
+        assert next(rows) == {'country': 'USA', 'gdp': '100'}
+        with pytest.raises(FileNotFoundError) as exc_info:
+            next(rows)
+
+        assert "Файл не найден: missing.csv" in str(exc_info.value)
+
+    def test_parallel_load_matches_sequential(self, tmp_path):
+        """Test that parallel loading keeps the order of files and rows."""
+        file_paths = []
+        for i in range(6):
+            test_file = tmp_path / f"part{i}.csv"
+            test_file.write_text(f"country,gdp\nCountry{i},{i}\nOther{i},{i * 10}\n", encoding='utf-8')
+            file_paths.append(str(test_file))
+
+        sequential = DataLoader().load_files(file_paths)
+        parallel = DataLoader(workers=3).load_files(file_paths)
+
+        assert parallel == sequential
+
+    def test_parallel_load_names_failing_file(self, tmp_path):
+        """Test that errors from worker processes still name the file."""
+        valid_file = tmp_path / "valid.csv"
+        valid_file.write_text("country,gdp\nUSA,100\n", encoding='utf-8')
+
+        loader = DataLoader(workers=2)
+
+        with pytest.raises(FileNotFoundError) as exc_info:
+            loader.load_files([str(valid_file), "nonexistent.csv"])
+
+        assert "Файл не найден: nonexistent.csv" in str(exc_info.value)
+
+    def test_column_projection_with_dtypes(self, temp_csv_files):
+        """Test that only declared columns are kept and parsed by dtype."""
+        loader = DataLoader(columns={'country': str, 'gdp': float, 'year': int})
+        result = loader.load_files(temp_csv_files)
+
+        assert len(result) == 7
+        assert result[0] == {'country': 'United States', 'gdp': 25462.0, 'year': 2023}
+
+    def test_column_projection_missing_and_invalid(self, tmp_path):
+        """Test projected columns that are absent or malformed."""
+        test_file = tmp_path / "test.csv"
+        test_file.write_text("country,gdp\nUSA,invalid\nGermany\n", encoding='utf-8')
+
+        result = DataLoader(columns={'country': str, 'gdp': float, 'year': int}).load_files([str(test_file)])
+
+        assert result == [{'country': 'USA', 'gdp': None}, {'country': 'Germany', 'gdp': None}]
+
 
 if __name__ == '__main__':
     pytest.main([__file__, '-v'])
@@ -0,0 +1,94 @@
+"""Tests for profiling instrumentation."""
+import json
+import pstats
+import time
+
+import pytest
+
+from macro_analysis.cli import main
+from macro_analysis.profiling import NullProfiler, Profiler
+
+
+def _slow_rows(count, delay):
+    for i in range(count):
+        time.sleep(delay)
+        yield {'n': i}
+
+
+class TestProfiler:
+    """Test cases for Profiler class."""
+
+    def test_iter_span_is_charged_to_its_own_stage(self):
+        """Test that time spent producing rows is excluded from the consuming span."""
+        profiler = Profiler()
+
+        with profiler.span('aggregate'):
+            rows = list(profiler.iter_span('load', _slow_rows(5, 0.01)))
+
+        assert len(rows) == 5
+        assert profiler.rows == 5
+        assert profiler.stages['load'] >= 0.05
+        assert profiler.stages['aggregate'] < profiler.stages['load']
+
+    def test_to_dict_reports_throughput(self, tmp_path):
+        """Test that throughput counters are derived from the load stage."""
+        test_file = tmp_path / "data.csv"
+        test_file.write_text("country,gdp\nUSA,100\n", encoding='utf-8')
+        profiler = Profiler()
+        profiler.add_files([str(test_file), str(tmp_path / "missing.csv")])
+        list(profiler.iter_span('load', _slow_rows(2, 0.001)))
+        profiler.finish()
+
+        stats = profiler.to_dict()
+
+        assert stats['rows'] == 2
+        assert stats['bytes'] == test_file.stat().st_size
+        assert stats['rows_per_second'] == pytest.approx(2 / stats['stages']['load'])
+        assert stats['total_seconds'] >= stats['stages']['load']
+
+    def test_null_profiler_passes_items_through(self):
+        """Test that the disabled profiler returns the iterable unchanged."""
+        rows = [{'n': 1}]
+        profiler = NullProfiler()
+
+        with profiler.span('aggregate'):
+            assert profiler.iter_span('load', rows) is rows
+
+
+class TestProfileCLI:
+    """Test cases for the --profile CLI options."""
+
+    @pytest.fixture
+    def csv_file(self, tmp_path):
+        """Create a small CSV file."""
+        test_file = tmp_path / "data.csv"
+        test_file.write_text("country,gdp\nUSA,100\nGermany,200\n", encoding='utf-8')
+        return str(test_file)
+
+    def test_profile_prints_to_stderr(self, csv_file, capsys):
+        """Test that --profile prints stages to stderr and leaves stdout clean."""
+        main(['--files', csv_file, '--report', 'average-gdp', '--profile'])
+        stdout, stderr = capsys.readouterr()
+
+        assert 'USA' in stdout
+        assert 'Профиль' not in stdout
+        for stage in ('load', 'aggregate', 'render', 'Пиковая память'):
+            assert stage in stderr
+
+    @pytest.mark.parametrize('loader', ['csv', 'columnar'])
+    def test_profile_json_and_cprofile(self, csv_file, tmp_path, loader, capsys):
+        """Test exporting the profile as JSON and a cProfile dump."""
+        profile_json = tmp_path / "profile.json"
+        cprofile = tmp_path / "run.prof"
+
+        main(['--files', csv_file, '--report', 'average-gdp', '--loader', loader,
+              '--profile-json', str(profile_json), '--cprofile', str(cprofile)])
+
+        stats = json.loads(profile_json.read_text(encoding='utf-8'))
+        assert set(stats['stages']) == {'load', 'aggregate', 'render'}
+        assert stats['rows'] == 2
+        assert pstats.Stats(str(cprofile)).total_calls > 0
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
@@ -0,0 +1,145 @@
+"""Tests for the compact RecordStore row representation."""
+import tracemalloc
+from collections.abc import Mapping
+
+import pytest
+
+from macro_analysis.columnar import SCHEMA
+from macro_analysis.loader import DataLoader
+from macro_analysis.records import Record, RecordStore
+from macro_analysis.reports.average_gdp import AverageGDPReport, GDPAggregate
+from macro_analysis.server import Dataset
+
+from benchmarks.synthetic import generate_files
+
+
+class TestRecordStore:
+    """Test cases for RecordStore and Record."""
+
+    @pytest.fixture
+    def rows(self):
+        return [
+            {'country': 'United States', 'gdp': 25462.0, 'continent': 'North America'},
+            {'country': 'China', 'gdp': None, 'continent': 'Asia'},
+            {'country': 'United States', 'gdp': 23315.0, 'continent': 'North America'},
+        ]
+
+    def test_rows_read_back(self, rows):
+        """Test that records compare equal to the original rows."""
+        store = RecordStore(rows, {'country': str, 'gdp': float})
+
+        assert len(store) == 3
+        assert list(store) == rows
+        assert store[-1] == rows[-1]
+        assert store[1:] == rows[1:]
+        with pytest.raises(IndexError):
+            store[3]
+
+    def test_record_mapping_access(self, rows):
+        """Test that records are read by name like dicts."""
+        record = RecordStore(rows)[0]
+
+        assert isinstance(record, Mapping)
+        assert isinstance(record, Record)
+        assert record['country'] == 'United States'
+        assert record.get('missing') is None
+        assert 'gdp' in record
+        assert dict(record) == rows[0]
+        with pytest.raises(KeyError):
+            record['missing']
+
+    def test_categories_are_shared(self, rows):
+        """Test that repeated strings are stored once."""
+        store = RecordStore(rows)
+
+        assert store.column('country') == ['United States', 'China', 'United States']
+        assert store[0]['country'] is store[2]['country']
+
+    def test_new_columns_are_backfilled(self):
+        """Test rows whose columns differ, as with files with different headers."""
+        store = RecordStore([{'country': 'USA'}, {'country': 'China', 'gdp': 17963.0}], {'gdp': float})
+
+        assert store.fieldnames == ['country', 'gdp']
+        assert store[0]['gdp'] is None
+        assert store[1]['gdp'] == 17963.0
+
+    def test_column_order_follows_rows(self):
+        """Test that columns keep the order of the row keys, not of a set."""
+        names = ['gdp', 'year', 'country', 'continent', 'inflation', 'population', 'unemployment']
+        store = RecordStore([dict.fromkeys(names, '1')])
+
+        assert store.fieldnames == names
+        assert list(store[0]) == names
+
+    def test_int_columns_are_typed(self):
+        """Test that int columns use a 64-bit array with None for missing values."""
+        store = RecordStore([{'year': 2020}, {'year': None}, {'year': -1}], {'year': int})
+
+        assert store.column('year') == [2020, None, -1]
+        assert store.nbytes() == 3 * 8
+
+    def test_int_overflow_becomes_category(self):
+        """Test that a value that does not fit the typed array keeps the column readable."""
+        store = RecordStore([{'year': 2020}, {'year': 2 ** 70}], {'year': int})
+
+        assert store.column('year') == [2020, 2 ** 70]
+
+    def test_extra_fields_key_skipped(self):
+        """Test that csv.DictReader extras under the None key are not stored."""
+        store = RecordStore([{'country': 'USA', None: ['extra']}])
+
+        assert dict(store[0]) == {'country': 'USA'}
+
+
+class TestCompactLoading:
+    """Test cases for DataLoader(compact=True)."""
+
+    @pytest.fixture
+    def csv_file(self, tmp_path):
+        return generate_files(str(tmp_path), 5000)[0]
+
+    @pytest.mark.parametrize('columns', [None, AverageGDPReport.columns])
+    def test_same_rows_as_dicts(self, csv_file, columns):
+        """Test that compact loading keeps every value."""
+        rows = DataLoader(columns=columns).load_files([csv_file])
+        store = DataLoader(columns=columns, compact=True).load_files([csv_file])
+
+        assert isinstance(store, RecordStore)
+        assert list(store) == rows
+
+    def test_report_over_store(self, csv_file):
+        """Test that reports give the same result over a RecordStore."""
+        rows = DataLoader(columns=AverageGDPReport.columns).load_files([csv_file])
+        store = DataLoader(columns=AverageGDPReport.columns, compact=True).load_files([csv_file])
+
+        assert GDPAggregate().update(store) == GDPAggregate().update(rows)
+        assert GDPAggregate().update(list(store)) == GDPAggregate().update(rows)
+        assert AverageGDPReport(store).generate() == AverageGDPReport(rows).generate()
+
+    def test_memory_reduction(self, csv_file):
+        """Test that a typed load takes several times less memory."""
+        def traced(compact):
+            tracemalloc.start()
+            try:
+                data = DataLoader(columns=SCHEMA, compact=compact).load_files([csv_file])
+                return tracemalloc.get_traced_memory()[0], data
+            finally:
+                tracemalloc.stop()
+
+        dict_bytes, _ = traced(False)
+        store_bytes, _ = traced(True)
+
+        assert dict_bytes / store_bytes > 3
+
+    def test_server_dataset(self, csv_file):
+        """Test that the server keeps compact data and filters it."""
+        dataset = Dataset([csv_file], compact=True)
+        dataset.refresh(strict=True)
+        expected = AverageGDPReport(DataLoader().load_files([csv_file])).generate()
+
+        assert dataset.query('average-gdp') == expected
+        assert dataset.query('average-gdp', ['continent=Asia'])
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
@@ -1,5 +1,12 @@
 """Tests for the ReportRegistry."""
+import subprocess
+import sys
+from importlib.metadata import EntryPoint
+from pathlib import Path
+from unittest.mock import patch
+
 import pytest
+from macro_analysis import registry
 from macro_analysis.registry import ReportRegistry
 from macro_analysis.reports.average_gdp import AverageGDPReport
 
@@ -81,6 +88,63 @@ class TestReportRegistry:
             assert hasattr(report_class, '__init__')  # Has constructor
             assert hasattr(report_class, 'generate') or hasattr(report_class, 'process')
 
+    def test_reports_declare_columns(self):
+        """Test that reports declare the columns and dtypes they read."""
+        for report_class in ReportRegistry._reports.values():
+            columns = getattr(report_class, 'columns', None)
+            assert columns is None or all(dtype in (str, float, int) for dtype in columns.values())
+
+        assert AverageGDPReport.columns == {'country': str, 'gdp': float}
+
+    def test_register_decorator(self):
+        """Test registering a report class with the decorator."""
+        with patch.dict(ReportRegistry._reports):
+            @ReportRegistry.register('plugin-report')
+            class PluginReport(AverageGDPReport):
+                pass
+
+            assert ReportRegistry.get_report('plugin-report') is PluginReport
+            assert 'plugin-report' in ReportRegistry.names()
+
+        assert ReportRegistry.get_report('plugin-report') is None
+
+    def test_lazy_reference_imported_on_lookup(self):
+        """Test that a lazily registered report is imported only when requested."""
+        with patch.dict(ReportRegistry._reports):
+            ReportRegistry.register_lazy('lazy-report', 'macro_analysis.missing_module:Report')
+            assert 'lazy-report' in ReportRegistry.names()
+
+            with pytest.raises(ImportError):
+                ReportRegistry.get_report('lazy-report')
+
+    def test_entry_point_discovery(self, monkeypatch):
+        """Test that reports published as entry points are discovered."""
+        entry_points = [
+            EntryPoint('plugin-gdp', 'macro_analysis.reports.average_gdp:AverageGDPReport',
+                       registry.ENTRY_POINT_GROUP),
+            EntryPoint('average-gdp', 'other_package:OtherReport', registry.ENTRY_POINT_GROUP),
+        ]
+        monkeypatch.setattr(registry, '_entry_points', lambda group: entry_points)
+        monkeypatch.setattr(ReportRegistry, '_discovered', False)
+
+        with patch.dict(ReportRegistry._reports):
+            assert ReportRegistry.get_report('plugin-gdp') is AverageGDPReport
+            # Встроенный отчет не перекрывается плагином
+            assert ReportRegistry.get_report('average-gdp') is AverageGDPReport
+
+    def test_cold_start_imports_no_reports(self):
+        """Test that importing the package and listing reports does not import report modules."""
+        code = (
+            "import sys, macro_analysis, macro_analysis.cli;"
+            "from macro_analysis.registry import ReportRegistry;"
+            "ReportRegistry.names();"
+            "print('macro_analysis.reports.average_gdp' in sys.modules, 'pandas' in sys.modules,"
+            " 'tabulate' in sys.modules)"
+        )
+        result = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True, check=True,
+                                cwd=Path(__file__).resolve().parents[1])
+        assert result.stdout.split() == ['False', 'False', 'False']
+
     def test_get_report_with_none_input(self):
         """Test get_report with None as input."""
         result = ReportRegistry.get_report(None)
@@ -0,0 +1,113 @@
+"""Tests for hierarchical rollup reports."""
+import pandas as pd
+import pytest
+
+from macro_analysis.chunked import aggregate_chunked, generate_chunked
+from macro_analysis.groupby import GroupByReport, RollupReport
+from macro_analysis.registry import ReportRegistry
+from macro_analysis.reports.rollups import ContinentRollupReport, CountryRollupReport
+
+ROWS = [
+    {'country': 'France', 'continent': 'Europe', 'inflation': 5.0, 'population': 70.0},
+    {'country': 'France', 'continent': 'Europe', 'inflation': 6.0, 'population': 70.0},
+    {'country': 'Malta', 'continent': 'Europe', 'inflation': 2.0, 'population': 1.0},
+    {'country': 'China', 'continent': 'Asia', 'inflation': 1.0, 'population': 1400.0},
+    {'country': 'Japan', 'continent': 'Asia', 'inflation': 3.0, 'population': None},
+]
+
+
+class InflationRollup(RollupReport):
+    keys = ('continent', 'country')
+    metrics = {'inflation': ('mean', 'weighted_mean', 'count')}
+    weights = {'inflation': 'population'}
+
+
+class ContinentInflation(GroupByReport):
+    keys = ('continent',)
+    metrics = {'inflation': ('mean', 'weighted_mean', 'count')}
+    weights = {'inflation': 'population'}
+
+
+class TestRollupReport:
+    """Test cases for RollupReport."""
+
+    def test_hierarchical_rows(self):
+        """Test levels, their order and population weighting."""
+        result = InflationRollup(ROWS).generate()
+
+        assert [(row['Уровень'], row['Континент'], row['Страна']) for row in result] == [
+            ('Мир', '', ''),
+            ('Континент', 'Europe', ''),
+            ('Страна', 'Europe', 'France'),
+            ('Страна', 'Europe', 'Malta'),
+            ('Континент', 'Asia', ''),
+            ('Страна', 'Asia', 'China'),
+            ('Страна', 'Asia', 'Japan'),
+        ]
+        europe = result[1]
+        assert europe['Инфляция (среднее)'] == pytest.approx(13 / 3)
+        assert europe['Инфляция (взвешенное среднее)'] == pytest.approx((5 * 70 + 6 * 70 + 2) / 141)
+        # Строка без населения не участвует во взвешенном среднем
+        assert result[6]['Инфляция (взвешенное среднее)'] is None
+        assert result[4]['Инфляция (взвешенное среднее)'] == pytest.approx(1.0)
+        assert result[0]['Инфляция (количество)'] == 5
+
+    def test_levels_match_direct_grouping(self):
+        """Test that derived levels equal aggregating the rows by that level directly."""
+        result = InflationRollup(pd.DataFrame(ROWS)).generate()
+        direct = ContinentInflation(ROWS).generate()
+
+        continents = [row for row in result if row['Уровень'] == 'Континент']
+        for rollup_row, direct_row in zip(continents, direct):
+            assert rollup_row['Континент'] == direct_row['Континент']
+            for name in ('Инфляция (среднее)', 'Инфляция (взвешенное среднее)', 'Инфляция (количество)'):
+                assert rollup_row[name] == pytest.approx(direct_row[name])
+
+    def test_rows_read_once(self, monkeypatch):
+        """Test that higher levels are derived without reading the rows again."""
+        calls = []
+        original = InflationRollup.aggregate_class.update_frame
+        monkeypatch.setattr(InflationRollup.aggregate_class, 'update_frame',
+                            lambda self, frame: calls.append(len(frame)) or original(self, frame))
+
+        InflationRollup(ROWS).generate()
+
+        assert calls == [len(ROWS)]
+
+    def test_weighted_mean_requires_weight(self):
+        """Test that weighted metrics must name their weight column."""
+        with pytest.raises(ValueError, match="не задан вес"):
+            class BadRollup(RollupReport):
+                metrics = {'inflation': ('weighted_mean',)}
+
+    def test_chunked_with_spills(self, tmp_path):
+        """Test that spilled rollups are merged before totals are computed."""
+        memory_limit = 2 * 512 + InflationRollup.aggregate_class.group_bytes()
+        spilling, = aggregate_chunked([InflationRollup], ROWS, memory_limit=memory_limit,
+                                      batch_rows=2, directory=str(tmp_path))
+
+        assert spilling.spills > 0
+        result = generate_chunked(InflationRollup, spilling)
+        assert [row['Уровень'] for row in result].count('Мир') == 1
+        assert result[0] == InflationRollup(ROWS).generate()[0]
+
+
+class TestRegisteredRollups:
+    """Test cases for the registered rollup reports."""
+
+    def test_registered(self):
+        """Test that the rollups are available in the registry."""
+        assert ReportRegistry.get_report('country-rollup') is CountryRollupReport
+        assert ReportRegistry.get_report('continent-rollup') is ContinentRollupReport
+
+    def test_continent_rollup_levels(self):
+        """Test that the continent rollup omits country rows."""
+        result = ContinentRollupReport(ROWS).generate()
+
+        assert [row['Уровень'] for row in result] == ['Мир', 'Континент', 'Континент']
+        assert 'Безработица (взвеш. по населению)' in result[0]
+        assert ContinentRollupReport.columns['population'] is float
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
@@ -0,0 +1,176 @@
+"""Tests for the memory-mapped CSV scanner."""
+import csv
+from unittest.mock import patch
+
+import pytest
+
+from macro_analysis.loader import DataLoader
+from macro_analysis.scanner import scan_file
+
+CONTENT = """country,year,gdp,gdp_growth,inflation,unemployment,population,continent
+United States,2023,25462,2.1,3.4,3.7,339,North America
+China,2023,17963,5.2,2.5,5.2,1425,Asia
+
+Germany,2023,4086,-0.3,6.2,3.0,83,Europe
+"""
+
+
+def _dict_reader(path):
+    with open(path, encoding='utf-8') as file:
+        return list(csv.DictReader(file))
+
+
+class TestScanner:
+    """Test cases for scan_file."""
+
+    @pytest.fixture
+    def csv_file(self, tmp_path):
+        """Create a CSV file with the full schema."""
+        test_file = tmp_path / "data.csv"
+        test_file.write_text(CONTENT, encoding='utf-8')
+        return str(test_file)
+
+    def test_all_columns_match_dict_reader(self, csv_file):
+        """Test that without projection rows equal csv.DictReader rows."""
+        assert list(scan_file(csv_file)) == _dict_reader(csv_file)
+
+    def test_projection(self, csv_file):
+        """Test that only the requested columns are returned."""
+        rows = list(scan_file(csv_file, ['country', 'gdp', 'missing']))
+
+        assert rows == [
+            {'country': 'United States', 'gdp': '25462'},
+            {'country': 'China', 'gdp': '17963'},
+            {'country': 'Germany', 'gdp': '4086'},
+        ]
+
+    def test_typed_projection(self, csv_file):
+        """Test that declared dtypes are parsed straight from bytes."""
+        rows = list(scan_file(csv_file, {'country': str, 'year': int, 'gdp': float}))
+
+        assert rows[0] == {'country': 'United States', 'year': 2023, 'gdp': 25462.0}
+        assert isinstance(rows[0]['gdp'], float)
+
+    def test_typed_short_row(self, tmp_path):
+        """Test that missing and malformed typed fields become None."""
+        test_file = tmp_path / "short.csv"
+        test_file.write_text("country,gdp,year\nUSA,invalid\n", encoding='utf-8')
+
+        assert list(scan_file(str(test_file), {'gdp': float, 'year': int})) == [{'gdp': None, 'year': None}]
+
+    def test_chunk_boundaries(self, csv_file):
+        """Test that splitting into tiny chunks does not change the rows."""
+        with patch('macro_analysis.scanner.CHUNK_BYTES', 7):
+            assert list(scan_file(csv_file)) == _dict_reader(csv_file)
+
+    def test_crlf_line_endings(self, tmp_path):
+        """Test files with Windows line endings."""
+        test_file = tmp_path / "crlf.csv"
+        test_file.write_bytes(b"country,gdp\r\nUSA,100\r\nGermany,200\r\n")
+
+        assert list(scan_file(str(test_file), ['gdp', 'country'])) == [
+            {'gdp': '100', 'country': 'USA'},
+            {'gdp': '200', 'country': 'Germany'},
+        ]
+
+    def test_mixed_line_endings(self, tmp_path):
+        """Test CRLF rows under an LF header, as in concatenated exports."""
+        test_file = tmp_path / "mixed.csv"
+        test_file.write_bytes(b"country,year,continent\nUSA,2,North America\r\nMalta,3,Europe\r\n\r\nChina,4,Asia\n")
+
+        assert list(scan_file(str(test_file))) == _dict_reader(test_file)
+        assert list(scan_file(str(test_file), {'year': int, 'continent': str})) == [
+            {'year': 2, 'continent': 'North America'},
+            {'year': 3, 'continent': 'Europe'},
+            {'year': 4, 'continent': 'Asia'},
+        ]
+
+    def test_short_and_long_rows(self, tmp_path):
+        """Test that uneven rows are shaped like csv.DictReader rows."""
+        test_file = tmp_path / "uneven.csv"
+        test_file.write_text("country,gdp,year\nUSA,100,2023,extra\nGermany\n", encoding='utf-8')
+
+        assert list(scan_file(str(test_file))) == _dict_reader(str(test_file))
+        assert list(scan_file(str(test_file), ['country', 'year'])) == [
+            {'country': 'USA', 'year': '2023'},
+            {'country': 'Germany', 'year': None},
+        ]
+
+    def test_quoted_file_falls_back_to_csv(self, tmp_path):
+        """Test that quoted fields with delimiters are parsed correctly."""
+        test_file = tmp_path / "quoted.csv"
+        test_file.write_text('country,gdp\n"Germany, EU","200"\n', encoding='utf-8')
+
+        assert list(scan_file(str(test_file), ['country', 'gdp'])) == [{'country': 'Germany, EU', 'gdp': '200'}]
+
+    @pytest.mark.parametrize('content', [
+        "country,gdp,year\nUSA,100,2023,extra\n\nGermany\nChina,x,2022\n",
+        'country,gdp,year\n"Germany, EU","200",2023\nUSA,300\n',
+    ])
+    def test_projection_matches_dict_reader(self, tmp_path, content):
+        """Test that projected csv-module rows equal the selected fields of csv.DictReader rows."""
+        test_file = tmp_path / "uneven.csv"
+        test_file.write_text(content, encoding='utf-8')
+        columns = {'year': int, 'country': str, 'gdp': float, 'missing': str}
+        expected = [
+            {'year': row['year'] and int(row['year']), 'country': row['country'],
+             'gdp': row['gdp'] and float(row['gdp'])}
+            for row in _dict_reader(str(test_file)) if row['country'] != 'China'
+        ]
+
+        loader = DataLoader(columns=columns, filters=['country!=China'])
+        assert loader.load_files([str(test_file)]) == expected
+
+    @pytest.mark.parametrize('content', ['', 'country,gdp\n', '\n\n'])
+    def test_empty_files(self, tmp_path, content):
+        """Test empty and header-only files."""
+        test_file = tmp_path / "empty.csv"
+        test_file.write_text(content, encoding='utf-8')
+
+        assert list(scan_file(str(test_file))) == []
+
+    def test_only_selected_columns_are_decoded(self, tmp_path):
+        """Test that undecodable bytes in skipped columns are never decoded."""
+        test_file = tmp_path / "cp1251.csv"
+        test_file.write_bytes("country,gdp,note\nUSA,100,Тест\n".encode('cp1251'))
+
+        assert list(scan_file(str(test_file), ['country', 'gdp'])) == [{'country': 'USA', 'gdp': '100'}]
+        with pytest.raises(UnicodeDecodeError):
+            list(scan_file(str(test_file)))
+
+
+class TestMmapEngine:
+    """Test cases for DataLoader(engine='mmap')."""
+
+    def test_loader_matches_csv_engine(self, tmp_path):
+        """Test that both engines produce the same projected rows."""
+        test_file = tmp_path / "data.csv"
+        test_file.write_text(CONTENT, encoding='utf-8')
+        columns = ['country', 'gdp']
+
+        mmap_rows = DataLoader(engine='mmap', columns=columns).load_files([str(test_file)])
+        csv_rows = DataLoader(columns=columns).load_files([str(test_file)])
+
+        assert mmap_rows == csv_rows
+
+    def test_loader_errors_name_the_file(self, tmp_path):
+        """Test error messages of the mmap engine."""
+        loader = DataLoader(engine='mmap')
+        with pytest.raises(FileNotFoundError) as exc_info:
+            loader.load_files(["nonexistent.csv"])
+        assert "Файл не найден: nonexistent.csv" in str(exc_info.value)
+
+        test_file = tmp_path / "cp1251.csv"
+        test_file.write_bytes("country,gdp\nРФ,200\n".encode('cp1251'))
+        with pytest.raises(Exception) as exc_info:
+            loader.load_files([str(test_file)])
+        assert "Ошибка чтения файла" in str(exc_info.value)
+
+    def test_unknown_engine(self):
+        """Test that an unknown engine is rejected."""
+        with pytest.raises(ValueError):
+            DataLoader(engine='unknown')
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
@@ -0,0 +1,85 @@
+"""Tests for top-N / bottom-N row selection."""
+import random
+
+import pytest
+
+from macro_analysis.batch import generate_reports
+from macro_analysis.reports.average_gdp import AverageGDPReport
+from macro_analysis.reports.indicators import AverageInflationReport
+from macro_analysis.selection import generate_report, select_rows
+
+
+def sort_key(row):
+    return -row['value']
+
+
+class PluginReport:
+    """Report without ``top`` and ``bottom`` arguments."""
+
+    sort_key = staticmethod(sort_key)
+
+    def __init__(self, data=()):
+        self.data = data
+
+    def generate(self):
+        return sorted(self.data, key=self.sort_key)
+
+
+class TestSelectRows:
+    """Test cases for select_rows."""
+
+    @pytest.mark.parametrize('count', [0, 1, 5, 30, 100])
+    def test_matches_sorted_slice(self, count):
+        """Test that heap selection equals slicing the sorted rows, ties included."""
+        rows = [{'id': index, 'value': random.randint(0, 10)} for index in range(50)]
+        ordered = sorted(rows, key=sort_key)
+
+        assert select_rows(iter(rows), sort_key, top=count) == ordered[:count]
+        assert select_rows(iter(rows), sort_key, bottom=count) == (ordered[-count:] if count else [])
+
+    def test_without_sort_key(self):
+        """Test that rows without a sort key keep their order."""
+        assert select_rows(iter(range(10)), top=3) == [0, 1, 2]
+        assert select_rows(iter(range(10)), bottom=3) == [7, 8, 9]
+        assert select_rows(iter(range(3))) == [0, 1, 2]
+
+    def test_invalid_counts(self):
+        """Test that conflicting or negative counts are rejected."""
+        with pytest.raises(ValueError):
+            select_rows([], sort_key, top=1, bottom=1)
+        with pytest.raises(ValueError):
+            select_rows([], sort_key, top=-1)
+
+
+class TestGenerateReport:
+    """Test cases for limiting report output."""
+
+    ROWS = [
+        {'country': country, 'gdp': gdp, 'inflation': gdp / 10}
+        for country, gdp in [('A', 5.0), ('B', 30.0), ('C', 10.0), ('D', 20.0)]
+    ]
+
+    def test_average_gdp(self):
+        """Test the first and last countries by average GDP."""
+        report = AverageGDPReport(self.ROWS)
+
+        assert [row['Страна'] for row in report.generate(top=2)] == ['B', 'D']
+        assert [row['Страна'] for row in report.generate(bottom=2)] == ['C', 'A']
+
+    def test_group_by_report(self):
+        """Test a group-by report sorted by its metric."""
+        result = generate_reports([AverageInflationReport, AverageGDPReport], self.ROWS, top=1)
+
+        assert [len(rows) for rows in result] == [1, 1]
+        assert result[0][0]['Страна'] == 'B'
+
+    def test_report_without_arguments(self):
+        """Test that reports without the arguments are limited by their sort key."""
+        rows = [{'value': value} for value in (3, 1, 2)]
+
+        assert generate_report(PluginReport(rows), bottom=1) == [{'value': 1}]
+        assert generate_report(PluginReport(rows)) == [{'value': 3}, {'value': 2}, {'value': 1}]
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
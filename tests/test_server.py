@@ -0,0 +1,204 @@
+import http.client
+import json
+import os
+import socket
+import threading
+from pathlib import Path
+
+import pytest
+
+from macro_analysis.filters import filter_key, parse_filters
+from macro_analysis.loader import DataLoader
+from macro_analysis.reports.average_gdp import AverageGDPReport
+from macro_analysis.server import Dataset, make_server
+
+
+HEADER = "country,year,gdp,gdp_growth,inflation,unemployment,population,continent\n"
+
+
+def write_csv(path, lines, mtime_ns=None):
+    path.write_text(HEADER + "".join(line + "\n" for line in lines), encoding='utf-8')
+    if mtime_ns is not None:
+        os.utime(path, ns=(mtime_ns, mtime_ns))
+    return str(path)
+
+
+@pytest.fixture
+def files(tmp_path):
+    first = write_csv(tmp_path / "first.csv", [
+        "United States,2022,25462,2.1,8.0,3.6,339,North America",
+        "China,2022,17963,3.0,1.9,5.6,1412,Asia",
+    ])
+    second = write_csv(tmp_path / "second.csv", [
+        "United States,2023,27360,2.5,4.1,3.7,340,North America",
+        "Germany,2023,4430,-0.3,5.9,3.0,84,Europe",
+    ])
+    return [first, second]
+
+
+class TestDataset:
+    """Тесты данных, хранящихся в памяти сервера"""
+
+    def test_query_matches_batch_report(self, files):
+        """Проверка совпадения с обычным запуском отчета"""
+        dataset = Dataset(files)
+        dataset.refresh(strict=True)
+
+        expected = AverageGDPReport(DataLoader().load_files(files)).generate()
+        assert dataset.query('average-gdp') == expected
+
+    def test_query_with_filters(self, files):
+        """Проверка условий отбора в запросе"""
+        dataset = Dataset(files, loader='columnar')
+        dataset.refresh(strict=True)
+
+        result = dataset.query('average-gdp', ['year>=2023'])
+        assert [row['Страна'] for row in result] == ['United States', 'Germany']
+        assert result[0]['Средний ВВП'] == 27360
+
+    def test_unknown_report(self, files):
+        """Проверка ошибки для неизвестного отчета"""
+        dataset = Dataset(files)
+        dataset.refresh(strict=True)
+
+        with pytest.raises(KeyError):
+            dataset.query('unknown')
+
+    def test_aggregate_cache_is_bounded(self, files):
+        """Проверка, что на файл хранятся только последние использованные агрегаты"""
+        dataset = Dataset(files, max_aggregates=2)
+        dataset.refresh(strict=True)
+        expected = {where: dataset.query('average-gdp', [where]) for where in ('year>=2022', 'year>=2023')}
+
+        for where in ('year>=2022', 'gdp>5000', 'year>=2023', 'year>=2022', 'gdp<5000'):
+            dataset.query('average-gdp', [where])
+
+        for loaded in dataset._files.values():
+            assert [key[1] for key in loaded.aggregates] == [
+                filter_key(parse_filters(['year>=2022'])), filter_key(parse_filters(['gdp<5000']))]
+        for where, rows in expected.items():
+            assert dataset.query('average-gdp', [where]) == rows
+
+    def test_missing_file_strict(self, tmp_path):
+        """Проверка ошибки для отсутствующего файла при запуске"""
+        dataset = Dataset([str(tmp_path / "missing.csv")])
+
+        with pytest.raises(FileNotFoundError, match="Файл не найден"):
+            dataset.refresh(strict=True)
+
+    def test_reloads_only_changed_files(self, files, monkeypatch):
+        """Проверка перезагрузки только измененного файла"""
+        dataset = Dataset(files)
+        dataset.refresh(strict=True)
+        assert dataset.query('average-gdp')[0]['Средний ВВП'] == pytest.approx(26411)
+
+        loaded = []
+        original = DataLoader.load_files
+
+        def load_files(self, file_paths):
+            loaded.extend(file_paths)
+            return original(self, file_paths)
+
+        monkeypatch.setattr(DataLoader, 'load_files', load_files)
+        assert dataset.refresh() == []
+
+        stat = os.stat(files[1])
+        write_csv(Path(files[1]), [
+            "United States,2023,27000,2.5,4.1,3.7,340,North America",
+        ], mtime_ns=stat.st_mtime_ns + 10 ** 9)
+
+        assert dataset.refresh() == [files[1]]
+        assert loaded == [files[1]]
+        assert dataset.query('average-gdp')[0]['Средний ВВП'] == pytest.approx(26231)
+
+    def test_broken_reload_keeps_previous_data(self, files, capsys):
+        """Проверка работы со старыми данными при ошибке перезагрузки"""
+        dataset = Dataset(files)
+        dataset.refresh(strict=True)
+        expected = dataset.query('average-gdp')
+
+        os.remove(files[0])
+
+        assert dataset.refresh() == []
+        assert "Файл не найден" in capsys.readouterr().err
+        assert dataset.query('average-gdp') == expected
+
+
+class TestHTTPServer:
+    """Тесты JSON API сервера"""
+
+    @pytest.fixture
+    def server(self, files):
+        dataset = Dataset(files)
+        dataset.refresh(strict=True)
+        server = make_server(dataset, port=0)
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        yield server
+        server.shutdown()
+        server.server_close()
+
+    def request(self, server, path):
+        connection = http.client.HTTPConnection(*server.server_address)
+        connection.request('GET', path)
+        response = connection.getresponse()
+        payload = json.loads(response.read().decode('utf-8'))
+        connection.close()
+        return response.status, payload
+
+    def test_report(self, server):
+        """Проверка получения отчета"""
+        status, payload = self.request(server, '/reports/average-gdp?where=country%3DChina')
+
+        assert status == 200
+        assert payload == {'report': 'average-gdp', 'rows': [{'Страна': 'China', 'Средний ВВП': 17963.0}]}
+
+    def test_report_top(self, server):
+        """Проверка ограничения количества строк"""
+        status, payload = self.request(server, '/reports/average-gdp?top=1')
+        _, full = self.request(server, '/reports/average-gdp')
+
+        assert status == 200
+        assert payload['rows'] == full['rows'][:1]
+        assert self.request(server, '/reports/average-gdp?bottom=x')[0] == 400
+
+    def test_list_reports(self, server):
+        """Проверка списка отчетов"""
+        status, payload = self.request(server, '/reports')
+
+        assert status == 200
+        assert 'average-gdp' in payload['reports']
+
+    def test_errors(self, server):
+        """Проверка кодов ошибок"""
+        assert self.request(server, '/reports/unknown')[0] == 404
+        assert self.request(server, '/reports/average-gdp?where=year')[0] == 400
+        assert self.request(server, '/nothing')[0] == 404
+
+    def test_unix_socket(self, files, tmp_path):
+        """Проверка работы через Unix-сокет"""
+        dataset = Dataset(files)
+        dataset.refresh(strict=True)
+        socket_path = str(tmp_path / "reports.sock")
+        server = make_server(dataset, socket_path=socket_path)
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        try:
+            client = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            client.connect(socket_path)
+            client.sendall(b"GET /files HTTP/1.0\r\n\r\n")
+            response = b""
+            while chunk := client.recv(65536):
+                response += chunk
+            client.close()
+        finally:
+            server.shutdown()
+            server.server_close()
+
+        head, body = response.split(b"\r\n\r\n", 1)
+        assert head.startswith(b"HTTP/1.0 200")
+        assert [item['rows'] for item in json.loads(body)['files']] == [2, 2]
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
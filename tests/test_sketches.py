@@ -0,0 +1,146 @@
+"""Tests for quantile sketches and approximate quantile reports."""
+import bisect
+import pickle
+import random
+
+import pandas as pd
+import pytest
+
+from macro_analysis.chunked import aggregate_chunked, generate_chunked
+from macro_analysis.groupby import GroupByReport, RollupReport
+from macro_analysis.registry import ReportRegistry
+from macro_analysis.reports.quantiles import ContinentQuantilesReport
+from macro_analysis.sketches import KLLSketch, k_for_error
+
+
+def rank_error(sorted_values, value, fraction):
+    return abs(bisect.bisect_left(sorted_values, value) / len(sorted_values) - fraction)
+
+
+@pytest.fixture(scope='module')
+def values():
+    generator = random.Random(7)
+    return [generator.lognormvariate(0, 2) for _ in range(50000)]
+
+
+class TestKLLSketch:
+    """Test cases for KLLSketch."""
+
+    def test_exact_while_small(self):
+        """Test that quantiles are exact before anything is compacted."""
+        sketch = KLLSketch().extend([5.0, 1.0, 4.0, 2.0, 3.0])
+
+        assert sketch.quantiles([0, 0.5, 0.9, 1]) == [1.0, 3.0, 5.0, 5.0]
+        assert KLLSketch().quantile(0.5) is None
+
+    @pytest.mark.parametrize('error', [0.01, 0.05])
+    def test_error_bound_and_constant_size(self, values, error):
+        """Test the rank error and that the sketch size does not grow with the data."""
+        sketch = KLLSketch(error)
+        for value in values:
+            sketch.update(value)
+        ordered = sorted(values)
+
+        for fraction in (0.1, 0.5, 0.9, 0.99):
+            assert rank_error(ordered, sketch.quantile(fraction), fraction) <= error
+        assert sum(map(len, sketch.levels)) <= 4 * k_for_error(error)
+        assert (sketch.minimum, sketch.maximum, len(sketch)) == (ordered[0], ordered[-1], len(values))
+
+    def test_merge(self, values):
+        """Test that sketches of separate parts merge into one within the same bound."""
+        parts = [KLLSketch().extend(values[index::5]) for index in range(5)]
+        merged = parts[0]
+        for part in parts[1:]:
+            merged.merge(part)
+        ordered = sorted(values)
+
+        assert len(merged) == len(values)
+        for fraction in (0.5, 0.9):
+            assert rank_error(ordered, merged.quantile(fraction), fraction) <= 0.01
+
+    def test_serialization(self, values):
+        """Test that dict and pickle round trips keep the sketch."""
+        sketch = KLLSketch().extend(values[:5000])
+
+        assert KLLSketch.from_dict(sketch.to_dict()) == sketch
+        restored = pickle.loads(pickle.dumps(sketch))
+        assert restored == sketch
+        assert restored.update(1.0).count == sketch.count + 1
+
+    def test_invalid_error(self):
+        """Test that the error must be a fraction."""
+        with pytest.raises(ValueError):
+            KLLSketch(0)
+        with pytest.raises(ValueError):
+            class BadReport(GroupByReport):
+                metrics = {'gdp': ('p50',)}
+                quantile_error = 1.5
+
+
+ROWS = [
+    {'country': f'C{index}', 'continent': 'Europe' if index % 3 else 'Asia',
+     'gdp': float(index), 'inflation': float(index % 10)}
+    for index in range(1, 301)
+]
+
+
+class WorldQuantiles(RollupReport):
+    keys = ('continent',)
+    metrics = {'gdp': ('p50', 'count')}
+
+
+class TestQuantileReports:
+    """Test cases for approximate quantile reports."""
+
+    def test_continent_quantiles(self):
+        """Test medians and percentiles per continent."""
+        result = ContinentQuantilesReport(ROWS).generate()
+
+        rows = {row['Континент']: row for row in result}
+        medians = [row['Медиана ВВП'] for row in result]
+        assert medians == sorted(medians, reverse=True)
+        europe = sorted(row['gdp'] for row in ROWS if row['continent'] == 'Europe')
+        assert rank_error(europe, rows['Europe']['Медиана ВВП'], 0.5) <= 0.01
+        assert rank_error(europe, rows['Europe']['ВВП, 90-й перцентиль'], 0.9) <= 0.01
+        assert rows['Asia']['Медиана инфляции'] == 4.0
+
+    def test_frame_and_rows_agree(self):
+        """Test that the vectorized path gives the same sketches as row updates."""
+        from_frame = ContinentQuantilesReport(pd.DataFrame(ROWS)).aggregate_data()
+        from_rows = ContinentQuantilesReport.aggregate_class()
+        for row in ROWS:
+            from_rows.add_row(row)
+
+        assert [values for _, values in from_frame.results()] == [values for _, values in from_rows.results()]
+
+    def test_aggregate_round_trip(self):
+        """Test that sketches survive aggregate serialization."""
+        aggregate = ContinentQuantilesReport(ROWS).aggregate_data()
+        restored = ContinentQuantilesReport.aggregate_class.from_dict(aggregate.to_dict())
+
+        assert restored == aggregate
+
+    def test_rollup_merges_sketches(self):
+        """Test that the world quantile is derived by merging continent sketches."""
+        result = WorldQuantiles(ROWS).generate()
+
+        assert result[0]['Уровень'] == 'Мир'
+        assert result[0]['ВВП (количество)'] == 300
+        assert rank_error([row['gdp'] for row in ROWS], result[0]['ВВП (медиана, прибл.)'], 0.5) <= 0.01
+
+    def test_chunked_with_spills(self, tmp_path):
+        """Test that spilled partitions give the same quantiles."""
+        memory_limit = 2 * 512 + ContinentQuantilesReport.aggregate_class.group_bytes()
+        spilling, = aggregate_chunked([ContinentQuantilesReport], ROWS, memory_limit=memory_limit,
+                                      batch_rows=2, directory=str(tmp_path))
+
+        assert spilling.spills > 0
+        assert list(generate_chunked(ContinentQuantilesReport, spilling)) == ContinentQuantilesReport(ROWS).generate()
+
+    def test_registered(self):
+        """Test that the report is available in the registry."""
+        assert ReportRegistry.get_report('continent-quantiles') is ContinentQuantilesReport
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
@@ -0,0 +1,150 @@
+"""Tests for time-series reports."""
+import math
+
+import pandas as pd
+import pytest
+
+from macro_analysis.chunked import aggregate_chunked, generate_chunked
+from macro_analysis.registry import ReportRegistry
+from macro_analysis.reports.growth import GDPGrowthReport, GDPTrendsReport
+from macro_analysis.timeseries import TimeSeriesIndex, TimeSeriesReport
+
+ROWS = [
+    {'country': 'B', 'year': 2020.0, 'gdp': 40.0},
+    {'country': 'A', 'year': 2019.0, 'gdp': 110.0},
+    {'country': 'A', 'year': 2022.0, 'gdp': 146.41},
+    {'country': 'A', 'year': 2018.0, 'gdp': 100.0},
+    {'country': 'B', 'year': 2019.0, 'gdp': 50.0},
+    {'country': 'A', 'year': 2020.0, 'gdp': 121.0},
+    {'country': 'C', 'year': 2020.0, 'gdp': 5.0},
+]
+
+
+def rolling_by_scan(cells, window):
+    """Reference rolling mean that looks every window up in a dictionary."""
+    result = {}
+    for (country, year), value in cells.items():
+        window_values = [cells.get((country, year - lag)) for lag in range(window)]
+        if all(value is not None for value in window_values):
+            result[country, year] = sum(window_values) / window
+    return result
+
+
+class TestTimeSeriesIndex:
+    """Test cases for TimeSeriesIndex."""
+
+    def test_sorted_once_into_contiguous_series(self):
+        """Test that cells are ordered by country and year with one slice per country."""
+        index = TimeSeriesIndex.from_cells((row['country'], row['year'], row['gdp']) for row in ROWS)
+
+        assert index.countries == ['B', 'A', 'C']
+        assert index.years.tolist() == [2019, 2020, 2018, 2019, 2020, 2022, 2020]
+        assert index.starts.tolist() == [0, 2, 6]
+        assert index.ends.tolist() == [2, 6, 7]
+
+    def test_windows_stop_at_gaps_and_countries(self):
+        """Test that windows never span a missing year or two countries."""
+        index = TimeSeriesIndex.from_cells((row['country'], row['year'], row['gdp']) for row in ROWS)
+        delta, percent = index.year_over_year()
+
+        assert [None if math.isnan(value) else value for value in delta] == [
+            None, -10, None, 10, 11, None, None]
+        assert percent[1] == pytest.approx(-20)
+
+    def test_rolling_matches_scan(self):
+        """Test the vectorized rolling mean against a dictionary scan."""
+        cells = {(country, year): float(country * 7 + year * 3 % 11)
+                 for country in range(5) for year in range(2000, 2020) if (country + year) % 6}
+        index = TimeSeriesIndex.from_cells((country, year, value) for (country, year), value in cells.items())
+        rolling = index.rolling_mean(3)
+
+        computed = {
+            (index.countries[code], year): value
+            for code, year, value in zip(index.codes, index.years, rolling) if not math.isnan(value)
+        }
+        assert computed == pytest.approx(rolling_by_scan(cells, 3))
+
+    def test_empty(self):
+        """Test an index without cells."""
+        index = TimeSeriesIndex.from_cells([])
+
+        assert len(index) == 0
+        assert len(index.rolling_mean(3)) == 0
+        assert [len(array) for array in index.growth_rates()] == [0] * 5
+
+
+class TestGrowthReports:
+    """Test cases for the GDP time-series reports."""
+
+    def test_cagr(self):
+        """Test the growth rate between the first and last year per country."""
+        result = GDPGrowthReport(ROWS).generate()
+
+        assert [row['Страна'] for row in result] == ['A', 'B', 'C']
+        assert result[0]['Среднегодовой рост, %'] == pytest.approx(10)
+        assert (result[0]['Первый год'], result[0]['Последний год']) == (2018, 2022)
+        assert result[1]['Среднегодовой рост, %'] == pytest.approx(-20)
+        # Для одного года рост не определен
+        assert result[2]['Среднегодовой рост, %'] is None
+
+    def test_trends(self):
+        """Test year-over-year changes and the rolling average per row."""
+        result = GDPTrendsReport(pd.DataFrame(ROWS)).generate()
+
+        assert [(row['Страна'], row['Год']) for row in result][:4] == [
+            ('B', 2019), ('B', 2020), ('A', 2018), ('A', 2019)]
+        row = result[4]
+        assert row['Изменение за год'] == pytest.approx(11)
+        assert row['Скользящее среднее (3 г.)'] == pytest.approx(331 / 3)
+        assert result[5]['Изменение за год'] is None
+
+    def test_value_types(self):
+        """Test that years are ints and metric values stay floats even when they are whole."""
+        result = GDPTrendsReport(ROWS).generate()
+
+        assert {type(row['Год']) for row in result} == {int}
+        for label in ('ВВП', 'Изменение за год', 'Скользящее среднее (3 г.)'):
+            assert {type(row[label]) for row in result} <= {float, type(None)}
+        assert {type(value) for row in GDPGrowthReport(ROWS).generate() for value in row.values()} == {
+            str, int, float, type(None)}
+
+    def test_duplicate_years_are_averaged(self):
+        """Test that repeated (country, year) rows form one cell."""
+        rows = ROWS + [{'country': 'C', 'year': 2020.0, 'gdp': 7.0}]
+        result = GDPTrendsReport(rows).generate()
+
+        assert [row['ВВП'] for row in result if row['Страна'] == 'C'] == [6]
+
+    def test_merge_across_files(self):
+        """Test that aggregates of separate files merge into the same series."""
+        first = GDPTrendsReport(ROWS[:3]).aggregate_data()
+        first.merge(GDPTrendsReport(ROWS[3:]).aggregate_data())
+
+        assert GDPTrendsReport(aggregate=first).generate() == GDPTrendsReport(ROWS).generate()
+
+    def test_chunked_with_spills(self, tmp_path):
+        """Test that spilled partitions give the same series."""
+        memory_limit = 2 * 512 + GDPGrowthReport.aggregate_class.group_bytes()
+        spilling, = aggregate_chunked([GDPGrowthReport], ROWS, memory_limit=memory_limit,
+                                      batch_rows=2, directory=str(tmp_path))
+
+        assert spilling.spills > 0
+        assert generate_chunked(GDPGrowthReport, spilling) == GDPGrowthReport(ROWS).generate()
+
+    def test_registered(self):
+        """Test that the reports are available in the registry."""
+        assert ReportRegistry.get_report('gdp-cagr') is GDPGrowthReport
+        assert ReportRegistry.get_report('gdp-trends') is GDPTrendsReport
+
+    def test_compute_is_required(self):
+        """Test that a time-series report without compute() cannot be created."""
+        class IncompleteReport(TimeSeriesReport):
+            metric = 'inflation'
+            metrics = {'inflation': ('mean',)}
+
+        with pytest.raises(TypeError, match='compute'):
+            IncompleteReport(ROWS)
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
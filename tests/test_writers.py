@@ -0,0 +1,127 @@
+"""Tests for output writers."""
+import json
+import sys
+from io import StringIO
+from unittest.mock import patch
+
+import pytest
+
+from macro_analysis.cli import main
+from macro_analysis.writers import write_csv, write_grid, write_jsonl, write_result
+
+ROWS = [
+    {'Страна': 'USA', 'Средний ВВП': 250.0},
+    {'Страна': 'Germany', 'Средний ВВП': None},
+]
+
+
+class TestWriters:
+    """Test cases for output writers."""
+
+    def test_grid_numbers_rows_and_marks_missing(self):
+        """Test that the grid format numbers rows and shows None as Н/Д."""
+        stream = StringIO()
+        write_grid(ROWS, stream)
+        output = stream.getvalue()
+
+        assert '№' in output
+        assert 'Н/Д' in output
+        assert '+----' in output
+
+    def test_csv_streams_rows(self):
+        """Test CSV output with a header and empty cells for None."""
+        stream = StringIO()
+        write_csv(iter(ROWS), stream)
+
+        assert stream.getvalue() == 'Страна,Средний ВВП\nUSA,250.0\nGermany,\n'
+
+    def test_jsonl_streams_rows(self):
+        """Test JSON Lines output with null for None."""
+        stream = StringIO()
+        write_jsonl(iter(ROWS), stream)
+
+        lines = stream.getvalue().splitlines()
+        assert [json.loads(line) for line in lines] == ROWS
+        assert 'Страна' in lines[0]
+
+    def test_empty_result(self):
+        """Test that machine formats write nothing for an empty result."""
+        for writer in (write_csv, write_jsonl):
+            stream = StringIO()
+            writer([], stream)
+            assert stream.getvalue() == ''
+
+    def test_write_to_output_file(self, tmp_path):
+        """Test writing a text format to a file."""
+        output = tmp_path / "result.csv"
+        write_result(ROWS, 'csv', str(output))
+
+        assert output.read_text(encoding='utf-8').startswith('Страна,Средний ВВП\n')
+
+    def test_parquet_round_trip(self, tmp_path):
+        """Test that parquet output can be read back."""
+        pq = pytest.importorskip('pyarrow.parquet')
+        output = tmp_path / "result.parquet"
+
+        with patch('macro_analysis.writers.PARQUET_BATCH_ROWS', 1):
+            write_result(iter(ROWS), 'parquet', str(output))
+
+        table = pq.read_table(str(output))
+        assert table.to_pylist() == ROWS
+        assert pq.ParquetFile(str(output)).num_row_groups == 2
+
+    def test_parquet_types_from_later_batches(self, tmp_path):
+        """Test that a column empty or int in the first batch takes its type from later ones."""
+        pq = pytest.importorskip('pyarrow.parquet')
+        output = tmp_path / "result.parquet"
+        rows = [
+            {'Год': 2020, 'ВВП': 1000, 'Рост': None},
+            {'Год': 2021, 'ВВП': 1099.75, 'Рост': None},
+            {'Год': 2022, 'ВВП': 1200.5, 'Рост': 9.2},
+        ]
+
+        with patch('macro_analysis.writers.PARQUET_BATCH_ROWS', 1):
+            write_result(iter(rows), 'parquet', str(output))
+
+        table = pq.read_table(str(output))
+        assert table.to_pylist() == rows
+        assert str(table.schema.field('Год').type) == 'int64'
+        assert str(table.schema.field('ВВП').type) == 'double'
+
+    def test_parquet_lossy_value_is_rejected(self, tmp_path):
+        """Test that a float in a column already written as int fails instead of being truncated."""
+        pytest.importorskip('pyarrow.parquet')
+        rows = [{'Год': 2020, 'ВВП': 1000}, {'Год': 2021, 'ВВП': 1099.75}]
+
+        with patch('macro_analysis.writers.PARQUET_BATCH_ROWS', 1):
+            with pytest.raises(ValueError) as exc_info:
+                write_result(iter(rows), 'parquet', str(tmp_path / "result.parquet"))
+
+        assert 'parquet' in str(exc_info.value)
+
+    def test_parquet_requires_output(self):
+        """Test that parquet cannot be written to stdout."""
+        with pytest.raises(ValueError) as exc_info:
+            write_result(ROWS, 'parquet')
+
+        assert '--output' in str(exc_info.value)
+
+    def test_cli_format_option(self, tmp_path):
+        """Test --format and --output on the command line."""
+        test_file = tmp_path / "test.csv"
+        test_file.write_text("country,gdp\nUSA,100\nGermany,200\n", encoding='utf-8')
+        output = tmp_path / "result.jsonl"
+
+        test_args = ['program.py', '--files', str(test_file), '--report', 'average-gdp',
+                     '--format', 'jsonl', '--output', str(output)]
+        with patch.object(sys, 'argv', test_args):
+            with patch('sys.stdout', new_callable=StringIO) as mock_stdout:
+                main()
+                assert mock_stdout.getvalue() == ''
+
+        lines = output.read_text(encoding='utf-8').splitlines()
+        assert json.loads(lines[0]) == {'Страна': 'Germany', 'Средний ВВП': 200.0}
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])